@@ -10,13 +10,19 @@
 """
 CVI Voice MCP Server — interim TTS server while parrotvox is in development.
 
-Exposes a single `speak` tool that invokes macOS `say` for text-to-speech.
+Exposes a `speak` tool that invokes macOS `say` for text-to-speech, plus
+`speak_status` / `speak_cancel` / `speak_flush` for managing queued speech.
 This is the CVI plugin's own minimal implementation, independent of
 parrotvox (https://github.com/signalcompose/parrotvox) — the forthcoming
 standalone macOS TTS application that is planned to replace CVI entirely.
 When parrotvox becomes distribution-ready, CVI plugin is expected to be
 deprecated and users migrate to parrotvox directly.
 
+Speech goes through a backend: `say` (macOS, the normal case), `espeak-ng`
+(Linux hosts), or `null`, which speaks nothing but simulates playback time so
+queueing behavior can be exercised in CI without audio hardware. Select with
+TTS_BACKEND in ~/.cvi/config or the CVI_TTS_BACKEND environment variable.
+
 This server runs as a subprocess of Claude Code via .mcp.json registration
 and communicates over stdio JSON-RPC. Because MCP servers execute outside
 the Bash sandbox, `say` works natively without needing
@@ -26,14 +32,33 @@ focuses on the speak tool only.)
 
 This is the sole speak path. Bash fallback was removed (#242); if the server
 fails to start, run `/cvi:check` to diagnose.
+
+Utterances are played by a single background worker that drains an in-process
+queue, so a long utterance never blocks the stdio JSON-RPC loop. `speak`
+still waits for playback by default (hook contract); `wait=False` returns as
+soon as the job is queued. Bursts are kept bounded: repeated texts are
+dropped, a long backlog collapses into "N more notifications", and utterances
+that waited too long are skipped.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import queue
+import re
 import shutil
 import subprocess
 import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable
 
 from mcp.server.fastmcp import FastMCP
 
@@ -41,11 +66,14 @@ mcp = FastMCP("cvi-voice")
 
 
 CVI_CONFIG_PATH = Path.home() / ".cvi" / "config"
+CVI_AUDIO_CACHE_DIR = Path.home() / ".cvi" / "cache"
 
 # Resolve `say` once at module load. The binary ships with macOS and the path
 # is stable for the lifetime of the server process, so per-call PATH lookup
 # would be wasted work.
 _SAY_PATH = shutil.which("say")
+_ESPEAK_PATH = shutil.which("espeak-ng") or shutil.which("espeak")
+_AFPLAY_PATH = shutil.which("afplay")
 
 _CONFIG_DEFAULTS: dict[str, str] = {
     "CVI_ENABLED": "on",
@@ -58,26 +86,24 @@ _CONFIG_DEFAULTS: dict[str, str] = {
     "VOICE_MODE": "auto",
     "VOICE_FIXED": "",
     "AUTO_DETECT_LANG": "true",
+    # auto | say | espeak | null. The CVI_TTS_BACKEND env var takes precedence.
+    "TTS_BACKEND": "auto",
+    # Speech queue limits (see `_QueuePolicy`); 0 disables each one.
+    "DEDUP_WINDOW": "10",
+    "MAX_QUEUE_DEPTH": "3",
+    "QUEUE_MAX_AGE": "60",
+    # Pre-rendered audio for repeated phrases (`say` backend only).
+    "AUDIO_CACHE": "on",
+    "AUDIO_CACHE_MAX_MB": "50",
+    # Append one JSON line of phase timings per finished job ("" = off).
+    "TRACE_LOG": "",
 }
 
 
-def _load_config() -> dict[str, str]:
-    """Read ~/.cvi/config shell-style KEY=VALUE lines. Missing file → defaults.
-
-    A missing config is a first-run / fresh-machine condition, not a hard
-    failure — CVI has no critical setting that requires an explicit value
-    to be safe. We warn once to stderr so new users see the path that was
-    checked and can run ``/cvi:setup`` if they expected a config file.
-    """
+def _parse_config(text: str) -> dict[str, str]:
+    """Parse shell-style KEY=VALUE lines on top of the defaults."""
     cfg = dict(_CONFIG_DEFAULTS)
-    if not CVI_CONFIG_PATH.is_file():
-        print(
-            f"[cvi-voice] config not found at {CVI_CONFIG_PATH}; "
-            "using defaults (CVI_ENABLED=on). Run /cvi:setup to generate one.",
-            file=sys.stderr,
-        )
-        return cfg
-    for raw in CVI_CONFIG_PATH.read_text(encoding="utf-8").splitlines():
+    for raw in text.splitlines():
         line = raw.strip()
         if not line or line.startswith("#") or "=" not in line:
             continue
@@ -86,18 +112,138 @@ def _load_config() -> dict[str, str]:
     return cfg
 
 
+class _ConfigCache:
+    """Parsed ~/.cvi/config, re-read only when the file's stat changes.
+
+    Every utterance needs the config, but the file changes only when the user
+    runs ``/cvi:setup`` / ``/cvi:state`` etc. Comparing (mtime, size, inode)
+    costs one stat per call instead of open + read + parse, and still picks up
+    edits immediately — `/cvi:state off` followed by a speak must be honoured
+    without a restart. The inode catches editors that replace the file
+    atomically within the same mtime granularity.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._key: tuple[int, int, int] | None = None
+        self._cfg: dict[str, str] | None = None
+        self._warned_missing = False
+
+    def _stat_key(self) -> tuple[int, int, int] | None:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def get(self, force: bool = False) -> dict[str, str]:
+        """Return the parsed config (callers must not mutate it)."""
+        key = self._stat_key()
+        with self._lock:
+            if not force and self._cfg is not None and key == self._key:
+                return self._cfg
+            self._cfg, self._key = self._read(key)
+            return self._cfg
+
+    @property
+    def found(self) -> bool:
+        """Whether the last load read an actual file (False → defaults)."""
+        return self._key is not None
+
+    def _read(
+        self, key: tuple[int, int, int] | None
+    ) -> tuple[dict[str, str], tuple[int, int, int] | None]:
+        if key is None:
+            # A missing config is a first-run / fresh-machine condition, not
+            # a hard failure — CVI has no critical setting that requires an
+            # explicit value to be safe. Warn once per process so new users
+            # see the path that was checked and can run ``/cvi:setup``,
+            # without repeating it on every utterance.
+            if not self._warned_missing:
+                self._warned_missing = True
+                print(
+                    f"[cvi-voice] config not found at {self.path}; "
+                    "using defaults (CVI_ENABLED=on). Run /cvi:setup to generate one.",
+                    file=sys.stderr,
+                )
+            return dict(_CONFIG_DEFAULTS), None
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except OSError:
+            # Removed (or made unreadable) between stat and read. Fall back to
+            # defaults and drop the key so the next call retries.
+            return dict(_CONFIG_DEFAULTS), None
+        return _parse_config(text), key
+
+
+_config = _ConfigCache(CVI_CONFIG_PATH)
+
+
+def _load_config() -> dict[str, str]:
+    """Read ~/.cvi/config shell-style KEY=VALUE lines. Missing file → defaults.
+
+    Served from `_config`; the file is re-parsed only after it changes.
+    """
+    return _config.get()
+
+
+# Hiragana, Katakana, CJK Unified Ideographs. One compiled character class
+# scans in C, so long English-only text (the worst case: no early exit) costs
+# a single regex pass instead of a Python-level ord() loop.
+_JA_CLASS = "\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF"
+_JA_RE = re.compile(f"[{_JA_CLASS}]")
+
+# Runs of Japanese or Latin letters. Everything else (spaces, digits,
+# punctuation, full-width symbols) is neutral and stays with the run it
+# follows, so "完了しました。Next..." splits after the 。.
+_LANG_RUN_RE = re.compile(f"(?P<ja>[{_JA_CLASS}]+)|(?P<en>[A-Za-z\u00C0-\u024F]+)")
+
+# English runs with fewer words than this stay inside the surrounding Japanese
+# run: Japanese voices read short loanwords ("git の push") acceptably, and
+# switching voices for every identifier makes speech choppy.
+_MIN_EN_RUN_WORDS = 3
+
+
 def _detect_language(text: str) -> str:
     """Return 'ja' if the text contains any Japanese Unicode range, else 'en'.
 
     Ranges cover Hiragana / Katakana / CJK Unified Ideographs (equivalent to
     the regex ``[ぁ-んァ-ヶー一-龠]``).
     """
-    for ch in text:
-        o = ord(ch)
-        # Hiragana, Katakana, CJK Unified Ideographs (see docstring above).
-        if 0x3040 <= o <= 0x309F or 0x30A0 <= o <= 0x30FF or 0x4E00 <= o <= 0x9FFF:
-            return "ja"
-    return "en"
+    return "ja" if _JA_RE.search(text) else "en"
+
+
+def _split_language_runs(text: str) -> list[tuple[str, str]]:
+    """Split mixed English / Japanese text into ``(lang, segment)`` runs.
+
+    Concatenating the segments reproduces ``text``. Text without Japanese is
+    one 'en' run, so the common case costs the same single search as
+    `_detect_language`.
+    """
+    if not _JA_RE.search(text):
+        return [("en", text)]
+
+    # (lang, start offset, word count) per run of same-language words.
+    runs: list[list] = []
+    for m in _LANG_RUN_RE.finditer(text):
+        lang = m.lastgroup
+        if runs and runs[-1][0] == lang:
+            runs[-1][2] += 1
+        else:
+            runs.append([lang, m.start(), 1])
+
+    merged: list[list] = []
+    for lang, start, words in runs:
+        if lang == "en" and words < _MIN_EN_RUN_WORDS:
+            lang = "ja"
+        if merged and merged[-1][0] == lang:
+            continue
+        merged.append([lang, start])
+    merged[0][1] = 0
+
+    bounds = [start for _, start in merged[1:]] + [len(text)]
+    return [(lang, text[start:end]) for (lang, start), end in zip(merged, bounds)]
 
 
 def _resolve_voice(cfg: dict[str, str], voice: str | None, lang: str) -> str | None:
@@ -111,56 +257,819 @@ def _resolve_voice(cfg: dict[str, str], voice: str | None, lang: str) -> str | N
     return None if selected in ("", "system") else selected
 
 
+# Finished jobs kept for `speak_status`. Old entries are dropped first; a
+# caller polling a job id that old gets "unknown job" rather than unbounded
+# memory growth over a long agent session.
+_JOB_HISTORY_LIMIT = 100
+
+
+@dataclass
+class _Utterance:
+    text: str
+    voice: str | None  # engine-specific voice, None → engine default
+    rate: str
+    audio: Path | None = None  # pre-rendered file, set by `prepare`
+
+
+# Only short texts are worth caching: the repeated hook phrases ("Task
+# completed", "Input required") are short, while long summaries are unique
+# and would just churn the cache — and a miss costs a render before playback.
+_AUDIO_CACHE_MAX_CHARS = 120
+
+
+class _AudioCache:
+    """Content-addressed `say -o` renders under ~/.cvi/cache, LRU by size.
+
+    Files are named by SHA-256 of (voice, rate, text), so a hit needs no index
+    — just a stat. The file mtime is the LRU clock: a hit touches it, and
+    eviction after each render deletes the least recently used files until
+    the directory fits in `max_bytes`.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.enabled = True
+        self.max_bytes = int(float(_CONFIG_DEFAULTS["AUDIO_CACHE_MAX_MB"]) * 1024 * 1024)
+
+    def configure(self, cfg: dict[str, str]) -> None:
+        self.enabled = cfg.get("AUDIO_CACHE", "on") != "off" and _AFPLAY_PATH is not None
+        self.max_bytes = int(_config_number(cfg, "AUDIO_CACHE_MAX_MB") * 1024 * 1024)
+        if not self.max_bytes:
+            self.enabled = False
+
+    def path_for(self, utterance: _Utterance) -> Path:
+        key = "\0".join((utterance.voice or "", utterance.rate, utterance.text))
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.aiff"
+
+    def lookup(self, utterance: _Utterance) -> Path | None:
+        path = self.path_for(utterance)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def render(self, utterance: _Utterance, say_path: str) -> Path | None:
+        """Render with `say -o`; None if rendering fails (caller speaks live)."""
+        path = self.path_for(utterance)
+        # `say` picks the file format from the extension, so keep .aiff last.
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.aiff")
+        cmd: list[str] = [say_path, "-r", utterance.rate, "-o", str(tmp_path)]
+        if utterance.voice:
+            cmd.extend(["-v", utterance.voice])
+        cmd.append(utterance.text)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+            os.replace(tmp_path, path)
+        except (OSError, subprocess.CalledProcessError):
+            tmp_path.unlink(missing_ok=True)
+            return None
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path) -> None:
+        entries: list[tuple[float, int, str]] = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.startswith(".") or not entry.name.endswith(".aiff"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == str(keep):
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+
+
+_audio_cache = _AudioCache(CVI_AUDIO_CACHE_DIR)
+
+
+class _SimulatedPlayback:
+    """Stand-in for a `say` process: `wait()` blocks for the simulated duration.
+
+    Mirrors the subset of `subprocess.Popen` the speech worker uses, so the
+    queue code is identical for real and simulated playback.
+    """
+
+    def __init__(self, duration: float) -> None:
+        self._stopped = threading.Event()
+        self._deadline = time.monotonic() + duration
+
+    def wait(self) -> int:
+        remaining = self._deadline - time.monotonic()
+        if remaining > 0 and self._stopped.wait(remaining):
+            return -15  # as if killed by SIGTERM
+        return 0
+
+    def terminate(self) -> None:
+        self._stopped.set()
+
+
+class _SayBackend:
+    """macOS `say`."""
+
+    name = "say"
+
+    def __init__(self, path: str) -> None:
+        # Use the cached absolute path so availability checked at selection
+        # time is what runs — avoids a second PATH lookup in Popen that could
+        # re-resolve under a changed environment.
+        self.path = path
+
+    def voice_for(self, voice: str | None, lang: str) -> str | None:
+        return voice
+
+    def prepare(self, utterance: _Utterance) -> None:
+        """Attach a cached render, producing one on a miss (may block)."""
+        if not _audio_cache.enabled or len(utterance.text) > _AUDIO_CACHE_MAX_CHARS:
+            return
+        utterance.audio = _audio_cache.lookup(utterance) or _audio_cache.render(
+            utterance, self.path
+        )
+
+    def start(self, utterance: _Utterance) -> subprocess.Popen:
+        if utterance.audio is not None and _AFPLAY_PATH is not None:
+            return subprocess.Popen([_AFPLAY_PATH, str(utterance.audio)])
+        cmd: list[str] = [self.path, "-r", utterance.rate]
+        if utterance.voice:
+            cmd.extend(["-v", utterance.voice])
+        cmd.append(utterance.text)
+        return subprocess.Popen(cmd)
+
+
+class _EspeakBackend:
+    """espeak-ng (or espeak) for Linux hosts.
+
+    macOS voice names ("Zoe", "Kyoko") mean nothing to espeak, so the voice is
+    the detected language code instead. `-s` is words per minute, the same
+    unit as SPEECH_RATE.
+    """
+
+    name = "espeak"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def voice_for(self, voice: str | None, lang: str) -> str | None:
+        return lang
+
+    def prepare(self, utterance: _Utterance) -> None:
+        pass
+
+    def start(self, utterance: _Utterance) -> subprocess.Popen:
+        cmd: list[str] = [self.path, "-s", utterance.rate]
+        if utterance.voice:
+            cmd.extend(["-v", utterance.voice])
+        cmd.append(utterance.text)
+        return subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+
+
+class _NullBackend:
+    """Silent backend that records utterances and simulates their duration.
+
+    Duration is word count / SPEECH_RATE (wpm). Japanese has no spaces, so
+    every two kana / kanji count as one word — roughly how `say` paces it.
+    """
+
+    name = "null"
+
+    def __init__(self) -> None:
+        self.recorded: deque[dict[str, object]] = deque(maxlen=_JOB_HISTORY_LIMIT)
+
+    def voice_for(self, voice: str | None, lang: str) -> str | None:
+        return voice
+
+    def prepare(self, utterance: _Utterance) -> None:
+        pass
+
+    @staticmethod
+    def duration(text: str, rate: str) -> float:
+        try:
+            wpm = float(rate)
+        except ValueError:
+            wpm = float(_CONFIG_DEFAULTS["SPEECH_RATE"])
+        words = len(_JA_RE.sub(" ", text).split()) + len(_JA_RE.findall(text)) // 2
+        return max(words, 1) * 60.0 / max(wpm, 1.0)
+
+    def start(self, utterance: _Utterance) -> _SimulatedPlayback:
+        duration = self.duration(utterance.text, utterance.rate)
+        self.recorded.append({
+            "text": utterance.text,
+            "voice": utterance.voice,
+            "rate": utterance.rate,
+            "duration": duration,
+        })
+        return _SimulatedPlayback(duration)
+
+
+_Backend = _SayBackend | _EspeakBackend | _NullBackend
+
+# One instance per backend name so the null backend's recordings survive
+# across calls.
+_backends: dict[str, _Backend] = {}
+
+
+def _select_backend(cfg: dict[str, str]) -> _Backend:
+    """Return the backend named by CVI_TTS_BACKEND / TTS_BACKEND.
+
+    "auto" prefers `say`, then espeak. It never picks "null": silently
+    speaking nothing on a misconfigured machine would hide the problem.
+    """
+    name = os.environ.get("CVI_TTS_BACKEND") or cfg.get("TTS_BACKEND", "auto")
+    if name == "auto":
+        if _SAY_PATH is not None:
+            name = "say"
+        elif _ESPEAK_PATH is not None:
+            name = "espeak"
+        else:
+            raise RuntimeError(
+                "`say` command not found — CVI requires macOS "
+                "(or espeak-ng on Linux)"
+            )
+
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+    if name == "say":
+        if _SAY_PATH is None:
+            raise RuntimeError("`say` command not found — CVI requires macOS")
+        backend = _SayBackend(_SAY_PATH)
+    elif name == "espeak":
+        if _ESPEAK_PATH is None:
+            raise RuntimeError("`espeak-ng` command not found")
+        backend = _EspeakBackend(_ESPEAK_PATH)
+    elif name == "null":
+        backend = _NullBackend()
+    else:
+        raise RuntimeError(
+            f"unknown TTS_BACKEND: {name!r} (expected auto, say, espeak or null)"
+        )
+    _backends[name] = backend
+    return backend
+
+
+@dataclass
+class _QueuePolicy:
+    """Limits that keep queue latency bounded when hooks fire in bursts.
+
+    dedup_window: seconds during which a repeat of a queued / recently spoken
+        text is dropped (the caller is attached to the earlier job).
+    max_depth: queued jobs allowed before further ones are merged into a
+        single "N more notifications" job at the tail.
+    max_age: seconds a job may wait in the queue before it is skipped as
+        stale.
+    """
+
+    dedup_window: float
+    max_depth: int
+    max_age: float
+
+
+def _config_number(cfg: dict[str, str], key: str) -> float:
+    try:
+        return max(float(cfg.get(key, "")), 0.0)
+    except ValueError:
+        return float(_CONFIG_DEFAULTS[key])
+
+
+def _queue_policy(cfg: dict[str, str]) -> _QueuePolicy:
+    return _QueuePolicy(
+        dedup_window=_config_number(cfg, "DEDUP_WINDOW"),
+        max_depth=int(_config_number(cfg, "MAX_QUEUE_DEPTH")),
+        max_age=_config_number(cfg, "QUEUE_MAX_AGE"),
+    )
+
+
+def _summary_text(count: int, lang: str) -> str:
+    if lang == "ja":
+        return f"ほか {count} 件の通知"
+    return f"{count} more notification" + ("" if count == 1 else "s")
+
+
+# Finished jobs whose timings `stats` summarizes. A window rather than
+# running totals so percentiles reflect recent behavior.
+_TIMING_WINDOW = 500
+
+# Per-job phases, in pipeline order:
+#   config     load (cached) ~/.cvi/config and select the backend
+#   resolve    language split and voice resolution
+#   queue_wait submit → worker picks the job up
+#   prepare    audio cache lookup / `say -o` render
+#   spawn      start the playback process
+#   playback   wait for the process to exit (≈ speech length)
+#   total      submit → finished, end to end
+_PHASES = ("config", "resolve", "queue_wait", "prepare", "spawn", "playback", "total")
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(int(-(-pct * len(ordered) // 100)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class _Timings:
+    """Ring buffer of per-job phase timings, optionally mirrored to JSONL."""
+
+    def __init__(self) -> None:
+        self._records: deque[dict[str, object]] = deque(maxlen=_TIMING_WINDOW)
+        self._lock = threading.Lock()
+        self.trace_path: Path | None = None
+
+    def configure(self, cfg: dict[str, str]) -> None:
+        trace = cfg.get("TRACE_LOG", "")
+        self.trace_path = Path(trace).expanduser() if trace else None
+
+    def record(self, job: _SpeechJob) -> None:
+        entry: dict[str, object] = {
+            "ts": time.time(),
+            "job_id": job.id,
+            "status": job.status,
+            "backend": job.backend.name,
+            "voices": [u.voice or "system" for u in job.utterances],
+            "chars": len(job.text),
+            "merged": job.merged,
+            "phases_ms": {k: round(v * 1000, 3) for k, v in job.spans.items()},
+        }
+        with self._lock:
+            self._records.append(entry)
+        trace_path = self.trace_path
+        if trace_path is not None:
+            try:
+                trace_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(trace_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as exc:
+                print(f"[cvi-voice] trace log disabled: {exc}", file=sys.stderr)
+                self.trace_path = None
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            records = list(self._records)
+        phases: dict[str, dict[str, float]] = {}
+        for phase in _PHASES:
+            values = sorted(
+                r["phases_ms"][phase] for r in records if phase in r["phases_ms"]
+            )
+            if not values:
+                continue
+            phases[phase] = {
+                "count": len(values),
+                "p50_ms": _percentile(values, 50),
+                "p95_ms": _percentile(values, 95),
+                "p99_ms": _percentile(values, 99),
+                "max_ms": values[-1],
+            }
+        return {
+            "jobs": len(records),
+            "window": _TIMING_WINDOW,
+            "phases": phases,
+            "voices": dict(Counter(v for r in records for v in r["voices"])),
+            "statuses": dict(Counter(r["status"] for r in records)),
+            "backends": dict(Counter(r["backend"] for r in records)),
+        }
+
+
+_timings = _Timings()
+
+
+@dataclass
+class _SpeechJob:
+    id: int
+    text: str
+    backend: _Backend
+    # One utterance per language run, played back to back.
+    utterances: list[_Utterance]
+    # queued → speaking → done | failed | cancelled, or queued → expired
+    status: str = "queued"
+    error: str | None = None
+    max_age: float = 0.0
+    # Set on a summary job: how many submissions it stands for, and how to
+    # render its utterances for a given count.
+    merged: int = 0
+    summarize: Callable[[int], list[_Utterance]] | None = None
+    # Phase name → seconds (see _PHASES).
+    spans: dict[str, float] = field(default_factory=dict)
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    finished_at: float | None = None
+    process: subprocess.Popen | _SimulatedPlayback | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "job_id": self.id,
+            "text": self.text,
+            "status": self.status,
+            "error": self.error,
+            "backend": self.backend.name,
+            "merged": self.merged,
+        }
+
+
+class _SpeechQueue:
+    """FIFO of speech jobs drained by one daemon worker thread.
+
+    One worker (not a pool) because overlapping speech processes would talk
+    over each other — playback order is the user-visible contract. The worker
+    starts lazily so importing the module (e.g. for `/cvi:check`) spawns
+    nothing.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[_SpeechJob] = queue.Queue()
+        self._jobs: OrderedDict[int, _SpeechJob] = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        # Most recent job per text, oldest first, for the dedup window.
+        self._recent: OrderedDict[str, _SpeechJob] = OrderedDict()
+        self._summary: _SpeechJob | None = None
+
+    def submit(
+        self,
+        text: str,
+        backend: _Backend,
+        utterances: list[_Utterance],
+        policy: _QueuePolicy,
+        summarize: Callable[[int], list[_Utterance]],
+        spans: dict[str, float],
+    ) -> tuple[_SpeechJob, str]:
+        """Queue an utterance, subject to `policy`.
+
+        Returns:
+            ``(job, outcome)``. outcome is "queued"; "duplicate" when ``text``
+            repeats a live or just-spoken job (that job is returned); or
+            "merged" when the queue is full and ``text`` was folded into the
+            summary job (returned).
+        """
+        now = time.monotonic()
+        key = text.strip()
+        with self._lock:
+            while self._recent:
+                oldest = next(iter(self._recent.values()))
+                if now - oldest.queued_at <= policy.dedup_window:
+                    break
+                self._recent.popitem(last=False)
+            previous = self._recent.get(key)
+            if previous is not None and previous.status in ("queued", "speaking", "done"):
+                return previous, "duplicate"
+
+            summary = self._summary
+            if summary is not None and summary.status == "queued":
+                summary.merged += 1
+                summary.utterances = summary.summarize(summary.merged)
+                summary.text = summary.utterances[0].text
+                return summary, "merged"
+
+            merge = policy.max_depth > 0 and policy.max_depth <= sum(
+                1 for j in self._jobs.values() if j.status == "queued"
+            )
+            job = _SpeechJob(
+                id=next(self._ids),
+                text=text,
+                backend=backend,
+                utterances=utterances,
+                max_age=policy.max_age,
+                spans=dict(spans),
+            )
+            if merge:
+                job.merged = 1
+                job.summarize = summarize
+                job.utterances = summarize(1)
+                job.text = job.utterances[0].text
+                self._summary = job
+            else:
+                self._recent[key] = job
+                self._recent.move_to_end(key)
+            self._jobs[job.id] = job
+            self._trim_history()
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="cvi-speech", daemon=True
+                )
+                self._worker.start()
+        self._queue.put(job)
+        return job, "merged" if merge else "queued"
+
+    def get(self, job_id: int) -> _SpeechJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pending(self) -> list[_SpeechJob]:
+        with self._lock:
+            return [j for j in self._jobs.values() if j.status in ("queued", "speaking")]
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a queued or speaking job. False if unknown or already finished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ("queued", "speaking"):
+                return False
+            self._cancel_locked(job)
+            return True
+
+    def flush(self) -> int:
+        """Cancel every queued job and the current utterance. Returns the count."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if j.status in ("queued", "speaking")]
+            for job in jobs:
+                self._cancel_locked(job)
+            return len(jobs)
+
+    def _cancel_locked(self, job: _SpeechJob) -> None:
+        if job.status == "speaking" and job.process is not None:
+            # The worker observes the exit and finishes the job; marking it
+            # here first keeps the signal exit from being reported as a failure.
+            job.status = "cancelled"
+            job.process.terminate()
+            return
+        # Still queued: the worker skips it when dequeued.
+        job.status = "cancelled"
+        job.finished_at = time.monotonic()
+        job.done.set()
+
+    def _trim_history(self) -> None:
+        while len(self._jobs) > _JOB_HISTORY_LIMIT:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status in ("queued", "speaking"):
+                break
+            del self._jobs[oldest_id]
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                self._play(job)
+            except Exception as exc:
+                # Last resort (e.g. a failing timing record): this is the only
+                # worker, so one bad job must not stop the queue.
+                with self._lock:
+                    if job.status in ("queued", "speaking"):
+                        job.status = "failed"
+                        job.error = f"{job.backend.name} failed: {exc}"
+                    job.process = None
+                    job.done.set()
+
+    def _play(self, job: _SpeechJob) -> None:
+        with self._lock:
+            if job.status != "queued":
+                return
+            expired = bool(job.max_age) and time.monotonic() - job.queued_at > job.max_age
+            if expired:
+                # Hook notifications are about "now"; after this long the
+                # user has moved on and hearing it would only add delay.
+                job.status = "expired"
+                job.finished_at = time.monotonic()
+                job.spans["queue_wait"] = job.finished_at - job.queued_at
+                job.done.set()
+        if expired:
+            _timings.record(job)
+            return
+        with self._lock:
+            job.status = "speaking"
+            job.started_at = time.monotonic()
+            job.spans["queue_wait"] = job.started_at - job.queued_at
+
+        name = job.backend.name
+        spans = job.spans
+        for phase in ("prepare", "spawn", "playback"):
+            spans[phase] = 0.0
+        try:
+            for utterance in job.utterances:
+                # Outside the lock: a cache miss renders audio first, and
+                # status / submit calls must not wait for that.
+                t = time.perf_counter()
+                job.backend.prepare(utterance)
+                spans["prepare"] += time.perf_counter() - t
+                with self._lock:
+                    if job.status != "speaking":
+                        break
+                    t = time.perf_counter()
+                    try:
+                        job.process = job.backend.start(utterance)
+                    except Exception as exc:
+                        # OSError for a missing binary, ValueError for text
+                        # Popen rejects (an embedded NUL byte).
+                        job.status = "failed"
+                        job.error = f"failed to start {name}: {exc}"
+                        break
+                    spans["spawn"] += time.perf_counter() - t
+
+                t = time.perf_counter()
+                returncode = job.process.wait()
+                spans["playback"] += time.perf_counter() - t
+
+                with self._lock:
+                    job.process = None
+                    if job.status == "speaking" and returncode != 0:
+                        job.status = "failed"
+                        job.error = f"{name} exited with status {returncode}"
+        except Exception as exc:
+            with self._lock:
+                if job.process is not None:
+                    job.process.terminate()
+                if job.status == "speaking":
+                    job.status = "failed"
+                    job.error = f"{name} failed: {exc}"
+        finally:
+            with self._lock:
+                job.process = None
+                job.finished_at = time.monotonic()
+                spans["total"] = spans.get("config", 0.0) + spans.get("resolve", 0.0) + (
+                    job.finished_at - job.queued_at
+                )
+                if job.status == "speaking":
+                    job.status = "done"
+                job.done.set()
+        _timings.record(job)
+
+
+_speech = _SpeechQueue()
+
+
 @mcp.tool()
-def speak(text: str, voice: str | None = None, rate: int | None = None) -> str:
+async def speak(
+    text: str,
+    voice: str | None = None,
+    rate: int | None = None,
+    wait: bool = True,
+) -> str:
     """
-    Speak `text` aloud via macOS `say`.
+    Speak `text` aloud via macOS `say` (or the configured TTS backend).
 
     Args:
         text: The string to speak. Empty string is an error.
         voice: Optional voice name (e.g. "Zoe", "Kyoko"). "system" = default voice.
-            When None, the per-language voice from ~/.cvi/config is used.
+            When None, the per-language voice from ~/.cvi/config is used; mixed
+            English / Japanese text is split into runs, each spoken with its
+            own VOICE_EN / VOICE_JA voice.
         rate: Optional words-per-minute. When None, SPEECH_RATE from config.
+        wait: When True (default), return only after playback finishes. When
+            False, return as soon as the utterance is queued.
 
     Returns:
         A human-readable confirmation line ("Speaking: ...") compatible with the
-        existing hook contract used by plugins/cvi/commands/speak.md.
+        existing hook contract used by plugins/cvi/commands/speak.md. With
+        ``wait=False``: "Queued: ... (job N)" — pass N to `speak_status` /
+        `speak_cancel`.
     """
     if not text.strip():
         raise ValueError("text must be non-empty")
 
-    if _SAY_PATH is None:
-        raise RuntimeError("`say` command not found — CVI requires macOS")
-
+    t_start = time.perf_counter()
     cfg = _load_config()
     if cfg.get("CVI_ENABLED", "on") == "off":
         return "CVI is disabled. Enable with: /cvi:state on"
+    backend = _select_backend(cfg)
+    _audio_cache.configure(cfg)
+    _timings.configure(cfg)
+    t_config = time.perf_counter()
 
-    detected_lang = _detect_language(text) if cfg.get("AUTO_DETECT_LANG", "true") == "true" else cfg.get("VOICE_LANG", "en")
     effective_rate = str(rate) if rate is not None else cfg.get("SPEECH_RATE", "185")
-    effective_voice = _resolve_voice(cfg, voice, detected_lang)
-
-    # Use the cached absolute path so the `_SAY_PATH is None` guard above
-    # fully describes resolvability — avoids a second PATH lookup during
-    # subprocess.run that could re-resolve under a changed environment.
-    # Local rebind narrows the module-level `str | None` to `str` for
-    # strict type-checkers; the None case has already raised.
-    say_path: str = _SAY_PATH
-    cmd: list[str] = [say_path, "-r", effective_rate]
-    if effective_voice:
-        cmd.extend(["-v", effective_voice])
-    cmd.append(text)
-
-    # Fire and wait synchronously — callers expect voice to complete before
-    # the hook chain continues.
-    try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as exc:
-        raise RuntimeError(f"say exited with status {exc.returncode}") from exc
+    if cfg.get("AUTO_DETECT_LANG", "true") != "true":
+        runs = [(cfg.get("VOICE_LANG", "en"), text)]
+    elif voice or (cfg.get("VOICE_MODE") == "fixed" and cfg.get("VOICE_FIXED")):
+        # One voice regardless of language — splitting would only add gaps.
+        runs = [(_detect_language(text), text)]
+    else:
+        runs = _split_language_runs(text)
+
+    # Adjacent runs that resolve to the same voice (e.g. both "system") are
+    # spoken as one utterance.
+    segments: list[tuple[str | None, str]] = []
+    for lang, segment in runs:
+        segment_voice = backend.voice_for(_resolve_voice(cfg, voice, lang), lang)
+        if segments and segments[-1][0] == segment_voice:
+            segments[-1] = (segment_voice, segments[-1][1] + segment)
+        else:
+            segments.append((segment_voice, segment))
+
+    utterances = [
+        _Utterance(
+            text=segment.strip() if len(segments) > 1 else segment,
+            voice=segment_voice,
+            rate=effective_rate,
+        )
+        for segment_voice, segment in segments
+        if segment.strip()
+    ]
+
+    summary_lang = runs[0][0]
+    summary_voice = backend.voice_for(_resolve_voice(cfg, voice, summary_lang), summary_lang)
 
+    def summarize(count: int) -> list[_Utterance]:
+        return [_Utterance(_summary_text(count, summary_lang), summary_voice, effective_rate)]
+
+    spans = {"config": t_config - t_start, "resolve": time.perf_counter() - t_config}
+    job, outcome = _speech.submit(
+        text, backend, utterances, _queue_policy(cfg), summarize, spans
+    )
+    if outcome == "merged":
+        # Not spoken individually; don't block the caller behind the backlog.
+        return f"Merged: {text} (into job {job.id}: \"{job.text}\")"
+    if not wait:
+        if outcome == "duplicate":
+            return f"Duplicate: {text} (job {job.id})"
+        return f"Queued: {text} (job {job.id})"
+
+    # Callers expect voice to complete before the hook chain continues. Wait
+    # on a thread so the event loop keeps serving other requests meanwhile.
+    await asyncio.to_thread(job.done.wait)
+    if job.status == "failed":
+        raise RuntimeError(job.error or f"{backend.name} failed")
+    if job.status == "cancelled":
+        return f"Cancelled: {text}"
+    if job.status == "expired":
+        return f"Expired: {text}"
     return f"Speaking: {text}"
 
 
+@mcp.tool()
+def reload_config() -> str:
+    """
+    Re-read ~/.cvi/config now, regardless of whether it appears changed.
+
+    Edits are normally picked up automatically on the next `speak`; this is
+    for filesystems with coarse timestamps or for confirming what the server
+    sees.
+    """
+    cfg = _config.get(force=True)
+    if not _config.found:
+        return f"Config not found at {CVI_CONFIG_PATH}; using defaults"
+    settings = ", ".join(f"{key}={cfg[key]}" for key in sorted(cfg))
+    return f"Reloaded {CVI_CONFIG_PATH}: {settings}"
+
+
+@mcp.tool()
+def stats() -> dict[str, object]:
+    """
+    Latency breakdown of recently finished speech jobs.
+
+    Returns:
+        ``phases``: per phase (config, resolve, queue_wait, prepare, spawn,
+        playback, total) the count and p50 / p95 / p99 / max in milliseconds;
+        ``voices``: utterances per voice; ``statuses`` / ``backends``: jobs
+        per outcome / backend. Covers the last few hundred jobs.
+    """
+    return _timings.stats()
+
+
+@mcp.tool()
+def speak_status(job_id: int | None = None) -> dict[str, object]:
+    """
+    Report the state of queued speech.
+
+    Args:
+        job_id: A job id returned by ``speak(wait=False)``. When None, report
+            every queued or speaking job.
+
+    Returns:
+        ``{"job": {...}}`` for a single job, or ``{"pending": [...]}``. Each job
+        has ``job_id``, ``text``, ``status`` (queued / speaking / done / failed /
+        cancelled) and ``error``.
+    """
+    if job_id is None:
+        return {"pending": [job.to_dict() for job in _speech.pending()]}
+    job = _speech.get(job_id)
+    if job is None:
+        raise ValueError(f"unknown job: {job_id}")
+    return {"job": job.to_dict()}
+
+
+@mcp.tool()
+def speak_cancel(job_id: int) -> str:
+    """
+    Cancel one queued or speaking job (stops playback if it already started).
+    """
+    if not _speech.cancel(job_id):
+        return f"Job {job_id} is not queued or speaking"
+    return f"Cancelled job {job_id}"
+
+
+@mcp.tool()
+def speak_flush() -> str:
+    """
+    Cancel every queued job and stop the current utterance.
+    """
+    return f"Cancelled {_speech.flush()} job(s)"
+
+
 if __name__ == "__main__":
     # Transport defaults to stdio when invoked as a subprocess by Claude Code.
     mcp.run()
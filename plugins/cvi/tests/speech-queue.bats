@@ -0,0 +1,322 @@
+#!/usr/bin/env bats
+# Regression tests for the MCP server (null backend): queue worker, queue policy,
+# config reload, audio cache and stats
+
+PLUGIN_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/.." && pwd)"
+SERVER_DIR="${PLUGIN_ROOT}/mcp"
+
+setup() {
+    python3 -c 'import mcp' 2>/dev/null || skip "python3 with the mcp package is required"
+    local _tmp
+    _tmp=$(mktemp -d 2>/dev/null) || { skip "mktemp -d failed (sandbox or quota?)"; }
+    export TEST_DIR
+    TEST_DIR=$(cd "$_tmp" && pwd -P)
+    # Keep ~/.cvi (config, audio cache) out of the real home directory. A config
+    # file must exist, or the server warns on stderr and `run` captures it
+    export HOME="$TEST_DIR"
+    export CVI_TTS_BACKEND=null
+    mkdir -p "$HOME/.cvi"
+    printf 'TTS_BACKEND=null\n' > "$HOME/.cvi/config"
+}
+
+teardown() {
+    if [ -n "$TEST_DIR" ] && [ -d "$TEST_DIR" ]; then
+        rm -rf "$TEST_DIR"
+    fi
+}
+
+# Run a Python snippet; sys.argv[1] is the directory holding server.py
+_run_server_python() {
+    run timeout 30 python3 -c "$1" "$SERVER_DIR"
+}
+
+@test "a backend error fails the job instead of killing the worker" {
+    _run_server_python '
+import asyncio, sys
+sys.path.insert(0, sys.argv[1])
+import server
+
+backend = server._select_backend({})
+start = backend.start
+
+def failing_start(utterance):
+    # What Popen does for text containing a NUL byte
+    if "\0" in utterance.text:
+        raise ValueError("embedded null byte")
+    return start(utterance)
+
+backend.start = failing_start
+
+async def main():
+    try:
+        await server.speak("bad\0text")
+    except RuntimeError as exc:
+        print(f"error: {exc}")
+    # The worker must still be alive for the next job
+    print(await server.speak("ok"))
+
+asyncio.run(main())
+job = server._speech.get(1)
+print(job.status, job.done.is_set())
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "error: failed to start null: embedded null byte" ]
+    [ "${lines[1]}" = "Speaking: ok" ]
+    [ "${lines[2]}" = "failed True" ]
+}
+
+@test "an error while preparing audio finishes the job" {
+    _run_server_python '
+import asyncio, sys
+sys.path.insert(0, sys.argv[1])
+import server
+
+backend = server._select_backend({})
+
+def failing_prepare(utterance):
+    if utterance.text == "broken":
+        raise RuntimeError("render failed")
+
+backend.prepare = failing_prepare
+
+async def main():
+    first, _ = await asyncio.gather(
+        server.speak("broken", wait=False), server.speak("after"), return_exceptions=True
+    )
+    print(first)
+    print(server._speech.get(1).to_dict()["error"])
+    print(server._speech.get(2).status)
+
+asyncio.run(main())
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "Queued: broken (job 1)" ]
+    [ "${lines[1]}" = "null failed: render failed" ]
+    [ "${lines[2]}" = "done" ]
+}
+
+@test "config is re-read when its mtime, size or inode changes" {
+    _run_server_python '
+import os, sys
+sys.path.insert(0, sys.argv[1])
+import server
+
+path = server.CVI_CONFIG_PATH
+
+def write(text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+base = 1_700_000_000_000_000_000
+write("SPEECH_RATE=100\n", base)
+first = server._load_config()
+print("unchanged", server._load_config() is first)
+
+# Same size, new mtime
+write("SPEECH_RATE=101\n", base + 1_000_000_000)
+print("mtime", server._load_config()["SPEECH_RATE"])
+
+# New size, mtime put back to the cached value
+write("SPEECH_RATE=1020\n", base + 1_000_000_000)
+print("size", server._load_config()["SPEECH_RATE"])
+
+# Atomic replace: same mtime and size, new inode
+tmp = path.with_name("config.new")
+tmp.write_text("SPEECH_RATE=1030\n")
+os.utime(tmp, ns=(base + 1_000_000_000,) * 2)
+os.replace(tmp, path)
+print("inode", server._load_config()["SPEECH_RATE"])
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "unchanged True" ]
+    [ "${lines[1]}" = "mtime 101" ]
+    [ "${lines[2]}" = "size 1020" ]
+    [ "${lines[3]}" = "inode 1030" ]
+}
+
+@test "null backend duration follows word count and SPEECH_RATE" {
+    _run_server_python '
+import asyncio, sys
+sys.path.insert(0, sys.argv[1])
+import server
+
+duration = server._NullBackend.duration
+print(duration("one two three", "120"))
+# Two kana / kanji count as one word
+print(duration("こんにちは", "200"))
+# Unparsable rate falls back to the default; empty text is one word
+print(duration("", "fast"))
+
+async def main():
+    await server.speak("hello there", rate=600)
+
+asyncio.run(main())
+recorded = server._select_backend({}).recorded[-1]
+print(recorded["text"], recorded["rate"], recorded["duration"])
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "1.5" ]
+    [ "${lines[1]}" = "0.6" ]
+    [ "${lines[2]}" = "0.3" ]
+    [ "${lines[3]}" = "hello there 600 0.2" ]
+}
+
+@test "a repeated text within the dedup window is not queued again" {
+    printf 'TTS_BACKEND=null\nDEDUP_WINDOW=10\n' > "$HOME/.cvi/config"
+    _run_server_python '
+import asyncio, sys
+sys.path.insert(0, sys.argv[1])
+import server
+
+async def main():
+    print(await server.speak("hello", rate=6000, wait=False))
+    print(await server.speak("hello ", rate=6000, wait=False))
+    server._speech.get(1).done.wait(5)
+    # A finished job still counts until the window passes
+    print(await server.speak("hello", rate=6000))
+
+asyncio.run(main())
+print(len(server._select_backend({}).recorded))
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "Queued: hello (job 1)" ]
+    [ "${lines[1]}" = "Duplicate: hello  (job 1)" ]
+    [ "${lines[2]}" = "Speaking: hello" ]
+    [ "${lines[3]}" = "1" ]
+}
+
+@test "jobs beyond MAX_QUEUE_DEPTH are merged into one summary" {
+    printf 'TTS_BACKEND=null\nMAX_QUEUE_DEPTH=2\nQUEUE_MAX_AGE=0\n' > "$HOME/.cvi/config"
+    _run_server_python '
+import asyncio, sys, time
+sys.path.insert(0, sys.argv[1])
+import server
+
+async def main():
+    # One 0.5 s utterance keeps the worker busy while the rest queue up
+    print(await server.speak("hold", rate=120, wait=False))
+    deadline = time.monotonic() + 5
+    while server._speech.get(1).status != "speaking" and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    for text in ("second", "third", "fourth", "fifth", "sixth"):
+        print(await server.speak(text, rate=6000, wait=False))
+
+asyncio.run(main())
+server._speech.get(4).done.wait(5)
+print([r["text"] for r in server._select_backend({}).recorded])
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "Queued: hold (job 1)" ]
+    [ "${lines[1]}" = "Queued: second (job 2)" ]
+    [ "${lines[2]}" = "Queued: third (job 3)" ]
+    [ "${lines[3]}" = 'Merged: fourth (into job 4: "1 more notification")' ]
+    [ "${lines[4]}" = 'Merged: fifth (into job 4: "2 more notifications")' ]
+    [ "${lines[5]}" = 'Merged: sixth (into job 4: "3 more notifications")' ]
+    [ "${lines[6]}" = "['hold', 'second', 'third', '3 more notifications']" ]
+}
+
+@test "a job that waited longer than QUEUE_MAX_AGE is skipped" {
+    printf 'TTS_BACKEND=null\nQUEUE_MAX_AGE=0.2\n' > "$HOME/.cvi/config"
+    _run_server_python '
+import asyncio, sys
+sys.path.insert(0, sys.argv[1])
+import server
+
+async def main():
+    # 1 s of simulated speech ahead of "late"
+    print(await server.speak("hold", rate=60, wait=False))
+    print(await server.speak("late", rate=6000))
+
+asyncio.run(main())
+print([r["text"] for r in server._select_backend({}).recorded])
+print(server._timings.stats()["statuses"])
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "Queued: hold (job 1)" ]
+    [ "${lines[1]}" = "Expired: late" ]
+    [ "${lines[2]}" = "['hold']" ]
+    [ "${lines[3]}" = "{'done': 1, 'expired': 1}" ]
+}
+
+@test "audio cache keys on voice, rate and text and evicts least recently used" {
+    _run_server_python '
+import os, sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+import server
+
+cache = server._AudioCache(Path(os.environ["TEST_DIR"]) / "cache")
+U = server._Utterance
+key = cache.path_for(U("Task completed", "Zoe", "200"))
+print("same", key == cache.path_for(U("Task completed", "Zoe", "200")))
+print("distinct", len({
+    key,
+    cache.path_for(U("Task completed", "Kyoko", "200")),
+    cache.path_for(U("Task completed", "Zoe", "180")),
+    cache.path_for(U("Task completed!", "Zoe", "200")),
+    cache.path_for(U("Task completed", None, "200")),
+}))
+print("miss", cache.lookup(U("Task completed", "Zoe", "200")))
+
+# Three 300-byte renders, oldest first, under a 1000-byte budget
+cache.directory.mkdir(parents=True)
+cache.max_bytes = 1000
+utterances = [U(text, "Zoe", "200") for text in ("a", "b", "c")]
+for age, utterance in zip((300, 200, 100), utterances):
+    path = cache.path_for(utterance)
+    path.write_bytes(b"\0" * 300)
+    stamp = 1_700_000_000 - age
+    os.utime(path, (stamp, stamp))
+# A hit moves "a" to the front of the LRU order
+print("hit", cache.lookup(utterances[0]) == cache.path_for(utterances[0]))
+newest = cache.path_for(U("d", "Zoe", "200"))
+newest.write_bytes(b"\0" * 300)
+cache._evict(keep=newest)
+print("kept", [u.text for u in utterances if cache.path_for(u).exists()], newest.exists())
+
+# The file just rendered survives even when it alone exceeds the budget
+cache.max_bytes = 100
+cache._evict(keep=newest)
+print("left", sorted(p.name == newest.name for p in cache.directory.iterdir()))
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "same True" ]
+    [ "${lines[1]}" = "distinct 5" ]
+    [ "${lines[2]}" = "miss None" ]
+    [ "${lines[3]}" = "hit True" ]
+    [ "${lines[4]}" = "kept ['a', 'c'] True" ]
+    [ "${lines[5]}" = "left [True]" ]
+}
+
+@test "stats reports nearest-rank percentiles per phase" {
+    _run_server_python '
+import asyncio, sys
+from types import SimpleNamespace
+sys.path.insert(0, sys.argv[1])
+import server
+
+backend = server._select_backend({})
+for i in range(1, 21):
+    server._timings.record(SimpleNamespace(
+        id=i, status="done", backend=backend, text="x", merged=0,
+        utterances=[server._Utterance("x", "Zoe", "200")],
+        spans={"playback": i / 1000},
+    ))
+playback = server.stats()["phases"]["playback"]
+print(playback["count"], playback["p50_ms"], playback["p95_ms"], playback["p99_ms"], playback["max_ms"])
+print(server._percentile([5.0], 99), server._percentile([1.0, 2.0, 3.0, 4.0], 50))
+
+async def main():
+    await server.speak("hello", voice="Kyoko", rate=6000)
+
+asyncio.run(main())
+result = server.stats()
+print(result["jobs"], result["voices"], result["statuses"], result["backends"])
+print(sorted(result["phases"]))
+'
+    [ "$status" -eq 0 ]
+    [ "${lines[0]}" = "20 10.0 19.0 20.0 20.0" ]
+    [ "${lines[1]}" = "5.0 2.0" ]
+    [ "${lines[2]}" = "21 {'Zoe': 20, 'Kyoko': 1} {'done': 21} {'null': 21}" ]
+    [ "${lines[3]}" = "['config', 'playback', 'prepare', 'queue_wait', 'resolve', 'spawn', 'total']" ]
+}
@@ -4,13 +4,29 @@ X Articles ヘッダー画像生成スクリプト
 
 使い方:
   python3 header-image.py --title "Article Title" [--subtitle "サブタイトル"] [--output header.png]
+  python3 header-image.py --batch headers.csv [--jobs 4]
+
+--auto-fit を付けると、タイトル・サブタイトルが下マージンに収まる最大の
+フォントサイズを自動で選ぶ（収まらない行を切り捨てる代わりに縮小する）。
+
+バッチモードのマニフェスト（CSV / JSONL / YAML）は 1 画像につき
+title（必須）・subtitle・output を持つ。output の相対パスはマニフェストの
+ディレクトリ基準。
 """
 
 from __future__ import annotations
 
 import argparse
+import bisect
+import csv
+import functools
+import json
+import os
 import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 
 def ensure_pillow():
@@ -42,11 +58,33 @@ MARGIN_TOP = 80     # 上マージン
 MARGIN_BOTTOM = 60  # 下マージン（X クロップ対策）
 LINE_SPACING_TITLE = 1.2
 LINE_SPACING_SUBTITLE = 1.3
+TITLE_SUBTITLE_GAP = 24  # タイトルとサブタイトルの間隔
+
+# --auto-fit で縮小できる下限（これ以上小さいと潰れて読めない）
+MIN_TITLE_FONT_SIZE = 40
+MIN_SUBTITLE_FONT_SIZE = 20
 
 CONTENT_WIDTH = CANVAS_WIDTH - MARGIN_H * 2
 MAX_CONTENT_HEIGHT = CANVAS_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
 
 
+# フォント解決結果の永続キャッシュ
+FONT_CACHE_VERSION = 1
+FONT_CACHE_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "x-article" / "font-cache.json"
+)
+
+# fontconfig のキャッシュディレクトリ（fc-cache でフォント追加・削除時に更新される）
+FONTCONFIG_CACHE_DIRS = [
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "fontconfig",
+    Path.home() / ".fontconfig",
+    Path("/var/cache/fontconfig"),
+    Path("/usr/local/var/cache/fontconfig"),     # macOS Homebrew (Intel)
+    Path("/opt/homebrew/var/cache/fontconfig"),  # macOS Homebrew (Apple Silicon)
+]
+
+
 # ─── フォント検出 ─────────────────────────────────────────
 
 def find_cjk_font() -> str | None:
@@ -94,34 +132,126 @@ FALLBACK_FONTS = [
 ]
 
 
-def load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    """フォントを検出してロード。見つからなければデフォルトフォントを使用"""
-    # 1. fc-list で検索
-    cjk_path = find_cjk_font()
-    if cjk_path:
+def fontconfig_stamp() -> list:
+    """fontconfig キャッシュの状態（ディレクトリの mtime）。フォントの追加・削除で変わる"""
+    stamp = []
+    for directory in FONTCONFIG_CACHE_DIRS:
         try:
-            return ImageFont.truetype(cjk_path, size)
-        except Exception:
-            pass
+            stamp.append([str(directory), directory.stat().st_mtime_ns])
+        except OSError:
+            continue
+    return stamp
+
+
+def read_font_cache() -> str | None:
+    """キャッシュ済みのフォントパスを取得（fontconfig が変わっていれば None）"""
+    try:
+        with open(FONT_CACHE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != FONT_CACHE_VERSION:
+        return None
+    if data.get("fontconfig") != fontconfig_stamp():
+        return None
+    path = data.get("path")
+    if not path or not os.path.isfile(path):
+        return None
+    return path
+
+
+def write_font_cache(path: str, fc_path: str | None):
+    """解決したフォントパスを fc-list の結果と共に保存（失敗しても続行）"""
+    data = {
+        "version": FONT_CACHE_VERSION,
+        "fontconfig": fontconfig_stamp(),
+        "fc_list": fc_path,
+        "path": path,
+    }
+    tmp_path = FONT_CACHE_PATH.with_name(f"{FONT_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        FONT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, FONT_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def clear_font_cache():
+    """キャッシュを破棄（キャッシュしたフォントが読めなくなった場合）"""
+    try:
+        FONT_CACHE_PATH.unlink()
+    except OSError:
+        pass
+    resolve_font_path.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def truetype(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """ImageFont.truetype のメモ化（同じパス・サイズのフォントは 1 回だけ読み込む）"""
+    return ImageFont.truetype(path, size)
+
+
+def _loadable(path: str) -> bool:
+    try:
+        truetype(path, TITLE_FONT_SIZE)
+    except Exception:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_font_path() -> str | None:
+    """
+    使用するフォントファイルを決定（プロセス内・永続キャッシュ付き）
+
+    キャッシュが有効なら fc-list・apt-get を実行しない。
+    """
+    cached = read_font_cache()
+    if cached:
+        return cached
+
+    # 1. fc-list で検索
+    fc_path = find_cjk_font()
+    if fc_path and _loadable(fc_path):
+        write_font_cache(fc_path, fc_path)
+        return fc_path
 
     # 2. apt-get でインストール試行（失敗しても続行、1回のみ）
     global _noto_install_attempted
     if not _noto_install_attempted:
         _noto_install_attempted = True
         try_install_noto_cjk()
-    cjk_path = find_cjk_font()
-    if cjk_path:
-        try:
-            return ImageFont.truetype(cjk_path, size)
-        except Exception:
-            pass
+    fc_path = find_cjk_font()
+    if fc_path and _loadable(fc_path):
+        write_font_cache(fc_path, fc_path)
+        return fc_path
 
     # 3. ハードコードされたパス候補
     for path in FALLBACK_FONTS:
+        if _loadable(path):
+            write_font_cache(path, fc_path)
+            return path
+
+    return None
+
+
+def load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """フォントを検出してロード。見つからなければデフォルトフォントを使用"""
+    path = resolve_font_path()
+    if path:
         try:
-            return ImageFont.truetype(path, size)
-        except (FileNotFoundError, Exception):
-            continue
+            return truetype(path, size)
+        except Exception:
+            # キャッシュしたフォントが壊れた・置き換えられた: 解決し直す
+            clear_font_cache()
+            path = resolve_font_path()
+            if path:
+                try:
+                    return truetype(path, size)
+                except Exception:
+                    pass
 
     # 4. Pillow デフォルトフォント（日本語は豆腐になるがエラーにしない）
     print("警告: CJK フォントが見つかりませんでした。デフォルトフォント使用（日本語は豆腐になります）", file=sys.stderr)
@@ -130,8 +260,8 @@ def load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
 
 # ─── テキスト折り返し ──────────────────────────────────────
 
-def wrap_text(draw: ImageDraw.ImageDraw, text: str, font, max_width: int) -> list[str]:
-    """テキストを max_width に収まるように折り返す"""
+def split_words(text: str) -> list[str]:
+    """折り返し単位に分割（空白は 1 文字ずつ独立、CJK と非 CJK の境界で区切る）"""
     # 日本語は空白なしで折り返せるようにする
     words = []
     current = ""
@@ -153,21 +283,69 @@ def wrap_text(draw: ImageDraw.ImageDraw, text: str, font, max_width: int) -> lis
                 current += char
     if current:
         words.append(current)
+    return words
+
+
+@functools.lru_cache(maxsize=65536)
+def _advance(font, word: str) -> float:
+    """単語の送り幅（フォントごとにキャッシュ）"""
+    return font.getlength(word)
+
+
+def wrap_text(draw: ImageDraw.ImageDraw, text: str, font, max_width: int) -> list[str]:
+    """
+    テキストを max_width に収まるように折り返す
+
+    各行は「先頭から足していって収まる最長の単語列」（貪欲法）。
+    行幅は単語を足すほど単調に増えるので、最長の単語列を二分探索で求める。
+    探索の初手はキャッシュした単語の送り幅の累積和から見積もり、
+    判定そのものは常に textbbox で行う（カーニング等で見積もりとずれても結果は変わらない）。
+    """
+    words = split_words(text)
+    count = len(words)
+
+    # 送り幅の累積和（見積もり用）。getlength が無いフォントでは見積もらない
+    prefix = None
+    if hasattr(font, "getlength"):
+        prefix = [0.0]
+        for word in words:
+            prefix.append(prefix[-1] + _advance(font, word))
+
+    def fits(start: int, stop: int) -> bool:
+        test = "".join(words[start:stop]).strip()
+        if not test:
+            return True
+        bbox = draw.textbbox((0, 0), test, font=font)
+        return bbox[2] - bbox[0] <= max_width
 
     lines = []
-    current_line = ""
-    for word in words:
-        test = current_line + word
-        bbox = draw.textbbox((0, 0), test.strip(), font=font)
-        w = bbox[2] - bbox[0]
-        if w <= max_width:
-            current_line = test
+    start = 0
+    while start < count:
+        # words[start:lo] は収まる、words[start:hi] は収まらない（hi = count + 1 は番兵）
+        lo, hi = start, count + 1
+        if prefix is not None:
+            limit = prefix[start] + max_width
+            guess = bisect.bisect_right(prefix, limit, start + 1, count + 1) - 1
+            probe = min(max(guess, start + 1), count)
         else:
-            if current_line.strip():
-                lines.append(current_line.strip())
-            current_line = word
-    if current_line.strip():
-        lines.append(current_line.strip())
+            probe = count
+        while hi - lo > 1:
+            if fits(start, probe):
+                lo = probe
+                # 見積もりは通常ほぼ正しいので、まず隣を確かめる
+                probe = lo + 1 if lo + 1 < hi else (lo + hi) // 2
+            else:
+                hi = probe
+                probe = hi - 1 if hi - 1 > lo else (lo + hi) // 2
+            if not lo < probe < hi:
+                probe = (lo + hi) // 2
+
+        # 1 単語だけで収まらない場合もその単語で 1 行にする
+        stop = max(lo, start + 1)
+        line = "".join(words[start:stop]).strip()
+        if line:
+            lines.append(line)
+        start = stop
     return lines or [text]
 
 
@@ -182,20 +360,91 @@ def _is_cjk(char: str) -> bool:
 
 # ─── メイン描画 ───────────────────────────────────────────
 
-def generate_header(title: str, subtitle: str | None, output: str):
+@functools.lru_cache(maxsize=1)
+def _measure_draw() -> ImageDraw.ImageDraw:
+    """レイアウト計測用の描画コンテキスト（textbbox は描画先の内容に依存しない）"""
+    return ImageDraw.Draw(Image.new("RGB", (1, 1), BG_COLOR))
+
+
+@functools.lru_cache(maxsize=256)
+def layout_lines(text: str, size: int) -> tuple[tuple[str, int], ...]:
+    """折り返した各行と行の高さ（テキスト・サイズごとにメモ化）"""
+    draw = _measure_draw()
+    font = load_font(size)
+    result = []
+    for line in wrap_text(draw, text, font, CONTENT_WIDTH):
+        bbox = draw.textbbox((0, 0), line, font=font)
+        result.append((line, bbox[3] - bbox[1]))
+    return tuple(result)
+
+
+def fits_content(title: str, subtitle: str | None, title_size: int, subtitle_size: int) -> bool:
+    """指定サイズで全行が下マージンより上に収まるか（render_header と同じ行送り）"""
+    bottom = CANVAS_HEIGHT - MARGIN_BOTTOM
+    y = MARGIN_TOP
+    for _, line_height in layout_lines(title, title_size):
+        if y + line_height > bottom:
+            return False
+        y += int(line_height * LINE_SPACING_TITLE)
+    if subtitle:
+        y += TITLE_SUBTITLE_GAP
+        for _, line_height in layout_lines(subtitle, subtitle_size):
+            if y + line_height > bottom:
+                return False
+            y += int(line_height * LINE_SPACING_SUBTITLE)
+    return True
+
+
+def subtitle_size_for(title_size: int) -> int:
+    """タイトルサイズに比例したサブタイトルサイズ（既定の比率を保つ）"""
+    scaled = round(title_size * SUBTITLE_FONT_SIZE / TITLE_FONT_SIZE)
+    return min(SUBTITLE_FONT_SIZE, max(MIN_SUBTITLE_FONT_SIZE, scaled))
+
+
+def fit_font_sizes(title: str, subtitle: str | None) -> tuple[int, int]:
+    """
+    収まる最大の (タイトル, サブタイトル) フォントサイズを二分探索で求める
+
+    サイズを小さくすると行数・行の高さは増えないので、収まるかどうかは単調。
+    既定サイズで収まれば 1 回、そうでなくても log2(72 - 40) ≈ 5 回のレイアウトで決まる。
+    下限でも収まらない場合は下限サイズを返す（render_header が警告して切り捨てる）。
+    """
+    if fits_content(title, subtitle, TITLE_FONT_SIZE, SUBTITLE_FONT_SIZE):
+        return TITLE_FONT_SIZE, SUBTITLE_FONT_SIZE
+
+    lo, hi = MIN_TITLE_FONT_SIZE, TITLE_FONT_SIZE - 1
+    best = MIN_TITLE_FONT_SIZE
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if fits_content(title, subtitle, mid, subtitle_size_for(mid)):
+            best = mid
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return best, subtitle_size_for(best)
+
+
+def generate_header(title: str, subtitle: str | None, output: str, auto_fit: bool = False):
+    img = render_header(title, subtitle, auto_fit)
+    img.save(output)
+    print(f"✅ ヘッダー画像を保存しました: {output} ({CANVAS_WIDTH}x{CANVAS_HEIGHT}px)")
+
+
+def render_header(title: str, subtitle: str | None, auto_fit: bool = False) -> Image.Image:
     img = Image.new("RGB", (CANVAS_WIDTH, CANVAS_HEIGHT), BG_COLOR)
     draw = ImageDraw.Draw(img)
 
-    title_font = load_font(TITLE_FONT_SIZE)
-    subtitle_font = load_font(SUBTITLE_FONT_SIZE) if subtitle else None
+    if auto_fit:
+        title_size, subtitle_size = fit_font_sizes(title, subtitle)
+    else:
+        title_size, subtitle_size = TITLE_FONT_SIZE, SUBTITLE_FONT_SIZE
+    title_font = load_font(title_size)
+    subtitle_font = load_font(subtitle_size) if subtitle else None
 
     y = MARGIN_TOP
 
     # タイトル描画
-    title_lines = wrap_text(draw, title, title_font, CONTENT_WIDTH)
-    for line in title_lines:
-        bbox = draw.textbbox((0, 0), line, font=title_font)
-        line_height = bbox[3] - bbox[1]
+    for line, line_height in layout_lines(title, title_size):
         # 下マージン超えチェック
         if y + line_height > CANVAS_HEIGHT - MARGIN_BOTTOM:
             print("警告: タイトルが下マージンを超えます。フォントサイズを小さくするか、テキストを短くしてください。", file=sys.stderr)
@@ -205,31 +454,149 @@ def generate_header(title: str, subtitle: str | None, output: str):
 
     # サブタイトル描画
     if subtitle and subtitle_font:
-        y += 24  # タイトルとの間隔
-        subtitle_lines = wrap_text(draw, subtitle, subtitle_font, CONTENT_WIDTH)
-        for line in subtitle_lines:
-            bbox = draw.textbbox((0, 0), line, font=subtitle_font)
-            line_height = bbox[3] - bbox[1]
+        y += TITLE_SUBTITLE_GAP
+        for line, line_height in layout_lines(subtitle, subtitle_size):
             if y + line_height > CANVAS_HEIGHT - MARGIN_BOTTOM:
                 print("警告: サブタイトルが下マージンを超えます。", file=sys.stderr)
                 break
             draw.text((MARGIN_H, y), line, font=subtitle_font, fill=SUBTITLE_COLOR)
             y += int(line_height * LINE_SPACING_SUBTITLE)
 
-    img.save(output)
-    print(f"✅ ヘッダー画像を保存しました: {output} ({CANVAS_WIDTH}x{CANVAS_HEIGHT}px)")
+    return img
+
+
+# ─── バッチ生成 ───────────────────────────────────────────
+
+def load_manifest(path: str) -> list[dict]:
+    """
+    マニフェストを読み込み、{title, subtitle, output} のリストを返す
+
+    形式は拡張子で判定: .csv（ヘッダー行あり）/ .jsonl / .yaml・.yml
+    （リスト、または headers キーにリスト）。output 省略時は header-<番号>.png。
+    """
+    manifest = Path(path)
+    suffix = manifest.suffix.lower()
+    with open(manifest, encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            rows = list(csv.DictReader(f))
+        elif suffix == ".jsonl":
+            rows = [json.loads(line) for line in f if line.strip()]
+        elif suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("エラー: YAML マニフェストには PyYAML が必要です（pip install pyyaml）")
+            data = yaml.safe_load(f) or []
+            rows = data.get("headers", []) if isinstance(data, dict) else data
+        else:
+            raise SystemExit(f"エラー: 未対応のマニフェスト形式です: {path}（.csv / .jsonl / .yaml）")
+
+    entries = []
+    for index, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            raise SystemExit(f"エラー: マニフェスト {index} 件目が不正です: {row!r}")
+        output = manifest_field(row, "output") or f"header-{index}.png"
+        entries.append({
+            "title": manifest_field(row, "title"),
+            "subtitle": manifest_field(row, "subtitle") or None,
+            "output": str(manifest.parent / output),
+        })
+    return entries
+
+
+def manifest_field(row: dict, key: str) -> str:
+    """マニフェストの値を文字列で取得（YAML / JSONL の数値・日付等も str に変換）"""
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def warm_fonts():
+    """フォント解決とロードを先に済ませる（バッチのワーカー初期化用）"""
+    load_font(TITLE_FONT_SIZE)
+    load_font(SUBTITLE_FONT_SIZE)
+
+
+def render_entry(entry: dict) -> tuple[str, float, str | None]:
+    """
+    マニフェストの 1 件を描画して保存
+
+    Returns:
+        (出力パス, 所要秒数, エラーメッセージ or None)
+    """
+    start = time.perf_counter()
+    try:
+        if not entry["title"]:
+            raise ValueError("title がありません")
+        img = render_header(entry["title"], entry["subtitle"], entry.get("auto_fit", False))
+        Path(entry["output"]).parent.mkdir(parents=True, exist_ok=True)
+        img.save(entry["output"])
+        error = None
+    except Exception as e:
+        error = str(e)
+    return entry["output"], time.perf_counter() - start, error
+
+
+def generate_batch(manifest: str, jobs: int, auto_fit: bool = False) -> int:
+    """
+    マニフェストの全画像を生成し、画像ごとの所要時間を表示
+
+    Returns:
+        失敗した件数
+    """
+    entries = load_manifest(manifest)
+    for entry in entries:
+        entry["auto_fit"] = auto_fit
+    start = time.perf_counter()
+    if jobs > 1 and len(entries) > 1:
+        # fork ならワーカーは解決済みフォントを引き継ぐ。spawn（macOS）でも
+        # initializer でワーカーごとに 1 回だけロードする
+        warm_fonts()
+        with ProcessPoolExecutor(max_workers=jobs, initializer=warm_fonts) as pool:
+            results = pool.map(render_entry, entries)
+            failures = report_batch(results)
+    else:
+        failures = report_batch(map(render_entry, entries))
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(entries) - failures}/{len(entries)} 件生成しました（{elapsed:.2f}s, jobs={jobs}）")
+    return failures
+
+
+def report_batch(results) -> int:
+    failures = 0
+    for output, seconds, error in results:
+        if error:
+            failures += 1
+            print(f"❌ {output}: {error} ({seconds * 1000:.0f}ms)", file=sys.stderr)
+        else:
+            print(f"✅ {output} ({seconds * 1000:.0f}ms)", flush=True)
+    return failures
 
 
 # ─── CLI ─────────────────────────────────────────────────
 
 def main():
     parser = argparse.ArgumentParser(description="X Articles ヘッダー画像生成")
-    parser.add_argument("--title", required=True, help="英語タイトル（必須）")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--title", help="英語タイトル（--batch を使わない場合は必須）")
+    source.add_argument("--batch", metavar="MANIFEST", help="マニフェスト（CSV / JSONL / YAML）の全画像を生成")
     parser.add_argument("--subtitle", default=None, help="日本語サブタイトル（任意）")
-    parser.add_argument("--output", default="header.png", help="出力ファイルパス（デフォルト: header.png）")
+    parser.add_argument("--output", default=None, help="出力ファイルパス（デフォルト: header.png）")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="バッチモードの並列プロセス数（デフォルト: 1）")
+    parser.add_argument("--auto-fit", action="store_true", help="収まらない場合にフォントサイズを自動で縮小")
     args = parser.parse_args()
 
-    generate_header(args.title, args.subtitle, args.output)
+    if args.batch:
+        # 画像ごとの subtitle・output はマニフェストで指定する
+        if args.subtitle is not None or args.output is not None:
+            parser.error("--subtitle・--output は --batch と併用できません（マニフェストで指定してください）")
+        if args.jobs < 1:
+            parser.error("--jobs は 1 以上を指定してください")
+        if generate_batch(args.batch, args.jobs, args.auto_fit):
+            sys.exit(1)
+        return
+
+    generate_header(args.title, args.subtitle, args.output or "header.png", args.auto_fit)
 
 
 if __name__ == "__main__":
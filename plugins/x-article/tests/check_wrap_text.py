@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+header-image.py の wrap_text() をゴールデンデータと照合する
+
+wrap_text_golden.json の各ケース（text・size・max_width）を現在の wrap_text() で
+折り返し、lines（二分探索化する前の逐次版 wrap_text の出力）と一致するか確かめる。
+
+フォントは実フォントではなく、決定的な代替フォント（StandInFont）を使う。
+環境ごとに解決されるフォントが違っても結果が変わらないようにするため。
+代替フォントはカーニングと左右のベアリングを持つので、単語の送り幅の
+累積和（wrap_text の見積もり）と textbbox の幅は一致しない。
+
+使い方:
+  python3 check_wrap_text.py            # 不一致があれば終了コード 1
+  python3 check_wrap_text.py --golden path/to/golden.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent
+SCRIPT = TESTS_DIR.parent / "scripts" / "header-image.py"
+GOLDEN = TESTS_DIR / "wrap_text_golden.json"
+
+# 1 em あたりの送り幅
+NARROW = set("iljtf.,:;'!|")
+WIDE = set("mwMW@")
+KERNING = {
+    "AV": -0.08, "VA": -0.08, "To": -0.07, "Te": -0.06, "Ty": -0.05,
+    "Wa": -0.05, "LT": -0.09, "yo": -0.02, "r.": -0.04, "」。": -0.25,
+}
+LEFT_BEARING = set("bdhklpBDEFHIKLMNPR")
+RIGHT_BEARING = set("fry")
+
+
+def _is_cjk(char: str) -> bool:
+    cp = ord(char)
+    return 0x4E00 <= cp <= 0x9FFF or 0x3040 <= cp <= 0x30FF or 0xFF00 <= cp <= 0xFFEF
+
+
+class StandInFont:
+    """文字種ごとの送り幅・カーニング・ベアリングを持つ決定的なフォント"""
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def _char_advance(self, char: str) -> float:
+        if _is_cjk(char) or char in "「」。、":
+            em = 1.0
+        elif char == " ":
+            em = 0.3
+        elif char in NARROW:
+            em = 0.28
+        elif char in WIDE:
+            em = 0.85
+        elif char.isupper():
+            em = 0.68
+        elif char.isdigit():
+            em = 0.56
+        else:
+            em = 0.52
+        return em * self.size
+
+    def getlength(self, text: str) -> float:
+        width = sum(self._char_advance(char) for char in text)
+        for pair in zip(text, text[1:]):
+            width += KERNING.get("".join(pair), 0.0) * self.size
+        return width
+
+    def bbox(self, text: str) -> tuple[float, float, float, float]:
+        if not text:
+            return (0, 0, 0, 0)
+        left = (0.04 if text[0] in LEFT_BEARING else 0.02) * self.size
+        right = self.getlength(text) - (0.03 if text[-1] in RIGHT_BEARING else 0.0) * self.size
+        return (left, 0, right, self.size)
+
+
+class StandInDraw:
+    """ImageDraw の代わり（wrap_text が使う textbbox のみ）"""
+
+    def textbbox(self, xy, text: str, font: StandInFont):
+        return font.bbox(text)
+
+
+def load_wrap_text():
+    """header-image.py（ファイル名にハイフンを含む）から wrap_text を読み込む"""
+    spec = importlib.util.spec_from_file_location("header_image", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.wrap_text
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="wrap_text() のゴールデンテスト")
+    parser.add_argument("--golden", default=str(GOLDEN), help="ゴールデンデータ（JSON）")
+    args = parser.parse_args()
+
+    wrap_text = load_wrap_text()
+    cases = json.loads(Path(args.golden).read_text(encoding="utf-8"))["cases"]
+    draw = StandInDraw()
+    fonts: dict[int, StandInFont] = {}
+
+    failures = 0
+    for index, case in enumerate(cases):
+        font = fonts.setdefault(case["size"], StandInFont(case["size"]))
+        lines = wrap_text(draw, case["text"], font, case["max_width"])
+        if lines != case["lines"]:
+            failures += 1
+            print(f"❌ case {index}: size={case['size']} max_width={case['max_width']}")
+            print(f"   text:     {case['text']!r}")
+            print(f"   expected: {case['lines']!r}")
+            print(f"   actual:   {lines!r}")
+
+    print(f"{len(cases) - failures}/{len(cases)} 件一致")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+#!/usr/bin/env bats
+# Golden test: wrap_text() in header-image.py keeps its line output
+
+PLUGIN_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/.." && pwd)"
+
+@test "wrap_text matches the golden line breaks" {
+    python3 -c 'import PIL' 2>/dev/null || skip "Pillow is required"
+    run python3 "${PLUGIN_ROOT}/tests/check_wrap_text.py"
+    [ "$status" -eq 0 ]
+}
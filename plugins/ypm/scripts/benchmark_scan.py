@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+scan_projects.py のベンチマーク
+
+合成したリポジトリ群（ファーム）をローカルに生成し、find_projects・
+get_git_info・read_project_docs・main() の所要時間を規模ごとに計測して
+JSON で出力する。ネットワークは使わない（Linux / macOS、git が必要）。
+
+ファームの構成（--seed で決定的に生成）:
+    - 最終コミットの日付で active / developing / dormant / unknown（コミット無し）に分かれる
+      リポジトリ（履歴の深さ --depth、追跡ファイル数 --files）
+    - 未コミットの変更（--dirty ファイル）
+    - ネストしたパターン（group-*/*）配下のリポジトリ（--nested の割合）
+    - Git worktree（--worktrees の割合）
+    - exclude に該当して検出されないリポジトリ（--excluded の割合）
+    - PATH 上のスタブ trufflehog（--trufflehog-latency 秒待って何も検出しない）
+
+HOME はファーム内のディレクトリに差し替えるため、~/.ypm のキャッシュ等には影響しない。
+
+使用方法:
+    python scripts/benchmark_scan.py
+    python scripts/benchmark_scan.py --scales 10,100,1000,5000 --output bench.json
+    python scripts/benchmark_scan.py --compare bench.json --threshold 1.25
+
+出力:
+    JSON形式で標準出力（--output 指定時はファイル）に出力。進捗は標準エラー出力。
+    --compare 指定時は中央値が threshold 倍を超えて遅くなった計測があれば終了コード 1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+
+# 規模（リポジトリ数）
+DEFAULT_SCALES = [10, 100, 1000]
+
+# 最終コミットの経過日数（config.yml の既定値 active_days=7 / inactive_days=30 に対して）
+AGE_DAYS = {"active": 1, "developing": 14, "dormant": 120}
+
+# 分類ごとの割合（残りは unknown: コミットの無いリポジトリ）
+CATEGORY_WEIGHTS = {"active": 0.3, "developing": 0.2, "dormant": 0.45, "unknown": 0.05}
+
+# 生成するファームの config.yml
+FARM_PATTERNS = ["*", "group-*/*"]
+FARM_EXCLUDES = ["node_modules"]
+NESTED_GROUPS = 10
+
+# 計測時の git の設定（ユーザーの設定に依存しないように）
+FARM_GIT_CONFIG = {
+    # コピーしたリポジトリは inode・ctime が変わるため、mtime とサイズだけで比較する
+    'core.checkStat': 'minimal',
+    'core.trustctime': 'false',
+}
+
+STUB_TRUFFLEHOG = """#!/bin/sh
+# benchmark_scan.py のスタブ: 待つだけで何も検出しない
+sleep "${YPM_BENCH_TRUFFLEHOG_LATENCY:-0}"
+exit 0
+"""
+
+
+def progress(**fields):
+    """進捗を標準エラー出力に出力"""
+    print(json.dumps({"benchmark": fields}), file=sys.stderr, flush=True)
+
+
+def git(args, cwd=None, input=None):
+    """ファーム生成用に git を実行（失敗したら例外）"""
+    subprocess.run(
+        ['git'] + args, cwd=cwd, input=input, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+
+
+def fast_import_stream(files, depth, head_timestamp):
+    """
+    git fast-import に渡す履歴を生成
+
+    depth 個のコミットを1時間おきに作り、最後のコミットの日時を head_timestamp にする。
+    最初のコミットで全ファイルを追加し、以降は1ファイルずつ書き換える。
+    """
+    chunks = []
+
+    def data(content):
+        encoded = content.encode('utf-8')
+        chunks.append(f"data {len(encoded)}\n".encode('utf-8') + encoded + b"\n")
+
+    for index in range(depth):
+        timestamp = head_timestamp - (depth - 1 - index) * 3600
+        chunks.append(
+            f"commit refs/heads/main\nmark :{index + 1}\n"
+            f"committer Bench <bench@example.invalid> {timestamp} +0000\n".encode('utf-8')
+        )
+        data(f"Commit {index + 1}\n")
+        if index > 0:
+            chunks.append(f"from :{index}\n".encode('utf-8'))
+        if index == 0:
+            changed = files
+        else:
+            changed = [files[index % len(files)]]
+        for name in changed:
+            chunks.append(f"M 100644 inline {name}\n".encode('utf-8'))
+            data(file_content(name, index))
+    return b"".join(chunks)
+
+
+def file_content(name, revision):
+    """追跡ファイルの内容"""
+    if name == 'README.md':
+        return (
+            "# Benchmark Project\n\n"
+            "Synthetic repository generated by benchmark_scan.py.\n"
+            f"Phase 2: core implementation (revision {revision})\n"
+        )
+    return "".join(f"value_{i} = {revision * 100 + i}\n" for i in range(40))
+
+
+def build_template(path, category, depth, files, now):
+    """分類ごとのテンプレートリポジトリを生成（各リポジトリはこれをコピーする）"""
+    path.mkdir(parents=True)
+    git(['init', '-q'], cwd=path)
+    for key, value in FARM_GIT_CONFIG.items():
+        git(['config', key, value], cwd=path)
+    git(['symbolic-ref', 'HEAD', 'refs/heads/main'], cwd=path)
+    if category == 'unknown':
+        return
+
+    names = ['README.md'] + [f"src/module_{i:03d}.py" for i in range(max(0, files - 1))]
+    head_timestamp = int(now - AGE_DAYS[category] * 86400)
+    git(['fast-import', '--quiet'], cwd=path,
+        input=fast_import_stream(names, depth, head_timestamp))
+    git(['reset', '-q', '--hard'], cwd=path)
+
+    # index より古い mtime にして racy git（毎回の再ハッシュ）を避ける
+    past = now - 86400
+    for name in names:
+        os.utime(path / name, (past, past))
+    git(['update-index', '-q', '--refresh'], cwd=path)
+
+
+def build_farm(root, count, depth, files, dirty, nested, worktrees, excluded, seed):
+    """
+    count 個の（検出される）リポジトリを持つファームを生成
+
+    Returns:
+        {'workspace', 'config', 'home', 'bin', 'layout'}
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    workspace = root / "workspace"
+    home = root / "home"
+    bin_dir = root / "bin"
+    templates = root / "templates"
+    for directory in (workspace, home / ".ypm", bin_dir):
+        directory.mkdir(parents=True)
+
+    stub = bin_dir / "trufflehog"
+    stub.write_text(STUB_TRUFFLEHOG, encoding='utf-8')
+    stub.chmod(0o755)
+
+    for category in CATEGORY_WEIGHTS:
+        build_template(templates / category, category, depth, files, now)
+
+    categories = list(CATEGORY_WEIGHTS)
+    weights = [CATEGORY_WEIGHTS[category] for category in categories]
+    layout = {category: 0 for category in categories}
+    layout.update({'nested': 0, 'worktrees': 0, 'excluded': 0})
+
+    worktree_count = int(count * worktrees) if count > 1 else 0
+    repo_count = count - worktree_count
+    repos = []
+    for index in range(repo_count):
+        category = rng.choices(categories, weights)[0]
+        if rng.random() < nested:
+            parent = workspace / f"group-{rng.randrange(NESTED_GROUPS):02d}"
+            layout['nested'] += 1
+        else:
+            parent = workspace
+        repo = parent / f"repo-{index:05d}"
+        shutil.copytree(templates / category, repo, symlinks=True)
+        layout[category] += 1
+        for n in range(dirty):
+            (repo / f"untracked_{n}.txt").write_text(f"dirty {n}\n", encoding='utf-8')
+        if category != 'unknown':
+            repos.append(repo)
+
+    for index in range(worktree_count if repos else 0):
+        source = repos[index % len(repos)]
+        git(['worktree', 'add', '-q', '-b', f"wt-{index:05d}",
+             str(workspace / f"wt-{index:05d}")], cwd=source)
+        layout['worktrees'] += 1
+
+    # exclude に該当する（検出されてはいけない）リポジトリ
+    for index in range(int(count * excluded)):
+        parent = workspace
+        if rng.random() < nested:
+            parent = workspace / f"group-{rng.randrange(NESTED_GROUPS):02d}"
+        shutil.copytree(templates / 'active', parent / f"node_modules-{index:05d}",
+                        symlinks=True)
+        layout['excluded'] += 1
+
+    config = {
+        'monitor': {
+            'directories': [str(workspace)],
+            'patterns': FARM_PATTERNS,
+            'exclude': FARM_EXCLUDES,
+        },
+        'classification': {'active_days': 7, 'inactive_days': 30},
+    }
+    config_path = home / ".ypm" / "config.yml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding='utf-8')
+
+    return {
+        'workspace': workspace,
+        'config': config_path,
+        'home': home,
+        'bin': bin_dir,
+        'layout': layout,
+    }
+
+
+def percentile(values, p):
+    """nearest-rank 方式のパーセンタイル"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(run_seconds, call_seconds=None):
+    """計測結果（秒）をミリ秒の統計にまとめる"""
+    ms = [s * 1000 for s in run_seconds]
+    result = {
+        "runs": len(ms),
+        "min_ms": round(min(ms), 3),
+        "median_ms": round(percentile(ms, 50), 3),
+        "max_ms": round(max(ms), 3),
+    }
+    if call_seconds:
+        calls = [s * 1000 for s in call_seconds]
+        result["calls"] = len(calls)
+        result["call_p50_ms"] = round(percentile(calls, 50), 3)
+        result["call_p95_ms"] = round(percentile(calls, 95), 3)
+        result["call_max_ms"] = round(max(calls), 3)
+    return result
+
+
+def time_per_project(func, paths, repeat):
+    """paths 全体に func を適用する1パスを repeat 回計測"""
+    runs, calls = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for path in paths:
+            call_started = time.perf_counter()
+            func(path)
+            calls.append(time.perf_counter() - call_started)
+        runs.append(time.perf_counter() - started)
+    return summarize(runs, calls)
+
+
+def time_main(scanner, argv, repeat, before_run=None):
+    """scan_projects.main() を同一プロセス内で repeat 回実行して計測（出力は捨てる）"""
+    runs = []
+    for _ in range(repeat):
+        if before_run is not None:
+            before_run()
+        saved_argv = sys.argv
+        sys.argv = ['scan_projects.py'] + argv
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), \
+                    contextlib.redirect_stderr(io.StringIO()):
+                started = time.perf_counter()
+                scanner.main()
+                runs.append(time.perf_counter() - started)
+        finally:
+            sys.argv = saved_argv
+    return summarize(runs)
+
+
+def run_scale(scanner, farm, repeat, jobs):
+    """1つの規模のファームで全計測を実行"""
+    config = scanner.read_config(farm['config'])
+    settings = scanner.scan_settings(config)
+
+    benchmarks = {}
+    runs = []
+    projects = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        projects = scanner.find_projects(
+            settings['base_dirs'], settings['patterns'], settings['excludes']
+        )
+        runs.append(time.perf_counter() - started)
+    benchmarks["find_projects"] = summarize(runs)
+
+    benchmarks["get_git_info"] = time_per_project(
+        lambda path: scanner.get_git_info(path), projects, repeat
+    )
+    benchmarks["get_git_info_no_reader"] = time_per_project(
+        lambda path: scanner.get_git_info(path, use_git_reader=False), projects, repeat
+    )
+    benchmarks["read_project_docs"] = time_per_project(
+        scanner.read_project_docs, projects, repeat
+    )
+
+    ypm_dir = farm['home'] / ".ypm"
+
+    def reset_state():
+        for name in ("scan_cache.json", "trufflehog_state.json"):
+            with contextlib.suppress(FileNotFoundError):
+                (ypm_dir / name).unlink()
+
+    argv = ['--config', str(farm['config']), '--jobs', str(jobs)]
+    # 初回相当: キャッシュも TruffleHog の状態も無い
+    benchmarks["main_cold"] = time_main(scanner, argv, repeat, before_run=reset_state)
+    # 2回目以降相当: キャッシュ・TruffleHog の状態あり（直前の実行で生成済み）
+    time_main(scanner, argv, 1)
+    benchmarks["main_warm"] = time_main(scanner, argv, repeat)
+    benchmarks["main_query"] = time_main(
+        scanner, argv + ['--no-cache', '--category', 'active', '--fields', 'branch,last_commit'],
+        repeat
+    )
+
+    return len(projects), benchmarks
+
+
+def compare_results(current, baseline, threshold):
+    """
+    ベースラインと中央値を比較
+
+    Returns:
+        (比較結果のリスト, threshold を超えて遅くなった計測があるか)
+    """
+    previous = {
+        (entry['scale'], name): stats['median_ms']
+        for entry in baseline.get('results', [])
+        for name, stats in entry.get('benchmarks', {}).items()
+    }
+    comparison = []
+    regressed = False
+    for entry in current['results']:
+        for name, stats in entry['benchmarks'].items():
+            before = previous.get((entry['scale'], name))
+            if not before:
+                continue
+            ratio = stats['median_ms'] / before
+            regression = ratio > threshold
+            regressed |= regression
+            comparison.append({
+                "scale": entry['scale'],
+                "benchmark": name,
+                "baseline_ms": before,
+                "median_ms": stats['median_ms'],
+                "ratio": round(ratio, 3),
+                "regression": regression,
+            })
+    return comparison, regressed
+
+
+def git_version():
+    try:
+        result = subprocess.run(['git', '--version'], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def scale_list(value):
+    """argparse用: カンマ区切りの規模（1以上の整数）"""
+    try:
+        scales = [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid scales: {value!r}")
+    if not scales or min(scales) < 1:
+        raise argparse.ArgumentTypeError(f"invalid scales: {value!r}")
+    return scales
+
+
+def ratio(value):
+    """argparse用: 0以上1以下の割合"""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ratio: {value!r}")
+    if not 0 <= number <= 1:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 1: {value}")
+    return number
+
+
+def parse_args():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description='YPM scan_projects.py benchmark')
+    parser.add_argument(
+        '--scales',
+        type=scale_list,
+        default=DEFAULT_SCALES,
+        help='Comma-separated numbers of repositories (default: '
+             f'{",".join(map(str, DEFAULT_SCALES))})'
+    )
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per benchmark (default: 3)')
+    parser.add_argument('--depth', type=int, default=20,
+                        help='Commits per repository (default: 20)')
+    parser.add_argument('--files', type=int, default=20,
+                        help='Tracked files per repository (default: 20)')
+    parser.add_argument('--dirty', type=int, default=2,
+                        help='Untracked files per repository (default: 2)')
+    parser.add_argument('--nested', type=ratio, default=0.3,
+                        help='Share of repositories under group-*/ (default: 0.3)')
+    parser.add_argument('--worktrees', type=ratio, default=0.05,
+                        help='Share of projects that are git worktrees (default: 0.05)')
+    parser.add_argument('--excluded', type=ratio, default=0.05,
+                        help='Extra repositories (relative to the scale) matched by '
+                             'exclude (default: 0.05)')
+    parser.add_argument('--trufflehog-latency', type=float, default=0.01,
+                        metavar='SECONDS',
+                        help='Time the stub trufflehog takes per scan (default: 0.01)')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='--jobs passed to scan_projects.py (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for the farm layout (default: 0)')
+    parser.add_argument('--workdir', type=str, default=None,
+                        help='Directory to build farms in (default: a temporary directory)')
+    parser.add_argument('--keep', action='store_true',
+                        help='Keep the generated farms')
+    parser.add_argument('--output', '-o', type=str, default=None,
+                        help='Write results to this file instead of stdout')
+    parser.add_argument('--compare', type=str, default=None, metavar='BASELINE',
+                        help='Compare medians with a previous result file')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='--compare: ratio above which a benchmark counts as a '
+                             'regression (default: 1.25)')
+    return parser.parse_args()
+
+
+def main():
+    """メイン処理"""
+    args = parse_args()
+    if shutil.which('git') is None:
+        print(json.dumps({"error": "git command not found"}), file=sys.stderr)
+        sys.exit(1)
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='ypm-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    # ユーザーの git 設定・~/.ypm に依存しない（scan_projects は HOME を実行時に参照する）
+    os.environ['GIT_CONFIG_NOSYSTEM'] = '1'
+    os.environ['YPM_BENCH_TRUFFLEHOG_LATENCY'] = str(args.trufflehog_latency)
+    original_home = os.environ.get('HOME')
+    original_path = os.environ.get('PATH', '')
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import scan_projects
+
+    result = {
+        "version": 1,
+        "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git": git_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "repeat": args.repeat,
+            "depth": args.depth,
+            "files": args.files,
+            "dirty": args.dirty,
+            "nested": args.nested,
+            "worktrees": args.worktrees,
+            "excluded": args.excluded,
+            "trufflehog_latency": args.trufflehog_latency,
+            "jobs": args.jobs,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+
+    try:
+        for scale in args.scales:
+            root = workdir / f"farm-{scale}"
+            if root.exists():
+                shutil.rmtree(root)
+
+            progress(scale=scale, phase="build")
+            os.environ['HOME'] = str(root / "home")
+            started = time.perf_counter()
+            farm = build_farm(root, scale, args.depth, args.files, args.dirty,
+                              args.nested, args.worktrees, args.excluded, args.seed)
+            build_seconds = time.perf_counter() - started
+
+            progress(scale=scale, phase="measure")
+            os.environ['PATH'] = f"{farm['bin']}{os.pathsep}{original_path}"
+            found, benchmarks = run_scale(scan_projects, farm, args.repeat, args.jobs)
+            os.environ['PATH'] = original_path
+
+            result["results"].append({
+                "scale": scale,
+                "projects_found": found,
+                "layout": farm['layout'],
+                "build_seconds": round(build_seconds, 3),
+                "benchmarks": benchmarks,
+            })
+            if not args.keep:
+                shutil.rmtree(root)
+    finally:
+        os.environ['PATH'] = original_path
+        if original_home is not None:
+            os.environ['HOME'] = original_home
+        if not args.keep and args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    regressed = False
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        result["comparison"], regressed = compare_results(result, baseline, args.threshold)
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print(json.dumps({"error": "Interrupted by user"}), file=sys.stderr)
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode('utf-8', 'replace').strip() if e.stderr else ''
+        print(json.dumps({"error": f"Failed to build the farm: {e}", "stderr": stderr}),
+              file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+.git ディレクトリの軽量リーダー
+
+gitプロセスを起動せずに、HEAD・ブランチ名・HEADコミットの日時と件名を
+.git から直接読み取る。scan_projects.py の高速パスとして使用する。
+
+対応範囲:
+    - .git ファイル（worktree / submodule）の `gitdir:` 参照と commondir
+    - ルーズref、packed-refs
+    - ルーズオブジェクト、packfile（idx v2、OFS/REF delta を含む）
+
+解釈できない構造（reftable、SHA-256リポジトリ、非UTF-8コミット等）に
+出会った場合は None を返す。呼び出し側は git コマンドにフォールバックすること。
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+
+
+HASH_HEX_LENGTH = 40
+HASH_RAW_LENGTH = 20
+
+PACK_IDX_MAGIC = b'\xfftOc'
+
+OBJ_COMMIT = 1
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+# delta チェーンの最大深さ（git のデフォルト pack.depth は 50）
+MAX_DELTA_DEPTH = 64
+
+
+class GitReadError(Exception):
+    """.git の構造を解釈できない場合の例外"""
+
+
+def resolve_git_dirs(project_path):
+    """
+    プロジェクトの gitdir と commondir を解決
+
+    .git がファイルの場合は `gitdir: <path>` を辿り、
+    さらに commondir があれば共有ディレクトリ（refs・objects の置き場所）を返す。
+
+    Args:
+        project_path: プロジェクトパス
+
+    Returns:
+        (git_dir, common_dir) のタプル
+
+    Raises:
+        GitReadError: 解決できない場合
+    """
+    dot_git = Path(project_path) / ".git"
+
+    if dot_git.is_dir():
+        git_dir = dot_git
+    elif dot_git.is_file():
+        content = _read_text(dot_git)
+        if not content.startswith('gitdir:'):
+            raise GitReadError(f"unexpected .git file: {dot_git}")
+        git_dir = Path(content[len('gitdir:'):].strip())
+        if not git_dir.is_absolute():
+            git_dir = dot_git.parent / git_dir
+        if not git_dir.is_dir():
+            raise GitReadError(f"gitdir not found: {git_dir}")
+    else:
+        raise GitReadError(f"not a git repository: {project_path}")
+
+    common_dir = git_dir
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        common_dir = Path(_read_text(commondir_file).strip())
+        if not common_dir.is_absolute():
+            # 通常は "../.." なので正規化しておく
+            common_dir = Path(os.path.normpath(git_dir / common_dir))
+
+    # reftable 形式の refs には未対応
+    if (common_dir / "reftable").exists():
+        raise GitReadError("reftable ref storage is not supported")
+
+    return git_dir, common_dir
+
+
+def read_packed_refs(common_dir):
+    """
+    packed-refs を読み込み
+
+    Returns:
+        {ref名: SHA-1} の辞書（ファイルが無ければ空辞書）
+    """
+    refs = {}
+    packed_refs = Path(common_dir) / "packed-refs"
+    try:
+        content = _read_text(packed_refs)
+    except FileNotFoundError:
+        return refs
+
+    for line in content.splitlines():
+        # ヘッダ行（#）とピール行（^）は不要
+        if not line or line[0] in '#^':
+            continue
+        sha, _, name = line.partition(' ')
+        refs[name] = sha
+    return refs
+
+
+def resolve_ref(git_dir, common_dir, ref_name, packed_refs=None):
+    """
+    ref名をSHA-1に解決（シンボリックrefも辿る）
+
+    Returns:
+        SHA-1（16進文字列）、存在しない場合は None
+    """
+    for _ in range(10):
+        # worktree 固有の ref（HEAD 等）は git_dir、それ以外は common_dir
+        content = None
+        for base in (git_dir, common_dir):
+            try:
+                content = _read_text(Path(base) / ref_name).strip()
+                break
+            except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+                continue
+
+        if content is None:
+            if packed_refs is None:
+                packed_refs = read_packed_refs(common_dir)
+            return packed_refs.get(ref_name)
+
+        if content.startswith('ref:'):
+            ref_name = content[len('ref:'):].strip()
+            continue
+
+        if not _is_hex_sha(content):
+            raise GitReadError(f"unexpected ref content in {ref_name}")
+        return content
+
+    raise GitReadError(f"symbolic ref loop: {ref_name}")
+
+
+def read_object(common_dir, sha):
+    """
+    オブジェクトを読み込み（ルーズオブジェクト → packfile の順に探す）
+
+    Returns:
+        (type番号, 本体bytes) のタプル
+
+    Raises:
+        GitReadError: 見つからない・解釈できない場合
+    """
+    objects_dir = Path(common_dir) / "objects"
+
+    loose_path = objects_dir / sha[:2] / sha[2:]
+    try:
+        with open(loose_path, 'rb') as f:
+            raw = zlib.decompress(f.read())
+    except FileNotFoundError:
+        raw = None
+    except zlib.error as e:
+        raise GitReadError(f"corrupt loose object {sha}: {e}")
+
+    if raw is not None:
+        header, _, body = raw.partition(b'\0')
+        obj_type, _, _ = header.partition(b' ')
+        if obj_type != b'commit':
+            raise GitReadError(f"unexpected object type {obj_type!r} for {sha}")
+        return OBJ_COMMIT, body
+
+    pack_dir = objects_dir / "pack"
+    raw_sha = bytes.fromhex(sha)
+    try:
+        idx_names = sorted(
+            name for name in os.listdir(pack_dir) if name.endswith('.idx')
+        )
+    except FileNotFoundError:
+        idx_names = []
+
+    for idx_name in idx_names:
+        idx_path = pack_dir / idx_name
+        offset = _find_in_pack_index(idx_path, raw_sha)
+        if offset is not None:
+            pack_path = idx_path.with_suffix('.pack')
+            return _read_pack_object(pack_path, idx_path, offset, 0)
+
+    raise GitReadError(f"object not found: {sha}")
+
+
+def parse_commit(body):
+    """
+    コミットオブジェクトをパース
+
+    Returns:
+        (committer_timestamp, author_timestamp, subject) のタプル
+        subject は `git log --format=%s` と同じ（先頭段落を空白で連結）
+    """
+    try:
+        text = body.decode('utf-8')
+    except UnicodeDecodeError:
+        raise GitReadError("commit is not UTF-8")
+
+    header, _, message = text.partition('\n\n')
+
+    committer_time = None
+    author_time = None
+    for line in header.split('\n'):
+        if line.startswith('encoding '):
+            encoding = line[len('encoding '):].strip().lower()
+            if encoding not in ('utf-8', 'utf8'):
+                raise GitReadError(f"unsupported commit encoding: {encoding}")
+        elif line.startswith(('committer ', 'author ')):
+            # committer Name <email> 1700000000 +0900
+            parts = line.rsplit(' ', 2)
+            if len(parts) == 3 and parts[1].isdigit():
+                if line.startswith('committer '):
+                    committer_time = int(parts[1])
+                else:
+                    author_time = int(parts[1])
+
+    if committer_time is None or author_time is None:
+        raise GitReadError("commit has no author or committer timestamp")
+
+    subject_lines = []
+    for line in message.split('\n'):
+        if not line.strip():
+            if subject_lines:
+                break
+            continue
+        subject_lines.append(line.rstrip())
+
+    return committer_time, author_time, ' '.join(subject_lines)
+
+
+def uses_english_dates(environ=None):
+    """
+    git の相対時刻（%ar）が英語で出力されるロケールか
+
+    git は gettext で %ar を翻訳する。メッセージの言語は LC_ALL・LC_MESSAGES・LANG
+    の順で決まり、C/POSIX 以外では LANGUAGE が優先される。
+
+    Args:
+        environ: 環境変数の辞書（None なら os.environ）
+    """
+    if environ is None:
+        environ = os.environ
+
+    locale = ''
+    for name in ('LC_ALL', 'LC_MESSAGES', 'LANG'):
+        if environ.get(name):
+            locale = environ[name]
+            break
+    if not locale or locale in ('C', 'POSIX') or locale.startswith('C.'):
+        return True
+
+    languages = [lang for lang in environ.get('LANGUAGE', '').split(':') if lang]
+    language = languages[0] if languages else locale
+    return language == 'C' or language.startswith('en')
+
+
+def format_relative_date(timestamp, now=None):
+    """
+    `git log --format=%ar` と同じ相対時刻表記を生成
+
+    git の date.c (show_date_relative) と同じ丸め規則を使う。英語のみ対応
+    （uses_english_dates() が False の場合は git の出力と一致しない）。
+    """
+    if now is None:
+        now = int(time.time())
+    if now < timestamp:
+        return "in the future"
+
+    diff = now - timestamp
+    if diff < 90:
+        return _plural(diff, "second") + " ago"
+
+    diff = (diff + 30) // 60
+    if diff < 90:
+        return _plural(diff, "minute") + " ago"
+
+    diff = (diff + 30) // 60
+    if diff < 36:
+        return _plural(diff, "hour") + " ago"
+
+    diff = (diff + 12) // 24
+    if diff < 14:
+        return _plural(diff, "day") + " ago"
+    if diff < 70:
+        return _plural((diff + 3) // 7, "week") + " ago"
+    if diff < 365:
+        return _plural((diff + 15) // 30, "month") + " ago"
+    if diff < 1825:
+        total_months = (diff * 12 * 2 + 365) // (365 * 2)
+        years, months = divmod(total_months, 12)
+        if months:
+            return f"{_plural(years, 'year')}, {_plural(months, 'month')} ago"
+        return _plural(years, "year") + " ago"
+
+    return _plural((diff + 183) // 365, "year") + " ago"
+
+
+def resolve_head(project_path):
+    """
+    HEAD をブランチ名とコミットSHA-1に解決
+
+    Returns:
+        (branch, sha, common_dir) のタプル。branch は `git rev-parse --abbrev-ref HEAD`
+        と同じ値（detached HEAD は "HEAD"）
+
+    Raises:
+        GitReadError: 解釈できない場合（コミットの無いブランチを含む）
+    """
+    git_dir, common_dir = resolve_git_dirs(project_path)
+    head = _read_text(git_dir / "HEAD").strip()
+
+    if head.startswith('ref:'):
+        ref_name = head[len('ref:'):].strip()
+        if not ref_name.startswith('refs/heads/'):
+            raise GitReadError(f"HEAD points outside refs/heads: {ref_name}")
+        branch = ref_name[len('refs/heads/'):]
+        packed_refs = read_packed_refs(common_dir)
+        # 同名タグがあると rev-parse --abbrev-ref は "heads/<name>" を返す
+        tag_name = 'refs/tags/' + branch
+        if tag_name in packed_refs or (Path(common_dir) / tag_name).exists():
+            raise GitReadError(f"branch name is ambiguous: {branch}")
+        sha = resolve_ref(git_dir, common_dir, ref_name, packed_refs)
+    elif _is_hex_sha(head):
+        branch = 'HEAD'
+        sha = head
+    else:
+        raise GitReadError("unexpected HEAD content")
+
+    if sha is None or len(sha) != HASH_HEX_LENGTH:
+        # コミットの無いブランチ・SHA-256 リポジトリは git に任せる
+        raise GitReadError("HEAD does not resolve to a SHA-1 commit")
+
+    return branch, sha, common_dir
+
+
+def read_head_commit(project_path):
+    """
+    HEAD のコミットSHA-1を .git から直接読み取る
+
+    Returns:
+        SHA-1（16進文字列）、解釈できない場合は None
+    """
+    try:
+        _, sha, _ = resolve_head(project_path)
+    except (GitReadError, OSError, ValueError):
+        return None
+    return sha
+
+
+def read_head_info(project_path):
+    """
+    HEAD のブランチ名とコミット情報を .git から直接読み取る
+
+    Args:
+        project_path: プロジェクトパス
+
+    Returns:
+        {'branch', 'last_commit', 'last_commit_timestamp', 'author_timestamp'} の辞書
+        （値は get_git_info() と同じ形式。last_commit の相対時刻は git の %ar と同じく
+        author 日時、last_commit_timestamp は %ct と同じく committer 日時）
+        解釈できない場合、git が相対時刻を英語以外で出力するロケールの場合は None
+        （git コマンドにフォールバックすること）
+    """
+    if not uses_english_dates():
+        return None
+
+    try:
+        branch, sha, common_dir = resolve_head(project_path)
+        obj_type, body = read_object(common_dir, sha)
+        if obj_type != OBJ_COMMIT:
+            return None
+        timestamp, author_timestamp, subject = parse_commit(body)
+    except (GitReadError, OSError, ValueError, struct.error, zlib.error):
+        return None
+
+    return {
+        'branch': branch,
+        'last_commit': f"{format_relative_date(author_timestamp)}|{subject}",
+        'last_commit_timestamp': timestamp,
+        'author_timestamp': author_timestamp,
+    }
+
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _is_hex_sha(value):
+    if len(value) not in (HASH_HEX_LENGTH, 64):
+        return False
+    try:
+        int(value, 16)
+    except ValueError:
+        return False
+    return True
+
+
+def _plural(count, unit):
+    return f"{count} {unit}" if count == 1 else f"{count} {unit}s"
+
+
+def _find_in_pack_index(idx_path, raw_sha):
+    """pack index (v2) を二分探索してオフセットを返す。見つからなければ None"""
+    with open(idx_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as idx:
+            if idx[:4] != PACK_IDX_MAGIC or struct.unpack('>I', idx[4:8])[0] != 2:
+                raise GitReadError(f"unsupported pack index: {idx_path}")
+
+            fanout_base = 8
+            first_byte = raw_sha[0]
+            lo = 0
+            if first_byte > 0:
+                lo = struct.unpack_from('>I', idx, fanout_base + (first_byte - 1) * 4)[0]
+            hi = struct.unpack_from('>I', idx, fanout_base + first_byte * 4)[0]
+            total = struct.unpack_from('>I', idx, fanout_base + 255 * 4)[0]
+
+            names_base = fanout_base + 256 * 4
+            while lo < hi:
+                mid = (lo + hi) // 2
+                start = names_base + mid * HASH_RAW_LENGTH
+                candidate = idx[start:start + HASH_RAW_LENGTH]
+                if candidate < raw_sha:
+                    lo = mid + 1
+                elif candidate > raw_sha:
+                    hi = mid
+                else:
+                    offsets_base = names_base + total * (HASH_RAW_LENGTH + 4)
+                    offset = struct.unpack_from('>I', idx, offsets_base + mid * 4)[0]
+                    if offset & 0x80000000:
+                        large_base = offsets_base + total * 4
+                        large_index = offset & 0x7fffffff
+                        offset = struct.unpack_from('>Q', idx, large_base + large_index * 8)[0]
+                    return offset
+    return None
+
+
+def _read_pack_object(pack_path, idx_path, offset, depth):
+    """packfile の指定オフセットからオブジェクトを読み込み（delta を解決）"""
+    if depth > MAX_DELTA_DEPTH:
+        raise GitReadError("delta chain too deep")
+
+    with open(pack_path, 'rb') as f:
+        f.seek(offset)
+        byte = f.read(1)[0]
+        obj_type = (byte >> 4) & 0x07
+        while byte & 0x80:
+            byte = f.read(1)[0]
+
+        base = None
+        if obj_type == OBJ_OFS_DELTA:
+            byte = f.read(1)[0]
+            base_distance = byte & 0x7f
+            while byte & 0x80:
+                byte = f.read(1)[0]
+                base_distance = ((base_distance + 1) << 7) | (byte & 0x7f)
+            base = ('offset', offset - base_distance)
+        elif obj_type == OBJ_REF_DELTA:
+            base = ('sha', f.read(HASH_RAW_LENGTH))
+
+        data = _inflate_stream(f)
+
+    if base is None:
+        return obj_type, data
+
+    if base[0] == 'offset':
+        base_type, base_data = _read_pack_object(pack_path, idx_path, base[1], depth + 1)
+    else:
+        base_offset = _find_in_pack_index(idx_path, base[1])
+        if base_offset is None:
+            raise GitReadError("REF_DELTA base outside this pack")
+        base_type, base_data = _read_pack_object(pack_path, idx_path, base_offset, depth + 1)
+
+    return base_type, _apply_delta(base_data, data)
+
+
+def _inflate_stream(f):
+    """ファイルの現在位置から zlib ストリームを1つ展開"""
+    decompressor = zlib.decompressobj()
+    chunks = []
+    while not decompressor.eof:
+        chunk = f.read(4096)
+        if not chunk:
+            raise GitReadError("truncated pack object")
+        chunks.append(decompressor.decompress(chunk))
+    return b''.join(chunks)
+
+
+def _apply_delta(base, delta):
+    """git の delta 形式を base に適用"""
+    pos = 0
+
+    def read_varint():
+        nonlocal pos
+        value = 0
+        shift = 0
+        while True:
+            byte = delta[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value
+
+    base_size = read_varint()
+    result_size = read_varint()
+    if base_size != len(base):
+        raise GitReadError("delta base size mismatch")
+
+    out = bytearray()
+    while pos < len(delta):
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:
+            copy_offset = 0
+            copy_size = 0
+            for i in range(4):
+                if opcode & (1 << i):
+                    copy_offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if opcode & (1 << (4 + i)):
+                    copy_size |= delta[pos] << (8 * i)
+                    pos += 1
+            if copy_size == 0:
+                copy_size = 0x10000
+            out += base[copy_offset:copy_offset + copy_size]
+        elif opcode:
+            out += delta[pos:pos + opcode]
+            pos += opcode
+        else:
+            raise GitReadError("invalid delta opcode")
+
+    if len(out) != result_size:
+        raise GitReadError("delta result size mismatch")
+    return bytes(out)
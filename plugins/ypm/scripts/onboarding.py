@@ -462,13 +462,15 @@ def generate_project_status(directory, pattern, language):
             'header': "📊 Generating PROJECT_STATUS.md...",
             'wait': "This may take a moment...",
             'success': "✅ PROJECT_STATUS.md (initial version) generated.",
-            'note': "   For detailed information, update with Claude Code."
+            'note': "   For detailed information, update with Claude Code.",
+            'scan_fail': "⚠️  Project scan failed, writing a placeholder instead: "
         },
         'ja': {
             'header': "📊 PROJECT_STATUS.mdを生成しています...",
             'wait': "この処理には時間がかかる場合があります...",
             'success': "✅ PROJECT_STATUS.md（初期版）を生成しました。",
-            'note': "   詳細な情報はClaude Codeで更新してください。"
+            'note': "   詳細な情報はClaude Codeで更新してください。",
+            'scan_fail': "⚠️  プロジェクトのスキャンに失敗したため、簡易版を作成します: "
         }
     }
     m = msgs[language]
@@ -478,8 +480,27 @@ def generate_project_status(directory, pattern, language):
     print("-" * 70)
     print(f"\n{m['wait']}\n")
 
-    # Generate simplified PROJECT_STATUS.md
-    # (Full version delegated to Claude Code)
+    # Render PROJECT_STATUS.md from a scan of the new config.yml
+    # (Claude Code enriches the per-project sections later). TruffleHog is
+    # skipped: full-history scans of every repository are too slow for the
+    # wizard, and the first /ypm:update runs them.
+    try:
+        from scan_projects import iter_projects
+        from status_renderer import RENDER_FIELDS, render_status
+
+        fields = set(RENDER_FIELDS) - {'security_scan'}
+        records = iter_projects('config.yml', fields=fields, ordered=True)
+        projects = [record.to_dict() for record in records]
+        render_status(projects, 'PROJECT_STATUS.md', language)
+    except Exception as e:
+        print(f"{m['scan_fail']}{type(e).__name__}: {e}")
+        write_placeholder_status()
+
+    print(m['success'])
+    print(m['note'])
+
+def write_placeholder_status():
+    """Write a simplified PROJECT_STATUS.md when the scan cannot run"""
     with open('PROJECT_STATUS.md', 'w', encoding='utf-8') as f:
         f.write("# Project Status Overview\n\n")
         f.write(f"**Last Updated**: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
@@ -487,9 +508,6 @@ def generate_project_status(directory, pattern, language):
         f.write("## Summary\n\n")
         f.write("Initial generation complete. Please use Claude Code to run \"update project status\".\n\n")
 
-    print(m['success'])
-    print(m['note'])
-
 def print_completion_report(directory, pattern, active_days, inactive_days, language):
     """Display completion report"""
     msgs = {
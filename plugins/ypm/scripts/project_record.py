@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+スキャン結果のプロジェクトレコード（scan_projects.iter_projects() が返す）
+
+1万件以上のリポジトリを保持してもメモリを抑えられるよう、辞書ではなく
+__slots__ を持つクラスにする。選択されなかったフィールドには値を持たない
+（参照すると AttributeError）。JSON 出力には to_dict() を使う。
+"""
+
+import sys
+
+
+# プロジェクト情報のフィールド（出力順）
+PROJECT_FIELDS = (
+    'name', 'path', 'branch', 'last_commit', 'last_commit_timestamp',
+    'changed_files', 'category', 'is_worktree', 'docs', 'security_scan'
+)
+
+# フィールド選択に関わらず常に持つフィールド
+IDENTITY_FIELDS = ('name', 'path')
+
+
+class ProjectRecord:
+    """
+    1プロジェクト分のスキャン結果
+
+    Attributes:
+        name (str): ディレクトリ名
+        path (str): プロジェクトの絶対パス
+        branch (str): 現在のブランチ（detached HEAD は "HEAD"、不明なら "unknown"）
+        last_commit (str): "相対時刻|件名"（コミットが無ければ "unknown"）
+        last_commit_timestamp (int): 最終コミットの Unix timestamp（不明なら 0）
+        changed_files (int): 未コミットの変更ファイル数
+        category (str): "active" / "developing" / "dormant" / "unknown"
+        is_worktree (bool): Git worktree か
+        docs (dict): {'overview', 'phase_hint'}（休止中・不明なプロジェクトは空）
+        security_scan (dict): TruffleHog の結果（scan_projects.py の JSON 出力と同じ形式）
+    """
+
+    __slots__ = PROJECT_FIELDS
+
+    def __init__(self, **values):
+        for field, value in values.items():
+            setattr(self, field, value)
+
+    @classmethod
+    def from_dict(cls, project):
+        """
+        scan_project() の結果の辞書からレコードを生成
+
+        ブランチ名・分類は多くのプロジェクトで同じ値になるため intern する。
+        """
+        record = cls(**project)
+        for field in ('branch', 'category'):
+            value = project.get(field)
+            if isinstance(value, str):
+                setattr(record, field, sys.intern(value))
+        return record
+
+    @property
+    def fields(self):
+        """値を持つフィールド名のタプル（PROJECT_FIELDS の順）"""
+        return tuple(field for field in PROJECT_FIELDS if hasattr(self, field))
+
+    def to_dict(self, fields=None):
+        """
+        JSON 化可能な辞書に変換
+
+        Args:
+            fields: 含めるフィールドの集合（None なら値を持つ全フィールド。
+                name と path は常に含める）
+        """
+        result = {}
+        for field in self.fields:
+            if fields is None or field in fields or field in IDENTITY_FIELDS:
+                result[field] = getattr(self, field)
+        return result
+
+    def __eq__(self, other):
+        if not isinstance(other, ProjectRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        values = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.fields)
+        return f"{type(self).__name__}({values})"
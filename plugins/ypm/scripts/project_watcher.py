@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+プロジェクトの変更監視（scan_projects.py --watch 用）
+
+各リポジトリの .git/HEAD・.git/index・packed-refs・refs/heads を監視し、
+変更があったプロジェクトのパスを返す。
+
+    - Linux: inotify（ctypes 経由、追加の依存なし）
+    - その他、または inotify の登録に失敗した場合: フィンガープリントのポーリング
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+from git_reader import GitReadError, resolve_git_dirs
+from scan_cache import compute_fingerprint
+
+
+# ポーリング間隔（秒）
+DEFAULT_POLL_INTERVAL = 2.0
+
+# 最初のイベントから、同じ git 操作による後続イベントをまとめる時間（秒）
+DEBOUNCE_SECONDS = 0.2
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+# git_dir / common_dir 直下で関心のあるファイル（それ以外は無視）
+GIT_DIR_FILES = {'HEAD', 'index', 'packed-refs'}
+
+
+class PollingWatcher:
+    """フィンガープリント（scan_cache.compute_fingerprint）を定期的に比較する監視"""
+
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        self._fingerprints = {}
+
+    def add(self, project_path):
+        self._fingerprints[project_path] = compute_fingerprint(project_path)
+        return True
+
+    def remove(self, project_path):
+        self._fingerprints.pop(project_path, None)
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def poll(self):
+        """変更されたプロジェクトを返す（待たない）"""
+        changed = set()
+        for project_path, previous in list(self._fingerprints.items()):
+            current = compute_fingerprint(project_path)
+            if current != previous:
+                self._fingerprints[project_path] = current
+                changed.add(project_path)
+        return changed
+
+    def wait(self, timeout):
+        """変更を検出するか timeout 秒経過するまで待ち、変更されたプロジェクトを返す"""
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = self.poll()
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        self._fingerprints.clear()
+
+
+class InotifyWatcher:
+    """
+    inotify によるリポジトリ監視
+
+    worktree 同士は refs（common_dir）を共有するため、1つの監視対象ディレクトリに
+    複数のプロジェクトが対応しうる。登録できなかったプロジェクトはポーリングで監視する。
+    """
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self._wd_by_dir = {}       # ディレクトリ -> wd
+        self._dir_by_wd = {}       # wd -> ディレクトリ
+        self._projects_by_wd = {}  # wd -> {プロジェクトパス}
+        self._names_by_wd = {}     # wd -> 関心のあるファイル名（None なら全て）
+        self._dirs_by_project = {}
+        self._fallback = PollingWatcher(poll_interval)
+
+    def add(self, project_path):
+        """
+        プロジェクトを監視対象に追加
+
+        Returns:
+            inotify で監視できた場合 True（False の場合はポーリングで監視）
+        """
+        try:
+            git_dir, common_dir = resolve_git_dirs(project_path)
+            targets = [(str(git_dir), GIT_DIR_FILES), (str(common_dir), GIT_DIR_FILES)]
+            heads_dir = common_dir / "refs" / "heads"
+            for directory, _, _ in os.walk(heads_dir):
+                targets.append((directory, None))
+            for directory, names in targets:
+                self._watch(directory, names, project_path)
+        except (GitReadError, OSError):
+            self._unwatch_project(project_path)
+            self._fallback.add(project_path)
+            return False
+        return True
+
+    def remove(self, project_path):
+        self._unwatch_project(project_path)
+        self._fallback.remove(project_path)
+
+    def wait(self, timeout):
+        """変更を検出するか timeout 秒経過するまで待ち、変更されたプロジェクトを返す"""
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = self._fallback.poll()
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+
+            step = remaining
+            if len(self._fallback):
+                step = min(step, self._fallback.interval)
+
+            ready, _, _ = select.select([self._fd], [], [], step)
+            if ready:
+                changed = self._read_events()
+                # 同じ git 操作による後続イベントをまとめる
+                time.sleep(DEBOUNCE_SECONDS)
+                changed |= self._read_events()
+                changed |= self._fallback.poll()
+                if changed:
+                    return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._fallback.close()
+
+    def _watch(self, directory, names, project_path):
+        wd = self._wd_by_dir.get(directory)
+        if wd is None:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                raise OSError(err, os.strerror(err), directory)
+            self._wd_by_dir[directory] = wd
+            if wd not in self._projects_by_wd:
+                self._dir_by_wd[wd] = directory
+                self._projects_by_wd[wd] = set()
+                self._names_by_wd[wd] = names
+        if names is None:
+            # 同じ inode を別パスで登録した場合も同じ wd が返る
+            self._names_by_wd[wd] = None
+        self._projects_by_wd[wd].add(project_path)
+        self._dirs_by_project.setdefault(project_path, set()).add(directory)
+
+    def _unwatch_project(self, project_path):
+        for directory in self._dirs_by_project.pop(project_path, set()):
+            wd = self._wd_by_dir.get(directory)
+            if wd is None or wd not in self._projects_by_wd:
+                continue
+            projects = self._projects_by_wd[wd]
+            projects.discard(project_path)
+            if not projects:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                self._forget(wd)
+
+    def _forget(self, wd):
+        self._dir_by_wd.pop(wd, None)
+        for directory in [d for d, w in self._wd_by_dir.items() if w == wd]:
+            del self._wd_by_dir[directory]
+        self._projects_by_wd.pop(wd, None)
+        self._names_by_wd.pop(wd, None)
+
+    def _read_events(self):
+        changed = set()
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+                offset += length
+
+                projects = self._projects_by_wd.get(wd)
+                if projects is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # 監視対象ディレクトリ自体が消えた
+                    changed |= projects
+                    self._forget(wd)
+                    continue
+                if name.endswith('.lock'):
+                    continue
+
+                names = self._names_by_wd[wd]
+                if names is None:
+                    # refs/heads 配下: 新しいサブディレクトリ（feature/... 等）も監視する
+                    if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        directory = os.path.join(self._dir_by_wd[wd], name)
+                        for project_path in list(projects):
+                            try:
+                                self._watch(directory, None, project_path)
+                            except OSError:
+                                pass
+                    changed |= projects
+                elif name in names:
+                    changed |= projects
+
+
+def create_watcher(poll_interval=DEFAULT_POLL_INTERVAL, use_inotify=True):
+    """
+    利用可能な監視方式を選んで watcher を生成
+
+    Returns:
+        InotifyWatcher または PollingWatcher
+    """
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(poll_interval)
+        except (OSError, AttributeError):
+            # libc に inotify が無い・上限に達した等
+            pass
+    return PollingWatcher(poll_interval)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+scan_projects.py の永続状態（インクリメンタルキャッシュ・TruffleHog スキャン状態）
+
+各プロジェクトのスキャン結果を、安価に計算できるフィンガープリント
+（.git/HEAD・.git/index・現在のref・packed-refs・ドキュメントファイルの
+stat情報）と共に ~/.ypm/scan_cache.json に保存する。
+フィンガープリントが一致するプロジェクトはサブプロセスを起動せずに
+キャッシュから返す。
+
+キャッシュするのは HEAD から決まる情報（ブランチ名・最終コミット・
+worktree 判定）とドキュメントのみ。追跡中ファイルの編集は .git/index を
+更新せずフィンガープリントに現れないため、変更ファイル数はキャッシュしない
+（git status を毎回実行する）。
+
+TruffleHog のスキャン状態（リポジトリごとの最終スキャンコミットと検出数）は
+~/.ypm/trufflehog_state.json に別途保存する。キャッシュとは寿命が異なり、
+--no-cache / --clear-cache の影響を受けない。
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from git_reader import GitReadError, resolve_git_dirs
+
+
+CACHE_VERSION = 4
+
+# read_project_docs() が参照するファイル
+DOC_FILES = ['CLAUDE.md', 'README.md', 'docs/INDEX.md']
+
+
+def get_default_cache_path():
+    """デフォルトのキャッシュファイルパスを取得"""
+    return Path.home() / ".ypm" / "scan_cache.json"
+
+
+def get_default_secret_state_path():
+    """デフォルトのTruffleHogスキャン状態ファイルパスを取得"""
+    return Path.home() / ".ypm" / "trufflehog_state.json"
+
+
+def _stat_key(path):
+    """stat情報を比較用のリストに変換（存在しなければ None）"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def compute_fingerprint(project_path):
+    """
+    プロジェクトのフィンガープリントを計算
+
+    Args:
+        project_path: プロジェクトパス
+
+    Returns:
+        JSON化可能なリスト。.git を解釈できない場合は None（キャッシュしない）
+    """
+    try:
+        git_dir, common_dir = resolve_git_dirs(project_path)
+        with open(git_dir / "HEAD", 'r', encoding='utf-8') as f:
+            head = f.read().strip()
+    except (GitReadError, OSError):
+        return None
+
+    paths = [
+        # 作業ツリー直下のファイル追加・削除
+        Path(project_path),
+        git_dir / "HEAD",
+        git_dir / "index",
+        common_dir / "packed-refs",
+    ]
+    if head.startswith('ref:'):
+        paths.append(common_dir / head[len('ref:'):].strip())
+    paths.extend(Path(project_path) / name for name in DOC_FILES)
+
+    return [head] + [_stat_key(path) for path in paths]
+
+
+class JsonStore:
+    """
+    プロジェクトパスをキーとした JSON ファイルストア
+
+    スキャンワーカー（スレッド）から呼ばれるため、ロックで保護する。
+    """
+
+    version = 1
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """ファイルを読み込み（壊れている場合は空として扱う）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+
+        if isinstance(data, dict) and data.get('version') == self.version:
+            self._entries = data.get('projects', {})
+        return self
+
+    def prune(self, project_paths):
+        """検出されなかったプロジェクトのエントリを削除"""
+        keep = set(project_paths)
+        with self._lock:
+            for path in list(self._entries):
+                if path not in keep:
+                    del self._entries[path]
+
+    def save(self):
+        """ファイルをアトミックに書き込み"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with self._lock:
+            data = {'version': self.version, 'projects': self._entries}
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """全エントリを破棄（ファイルも削除）"""
+        with self._lock:
+            self._entries = {}
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ScanCache(JsonStore):
+    """プロジェクトパスをキーとしたスキャン結果キャッシュ"""
+
+    version = CACHE_VERSION
+
+    def __init__(self, path=None):
+        super().__init__(path or get_default_cache_path())
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, project_path, fingerprint):
+        """
+        フィンガープリントが一致するエントリを取得
+
+        Returns:
+            保存されたデータ、無効な場合は None
+        """
+        with self._lock:
+            entry = self._entries.get(project_path)
+            if (
+                fingerprint is None
+                or entry is None
+                or entry.get('fingerprint') != fingerprint
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry['data']
+
+    def store(self, project_path, fingerprint, data):
+        """エントリを保存（フィンガープリントが無い場合は保存しない）"""
+        if fingerprint is None:
+            return
+        with self._lock:
+            self._entries[project_path] = {
+                'fingerprint': fingerprint,
+                'cached_at': time.time(),
+                'data': data,
+            }
+
+
+class SecretScanState(JsonStore):
+    """
+    TruffleHog の増分スキャン状態
+
+    エントリ: {'commit': 最後に正常スキャンした HEAD, 'issues_found': 累計検出数}
+    """
+
+    def __init__(self, path=None):
+        super().__init__(path or get_default_secret_state_path())
+
+    def get(self, project_path):
+        """エントリを取得（無ければ None）"""
+        with self._lock:
+            return self._entries.get(project_path)
+
+    def update(self, project_path, commit, issues_found):
+        """スキャン完了時の状態を記録"""
+        with self._lock:
+            self._entries[project_path] = {
+                'commit': commit,
+                'issues_found': issues_found,
+                'scanned_at': time.time(),
+            }
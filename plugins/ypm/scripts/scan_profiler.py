@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+scan_projects.py --profile の計測
+
+フェーズ（検出・スキャン全体）の経過時間、プロジェクトごとの処理時間
+（メタデータ収集・ドキュメント読み込み・TruffleHog）、git コマンドごとの
+実行時間を記録し、JSON 出力の "timings" ブロックにまとめる。
+
+cProfile を有効にした場合は、メインスレッドに加えてワーカースレッドの
+処理（プロジェクト単位）も計測し、1つの pstats ファイルにまとめて書き出す。
+"""
+
+import contextlib
+import cProfile
+import pstats
+import threading
+import time
+
+
+# "slowest" に載せるプロジェクト数
+DEFAULT_TOP = 10
+
+
+def percentile(values, p):
+    """nearest-rank 方式のパーセンタイル"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(durations):
+    """経過時間（秒）のリストをミリ秒の統計にまとめる"""
+    ms = [d * 1000 for d in durations]
+    return {
+        "count": len(ms),
+        "total_ms": round(sum(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "max_ms": round(max(ms), 3),
+    }
+
+
+class ScanProfiler:
+    """
+    スキャンの経過時間の記録
+
+    スキャンワーカー（スレッド）から呼ばれるため、ロックで保護する。
+    """
+
+    def __init__(self, top=DEFAULT_TOP, cprofile=False):
+        self.top = top
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._phases = {}    # フェーズ -> 経過時間（秒）
+        self._stages = {}    # 処理 -> [経過時間]
+        self._projects = {}  # プロジェクトパス -> {処理: 経過時間, 'git': 経過時間, 'git_calls': 回数}
+        self._git = {}       # git サブコマンド -> [経過時間]
+
+        self._local = threading.local()
+        self._main_profile = None
+        self._stats = None
+        if cprofile:
+            self._main_profile = cProfile.Profile()
+            self._main_profile.enable()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """フェーズ全体の経過時間を計測"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0) + elapsed
+
+    def iterate(self, name, iterable):
+        """イテラブルを最後まで消費するまでをフェーズとして計測"""
+        with self.phase(name):
+            yield from iterable
+
+    @contextlib.contextmanager
+    def measure(self, stage, project_path):
+        """1プロジェクト分の処理時間を計測（ワーカースレッドでは cProfile も）"""
+        profile = self._start_thread_profile()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stop_thread_profile(profile)
+            with self._lock:
+                self._stages.setdefault(stage, []).append(elapsed)
+                project = self._projects.setdefault(project_path, {})
+                project[stage] = project.get(stage, 0) + elapsed
+
+    def record_git(self, project_path, command, elapsed):
+        """git コマンド1回分の実行時間を記録（command は ['git', サブコマンド, ...]）"""
+        subcommand = command[1] if len(command) > 1 else command[0]
+        with self._lock:
+            self._git.setdefault(subcommand, []).append(elapsed)
+            project = self._projects.setdefault(project_path, {})
+            project['git'] = project.get('git', 0) + elapsed
+            project['git_calls'] = project.get('git_calls', 0) + 1
+
+    def summary(self):
+        """
+        "timings" ブロックを生成
+
+        stages・git の total_ms は各スレッドでの処理時間の合計
+        （並列実行されるため phases の経過時間より大きくなりうる）。
+        """
+        with self._lock:
+            phases = {name: round(seconds * 1000, 3) for name, seconds in self._phases.items()}
+            phases['total'] = round((time.perf_counter() - self._started) * 1000, 3)
+            stages = {name: summarize(durations) for name, durations in self._stages.items()}
+            git = {name: summarize(durations) for name, durations in sorted(self._git.items())}
+
+            projects = []
+            for path, spent in self._projects.items():
+                entry = {"path": path}
+                for stage in ('metadata', 'docs', 'secret_scan', 'git'):
+                    if stage in spent:
+                        entry[f"{stage}_ms"] = round(spent[stage] * 1000, 3)
+                # docs と git は metadata・secret_scan の内訳
+                total = spent.get('metadata', 0) + spent.get('secret_scan', 0)
+                entry["total_ms"] = round(total * 1000, 3)
+                entry["git_calls"] = spent.get('git_calls', 0)
+                projects.append(entry)
+
+        projects.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        per_project = [entry["total_ms"] / 1000 for entry in projects]
+        return {
+            "phases_ms": phases,
+            "projects": summarize(per_project) if per_project else {"count": 0},
+            "stages": stages,
+            "git": git,
+            "slowest": projects[:self.top],
+        }
+
+    def dump(self, path):
+        """cProfile の結果を pstats 形式で書き出す（メインスレッドとワーカーの合計）"""
+        if self._main_profile is None:
+            return
+        self._main_profile.disable()
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(self._main_profile)
+            else:
+                self._stats.add(self._main_profile)
+            self._stats.dump_stats(str(path))
+
+    def _start_thread_profile(self):
+        # メインスレッドは _main_profile が計測している。入れ子の measure も計測済み
+        if (
+            self._main_profile is None
+            or threading.current_thread() is threading.main_thread()
+            or getattr(self._local, 'active', False)
+        ):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12 以降はプロファイラを同時に1つしか有効にできないが、
+            # メインスレッドで有効にしたものが全スレッドを計測する
+            return None
+        self._local.active = True
+        return profile
+
+    def _stop_thread_profile(self, profile):
+        if profile is None:
+            return
+        profile.disable()
+        self._local.active = False
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
@@ -8,21 +8,94 @@ YPM プロジェクトスキャンスクリプト
 使用方法:
     python scripts/scan_projects.py
     python scripts/scan_projects.py --config /path/to/config.yml
+    python scripts/scan_projects.py --jobs 8
+    python scripts/scan_projects.py --no-cache
+    python scripts/scan_projects.py --full-secret-scan
+    python scripts/scan_projects.py --format ndjson
+    python scripts/scan_projects.py --watch
+    python scripts/scan_projects.py --render markdown
+    python scripts/scan_projects.py --category active,developing --fields branch,last_commit
+    python scripts/scan_projects.py --changed-since 2026-01-01
+    python scripts/scan_projects.py --profile --profile-dump scan.pstats
+
+ライブラリとして:
+    from scan_projects import iter_projects
+    for record in iter_projects(categories={'active'}, fields={'branch'}):
+        ...
 
 出力:
     JSON形式で標準出力に出力
+    --format ndjson の場合は完了したプロジェクトから1行ずつ出力し、最後にサマリー行を出力
+    --watch の場合は常駐し、~/.ypm/scan_snapshot.json を変更のたびに更新
+    --render markdown の場合は ~/.ypm/PROJECT_STATUS.md も更新（変化したセクションのみ）
+    --profile の場合は処理時間の内訳を "timings" として出力に含める
 """
 
 import os
 import sys
 import json
+import shutil
 import yaml
 import subprocess
 from pathlib import Path
 from datetime import datetime
 import time
-import glob
 import argparse
+import contextlib
+import fnmatch
+import re
+import itertools
+import queue
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from git_reader import (
+    format_relative_date, read_head_commit, read_head_info, uses_english_dates
+)
+from scan_cache import ScanCache, SecretScanState, compute_fingerprint
+from project_record import IDENTITY_FIELDS, PROJECT_FIELDS, ProjectRecord
+from project_watcher import create_watcher
+from scan_profiler import DEFAULT_TOP, ScanProfiler
+from status_renderer import RENDER_FIELDS, render_status
+
+
+# TruffleHog 1リポジトリあたりのタイムアウト（秒）
+TRUFFLEHOG_TIMEOUT = 30
+
+# TruffleHog の同時実行数（trufflehog 自体がマルチスレッドで CPU/IO 負荷が高い）
+DEFAULT_SECRET_SCAN_JOBS = 2
+
+# git status が .git/index を書き換えないようにする（ユーザーの git 操作と
+# 競合せず、--watch で自分の書き込みを変更として検出しないため）
+GIT_ENV = dict(os.environ, GIT_OPTIONAL_LOCKS='0')
+
+# --watch: 全プロジェクトを再評価する間隔（相対時刻・分類・ドキュメントの更新用）
+DEFAULT_WATCH_REFRESH_INTERVAL = 60
+
+# --watch: 新しいリポジトリを検出する間隔（秒）
+WATCH_DISCOVERY_INTERVAL = 300
+
+# glob のワイルドカード文字
+GLOB_MAGIC = re.compile(r'[*?[]')
+
+# 取得にサブプロセスやファイル読み込みが必要なフィールド（要求された場合のみ取得）
+# それ以外は .git を直接読めればサブプロセス不要
+COSTLY_FIELDS = ('changed_files', 'docs', 'security_scan')
+
+# --fields を指定しない場合に出力するフィールド
+# last_commit_timestamp は既存の出力形式を変えないよう、--fields か --render で
+# 要求された場合のみ出力する
+DEFAULT_FIELDS = tuple(field for field in PROJECT_FIELDS if field != 'last_commit_timestamp')
+
+# 分類
+CATEGORIES = ('active', 'developing', 'dormant', 'unknown')
+
+# セキュリティスキャンの優先順位（小さいほど先にスキャン）
+SECRET_SCAN_PRIORITY = {"active": 0, "developing": 1, "unknown": 2, "dormant": 3}
+
+# --profile の計測（None なら計測しない）
+_profiler = None
 
 
 def get_default_config_path():
@@ -30,77 +103,242 @@ def get_default_config_path():
     return Path.home() / ".ypm" / "config.yml"
 
 
-def load_config(config_path=None):
-    """config.ymlを読み込み"""
+def get_default_snapshot_path():
+    """--watch が書き出すスナップショットのデフォルトパスを取得"""
+    return Path.home() / ".ypm" / "scan_snapshot.json"
+
+
+class ConfigError(Exception):
+    """config.yml が無い・読み込めない場合の例外"""
+
+    def __init__(self, message, hint=None):
+        super().__init__(message)
+        self.hint = hint
+
+
+def read_config(config_path=None):
+    """
+    config.ymlを読み込み
+
+    Raises:
+        ConfigError: ファイルが無い・読み込めない場合
+    """
     if config_path is None:
         config_path = get_default_config_path()
     else:
         config_path = Path(config_path)
 
     if not config_path.exists():
-        print(json.dumps({
-            "error": f"config.yml not found at {config_path}",
-            "hint": "Run /ypm:setup to initialize YPM"
-        }), file=sys.stderr)
-        sys.exit(1)
+        raise ConfigError(
+            f"config.yml not found at {config_path}",
+            hint="Run /ypm:setup to initialize YPM"
+        )
 
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        return config
+            return yaml.safe_load(f) or {}
     except Exception as e:
-        print(json.dumps({"error": f"Failed to load config.yml: {e}"}), file=sys.stderr)
+        raise ConfigError(f"Failed to load config.yml: {e}")
+
+
+def load_config(config_path=None):
+    """config.ymlを読み込み（失敗したらエラーを出力して終了する: CLI 用）"""
+    try:
+        return read_config(config_path)
+    except ConfigError as e:
+        error = {"error": str(e)}
+        if e.hint:
+            error["hint"] = e.hint
+        print(json.dumps(error), file=sys.stderr)
         sys.exit(1)
 
 
-def find_projects(base_dirs, patterns, excludes):
+def compile_patterns(patterns):
+    """
+    プロジェクト検出パターンをセグメント単位のマッチャーにコンパイル
+
+    glob.glob（非再帰）と同じ規則でマッチする:
+        - `*` `?` `[...]` を含まないセグメントはそのままの名前として扱う
+        - ワイルドカードは `.` で始まる名前にマッチしない（パターンも `.` で始まる場合を除く）
+        - `**` は `*` と同じ
+
+    Args:
+        patterns: パターンのリスト（例: ["*", "work/*"]）
+
+    Returns:
+        パターンごとのセグメントのリスト。各セグメントは (literal, regex, match_hidden)
+    """
+    compiled = []
+    for pattern in patterns:
+        segments = []
+        for part in pattern.split('/'):
+            if part in ('', '.'):
+                continue
+            if GLOB_MAGIC.search(part):
+                regex = re.compile(fnmatch.translate(part))
+                segments.append((None, regex, part.startswith('.')))
+            else:
+                segments.append((part, None, True))
+        if segments:
+            compiled.append(segments)
+    return compiled
+
+
+def find_projects(base_dirs, patterns, excludes, stats=None):
     """
     パターンに基づいてGitリポジトリを検出
 
+    各監視対象ディレクトリを os.scandir で1回だけ走査し、全パターンを同時に
+    マッチする。除外パターンに該当するディレクトリには降りない。
+    シンボリックリンク等で同じディレクトリに複数のパスで到達した場合は
+    （inode で判定して）1つのパスのみを返す。シンボリックリンクを経由しない
+    パスを優先し、それ以外は監視対象ディレクトリ・パターンの設定順で最初のもの
+    （同順なら辞書順）を返す。
+
     Args:
         base_dirs: 監視対象ディレクトリのリスト
         patterns: プロジェクト検出パターンのリスト
-        excludes: 除外パターンのリスト
+        excludes: 除外パターンのリスト（相対パス "./..." に含まれる文字列）
+        stats: 指定した場合、走査の統計情報を書き込む辞書
 
     Returns:
         プロジェクトパスのリスト
     """
-    projects = set()
-
-    for base_dir in base_dirs:
+    started = time.perf_counter()
+    compiled = compile_patterns(patterns)
+    exclude_re = None
+    if excludes:
+        exclude_re = re.compile('|'.join(re.escape(exclude) for exclude in excludes))
+
+    counters = {'directories': 0, 'entries': 0, 'pruned': 0, 'candidates': 0}
+    projects = {}  # (st_dev, st_ino) -> (パス, 監視対象ディレクトリ, 優先順位)
+
+    def via_symlink(base, path):
+        """監視対象ディレクトリからパスまでの途中にシンボリックリンクがあるか"""
+        current = base
+        for part in os.path.relpath(path, base).split(os.sep):
+            current = os.path.join(current, part)
+            if os.path.islink(current):
+                return True
+        return False
+
+    def add_project(path, base, order):
+        counters['candidates'] += 1
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        key = (st.st_dev, st.st_ino)
+        existing = projects.get(key)
+        if existing is not None:
+            if existing[0] == path:
+                return
+            # 同じディレクトリに別のパスで到達した場合のみ、どちらを残すか判定する
+            existing_path, existing_base, existing_order = existing
+            rank = (via_symlink(base, path), order, path)
+            existing_rank = (
+                via_symlink(existing_base, existing_path), existing_order, existing_path
+            )
+            if existing_rank <= rank:
+                return
+        projects[key] = (path, base, order)
+
+    def list_children(directory, segments):
+        """(名前, ディレクトリか) を返す。ワイルドカードがある時だけ scandir する"""
+        if all(literal is not None for literal, _, _ in segments):
+            for name in {literal for literal, _, _ in segments}:
+                yield name, os.path.isdir(os.path.join(directory, name))
+            return
+        counters['directories'] += 1
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    counters['entries'] += 1
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    yield entry.name, is_dir
+        except OSError:
+            return
+
+    for base_index, base_dir in enumerate(base_dirs):
         base_path = Path(base_dir).expanduser()
 
         if not base_path.exists():
             continue
 
-        for pattern in patterns:
-            # パターンに基づいてディレクトリを検索
-            search_pattern = str(base_path / pattern)
+        # (ディレクトリ, 相対パス, ここまでマッチしているパターンの番号)
+        stack = [(str(base_path), '.', list(range(len(compiled))))]
+        while stack:
+            directory, rel_dir, alive = stack.pop()
+            depth = 0 if rel_dir == '.' else rel_dir.count('/')
+            segments = [compiled[i][depth] for i in alive]
 
-            for path in glob.glob(search_pattern):
-                path_obj = Path(path)
+            for name, is_dir in list_children(directory, segments):
+                if not is_dir:
+                    continue
 
-                # ディレクトリかつGitリポジトリか確認
-                if path_obj.is_dir() and (path_obj / ".git").exists():
-                    # 相対パスに変換
-                    try:
-                        rel_path = path_obj.relative_to(base_path)
-                        rel_path_str = f"./{rel_path}"
-
-                        # 除外パターンに該当するかチェック
-                        excluded = False
-                        for exclude in excludes:
-                            if exclude in rel_path_str:
-                                excluded = True
-                                break
+                matched = []
+                for index, (literal, regex, match_hidden) in zip(alive, segments):
+                    if literal is not None:
+                        if name == literal:
+                            matched.append(index)
+                    elif (match_hidden or not name.startswith('.')) and regex.match(name):
+                        matched.append(index)
+                if not matched:
+                    continue
+
+                rel_path = f"{rel_dir}/{name}"
+                if exclude_re is not None and exclude_re.search(rel_path):
+                    # 配下のパスも同じ文字列を含むので、ここで打ち切る
+                    counters['pruned'] += 1
+                    continue
 
-                        if not excluded:
-                            projects.add(str(path_obj))
-                    except ValueError:
-                        # relative_toが失敗した場合は絶対パスを使用
-                        projects.add(str(path_obj))
+                path = os.path.join(directory, name)
+                descend = []
+                for index in matched:
+                    if len(compiled[index]) == depth + 1:
+                        if os.path.exists(os.path.join(path, '.git')):
+                            add_project(path, str(base_path), (base_index, index))
+                    else:
+                        descend.append(index)
+                if descend:
+                    stack.append((path, rel_path, descend))
 
-    return sorted(list(projects))
+    result = sorted({path for path, _, _ in projects.values()})
+
+    if stats is not None:
+        stats.update(counters)
+        stats['projects'] = len(result)
+        stats['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    return result
+
+
+def enable_profiling(profiler):
+    """
+    スキャン処理の計測を開始（None を渡すと停止）
+
+    Args:
+        profiler: ScanProfiler
+    """
+    global _profiler
+    _profiler = profiler
+
+
+def phase(name):
+    """計測が有効ならフェーズ全体の経過時間を記録するコンテキストマネージャ"""
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.phase(name)
+
+
+def measure(stage, project_path):
+    """計測が有効なら1プロジェクト分の処理時間を記録するコンテキストマネージャ"""
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.measure(stage, project_path)
 
 
 def run_git_command(project_path, command):
@@ -114,54 +352,135 @@ def run_git_command(project_path, command):
     Returns:
         コマンドの出力（文字列）、失敗時はNone
     """
+    started = time.perf_counter()
     try:
         result = subprocess.run(
             command,
             cwd=project_path,
             capture_output=True,
             text=True,
-            check=True
+            check=True,
+            env=GIT_ENV
         )
         return result.stdout.strip()
     except subprocess.CalledProcessError:
         return None
     except Exception:
         return None
+    finally:
+        if _profiler is not None:
+            _profiler.record_git(project_path, command, time.perf_counter() - started)
 
 
-def get_git_info(project_path):
+def parse_status_porcelain_v2(status_output):
     """
-    プロジェクトのGit情報を取得
+    `git status --porcelain=v2 --branch` の出力をパース
+
+    Args:
+        status_output: コマンドの出力
+
+    Returns:
+        (branch, changed_files) のタプル
+        branch は `git rev-parse --abbrev-ref HEAD` と同じ値
+        （detached HEAD は "HEAD"、コミットが無い場合は None）
+    """
+    branch_head = None
+    branch_oid = None
+    changed_files = 0
+
+    for line in status_output.split('\n'):
+        if line.startswith('# branch.head '):
+            branch_head = line[len('# branch.head '):]
+        elif line.startswith('# branch.oid '):
+            branch_oid = line[len('# branch.oid '):]
+        elif line.startswith('#'):
+            continue
+        elif line:
+            # 1/2/u/? で始まる行が変更ファイル（`git status --short` の1行に対応）
+            changed_files += 1
+
+    if branch_oid is None or branch_oid == '(initial)':
+        # rev-parse --abbrev-ref HEAD はコミットが無いと失敗する
+        branch = None
+    elif branch_head == '(detached)':
+        branch = 'HEAD'
+    else:
+        branch = branch_head
+
+    return branch, changed_files
+
+
+def get_commit_info(project_path, use_git_reader=True):
+    """
+    HEAD のコミット情報を取得（分類に使う安価な情報）
+
+    use_git_reader が有効で .git を解釈できればサブプロセスを起動しない。
+    フォールバック時は git log の1回のみで、ブランチ名は取得しない（None）。
 
     Args:
         project_path: プロジェクトパス
+        use_git_reader: .git を直接読む高速パスを使うか
 
     Returns:
-        Git情報の辞書
+        {'branch', 'last_commit', 'last_commit_timestamp', 'author_timestamp'} の辞書
+        （last_commit の相対時刻は author 日時、last_commit_timestamp は committer 日時）
     """
-    info = {}
+    # 高速パス: 解釈できなければ None が返るので git log にフォールバック
+    head_info = read_head_info(project_path) if use_git_reader else None
+    if head_info is not None:
+        return head_info
 
-    # ブランチ名
-    branch = run_git_command(project_path, ['git', 'rev-parse', '--abbrev-ref', 'HEAD'])
-    info['branch'] = branch if branch else 'unknown'
+    info = {'branch': None}
 
-    # 最終コミット（相対時刻とメッセージ）
-    last_commit = run_git_command(project_path, ['git', 'log', '-1', '--format=%ar|%s'])
+    # 最終コミット日時（Unix timestamp: 分類用）、author 日時と相対時刻・メッセージ
+    log_output = run_git_command(
+        project_path, ['git', 'log', '-1', '--format=%ct%x00%at%x00%ar|%s']
+    )
+    last_commit_time, _, rest = (log_output or '').partition('\0')
+    author_time, _, last_commit = rest.partition('\0')
     info['last_commit'] = last_commit if last_commit else 'unknown'
+    info['last_commit_timestamp'] = int(last_commit_time) if last_commit_time.isdigit() else 0
+    info['author_timestamp'] = int(author_time) if author_time.isdigit() else 0
 
-    # 最終コミット日時（Unix timestamp: 分類用）
-    last_commit_time = run_git_command(project_path, ['git', 'log', '-1', '--format=%ct'])
-    if last_commit_time and last_commit_time.isdigit():
-        info['last_commit_timestamp'] = int(last_commit_time)
-    else:
-        info['last_commit_timestamp'] = 0
+    return info
 
-    # 変更ファイル数
-    status_output = run_git_command(project_path, ['git', 'status', '--short'])
-    if status_output:
-        info['changed_files'] = len(status_output.split('\n'))
-    else:
-        info['changed_files'] = 0
+
+def get_status_info(project_path):
+    """
+    ブランチ名と変更ファイル数を git status で取得（作業ツリーを走査するため高コスト）
+
+    Returns:
+        (branch, changed_files) のタプル（parse_status_porcelain_v2() と同じ）
+    """
+    status_output = run_git_command(
+        project_path,
+        ['git', 'status', '--porcelain=v2', '--branch']
+    )
+    return parse_status_porcelain_v2(status_output or '')
+
+
+def get_git_info(project_path, use_git_reader=True):
+    """
+    プロジェクトのGit情報を取得
+
+    Gitの起動コストを抑えるため、status と log の2回の呼び出しにまとめている。
+    use_git_reader が有効な場合、ブランチ名とHEADコミットは .git から直接読み取り
+    （git_reader.py）、git の起動は status の1回のみになる。
+
+    Args:
+        project_path: プロジェクトパス
+        use_git_reader: .git を直接読む高速パスを使うか
+
+    Returns:
+        Git情報の辞書
+    """
+    info = get_commit_info(project_path, use_git_reader)
+
+    # ブランチ名と変更ファイル数
+    branch, changed_files = get_status_info(project_path)
+    if info['branch'] is None:
+        info['branch'] = branch if branch else 'unknown'
+    info['changed_files'] = changed_files
 
     return info
 
@@ -183,12 +502,35 @@ def is_worktree(project_path):
     return git_path.is_file()
 
 
-def run_trufflehog_scan(project_path):
+def get_head_commit(project_path):
+    """
+    HEADのコミットSHA-1を取得（.git を直接読み、失敗したら git rev-parse）
+
+    Returns:
+        SHA-1、コミットが無い場合は None
+    """
+    sha = read_head_commit(project_path)
+    if sha is None:
+        sha = run_git_command(project_path, ['git', 'rev-parse', '--verify', '-q', 'HEAD'])
+    return sha or None
+
+
+def run_trufflehog_scan(project_path, state=None, full_scan=False,
+                        timeout=TRUFFLEHOG_TIMEOUT):
     """
     TruffleHogでプロジェクトをスキャン
 
+    state が指定された場合は増分スキャンを行う:
+        - 前回正常にスキャンした HEAD から変化が無ければ trufflehog を起動しない
+        - 前回の HEAD が現在の HEAD の祖先なら --since-commit で新しい履歴のみスキャン
+        - 検出数は state に累計で保存し、結果には累計値を返す
+    初回・履歴の書き換え（rebase等）・full_scan 指定時は全履歴をスキャンする。
+
     Args:
         project_path: プロジェクトパス
+        state: SecretScanState（None なら毎回全履歴をスキャンし、状態を保存しない）
+        full_scan: 保存済みの状態を無視して全履歴をスキャンするか
+        timeout: trufflehog のタイムアウト（秒）
 
     Returns:
         スキャン結果の辞書
@@ -200,31 +542,50 @@ def run_trufflehog_scan(project_path):
     }
 
     # trufflehogコマンドの存在確認
-    try:
-        subprocess.run(
-            ['which', 'trufflehog'],
-            capture_output=True,
-            check=True
-        )
-    except subprocess.CalledProcessError:
+    if shutil.which('trufflehog') is None:
         # trufflehogがインストールされていない
         return result
 
+    command = ['trufflehog', 'git', f'file://{project_path}', '--json', '--no-update']
+
+    head = None
+    previous = None  # 保存済みの状態（タイムアウト時の報告にも使う）
+    base = None      # 増分スキャンの起点
+    if state is not None:
+        head = get_head_commit(project_path)
+        previous = state.get(project_path)
+
+        if previous and head and not full_scan:
+            if previous['commit'] == head:
+                # 新しいコミットが無い
+                result["scanned"] = True
+                result["issues_found"] = previous['issues_found']
+                result["has_secrets"] = previous['issues_found'] > 0
+                return result
+
+            is_ancestor = run_git_command(
+                project_path,
+                ['git', 'merge-base', '--is-ancestor', previous['commit'], head]
+            )
+            if is_ancestor is not None:
+                base = previous
+                command.append(f"--since-commit={previous['commit']}")
+
     try:
         # trufflehogスキャン実行
         scan_result = subprocess.run(
-            ['trufflehog', 'git', f'file://{project_path}', '--json', '--no-update'],
+            command,
             capture_output=True,
             text=True,
-            timeout=30  # 30秒タイムアウト
+            timeout=timeout
         )
 
         result["scanned"] = True
 
         # JSON形式の出力をパース
+        issues_count = 0
         if scan_result.stdout:
             lines = scan_result.stdout.strip().split('\n')
-            issues_count = 0
             for line in lines:
                 try:
                     issue = json.loads(line)
@@ -233,12 +594,24 @@ def run_trufflehog_scan(project_path):
                 except json.JSONDecodeError:
                     continue
 
-            result["issues_found"] = issues_count
-            result["has_secrets"] = issues_count > 0
+        if base is not None:
+            issues_count += base['issues_found']
+            result["incremental"] = True
+
+        result["issues_found"] = issues_count
+        result["has_secrets"] = issues_count > 0
+
+        # 正常終了した場合のみ状態を進める（エラー時は次回同じ範囲を再スキャン）
+        if state is not None and head and scan_result.returncode == 0:
+            state.update(project_path, head, issues_count)
 
     except subprocess.TimeoutExpired:
         result["scanned"] = True
         result["timeout"] = True
+        if previous:
+            # 前回までの検出数を報告（サマリーから漏れないように）
+            result["issues_found"] = previous['issues_found']
+            result["has_secrets"] = previous['issues_found'] > 0
     except Exception:
         # エラーが発生してもスキャンは続行
         pass
@@ -319,6 +692,362 @@ def classify_project(last_commit_timestamp, active_days, inactive_days):
         return "dormant"
 
 
+def scan_project(project_path, active_days, inactive_days, use_git_reader=True,
+                 cache=None, fields=None, categories=None, changed_since=None):
+    """
+    1プロジェクト分のメタデータを収集
+
+    安価な情報から順に評価する。まず最終コミット日時（.git を直接読めれば
+    サブプロセス不要）で分類・絞り込みを行い、除外されたプロジェクトでは
+    git status もドキュメントの読み込みも行わない。高コストなフィールド
+    （COSTLY_FIELDS）は fields に含まれる場合のみ取得する。
+
+    TruffleHog スキャンは重いため別ステージ（run_security_scans）で行う。
+    security_scan は None のまま返す。
+
+    並列実行されるため、共有状態を変更しないこと（cache はスレッドセーフ）。
+
+    Args:
+        project_path: プロジェクトパス
+        active_days: アクティブ基準日数
+        inactive_days: 休止中基準日数
+        use_git_reader: .git を直接読む高速パスを使うか
+        cache: ScanCache（None ならキャッシュを使わない）
+        fields: 必要なフィールドの集合（None なら全て）
+        categories: 出力する分類の集合（None なら全て）
+        changed_since: この Unix timestamp 以降にコミットがあるプロジェクトのみ出力
+
+    Returns:
+        プロジェクト情報の辞書（fields に含まれない高コストなフィールドは持たない）。
+        categories / changed_since で除外された場合は None
+    """
+    project_name = Path(project_path).name
+    if fields is None:
+        fields = PROJECT_FIELDS
+
+    # キャッシュ参照（フィンガープリントが一致すればサブプロセス不要）
+    fingerprint = None
+    data = None
+    if cache is not None:
+        fingerprint = compute_fingerprint(project_path)
+        data = cache.lookup(project_path, fingerprint)
+
+    if data is None:
+        # 安価な情報のみ取得（高コストな情報は必要になった時点で取得）
+        data = get_commit_info(project_path, use_git_reader)
+        data.update({
+            # worktree判定
+            "is_worktree": is_worktree(project_path),
+            "docs": None
+        })
+        if cache is not None:
+            cache.store(project_path, fingerprint, data)
+        last_commit = data['last_commit']
+    elif data['author_timestamp'] and data['last_commit'] != 'unknown':
+        # 相対時刻はキャッシュ時点のものなので再計算（git の %ar と同じく author 日時から）
+        if uses_english_dates():
+            subject = data['last_commit'].partition('|')[2]
+            last_commit = f"{format_relative_date(data['author_timestamp'])}|{subject}"
+        else:
+            # git が翻訳して出力するロケールでは git log に任せる
+            last_commit = get_commit_info(project_path, use_git_reader=False)['last_commit']
+    else:
+        last_commit = data['last_commit']
+
+    # 分類（時間経過で変わるため毎回計算）
+    category = classify_project(
+        data['last_commit_timestamp'],
+        active_days,
+        inactive_days
+    )
+
+    # 絞り込み（ここで除外されれば高コストな処理は一切行わない）
+    if categories is not None and category not in categories:
+        return None
+    if changed_since is not None and data['last_commit_timestamp'] < changed_since:
+        return None
+
+    # ブランチ名と変更ファイル数（git status）
+    # git log にフォールバックした場合はブランチ名も git status から得る。
+    # 作業ツリーの編集はフィンガープリントに現れないため、変更ファイル数は
+    # キャッシュせず毎回取得する
+    changed_files = None
+    if 'changed_files' in fields or (data['branch'] is None and 'branch' in fields):
+        branch, changed_files = get_status_info(project_path)
+        if data['branch'] is None:
+            data['branch'] = branch if branch else 'unknown'
+
+    project = {
+        "name": project_name,
+        "path": project_path,
+        "branch": data['branch'] if data['branch'] is not None else 'unknown',
+        "last_commit": last_commit,
+        "last_commit_timestamp": data['last_commit_timestamp'],
+    }
+    if 'changed_files' in fields:
+        project['changed_files'] = changed_files
+    project['category'] = category
+    project['is_worktree'] = data['is_worktree']
+
+    # ドキュメント情報取得（アクティブなプロジェクトのみ）
+    if 'docs' in fields:
+        docs = {}
+        if category in ["active", "developing"]:
+            if data['docs'] is None:
+                with measure('docs', project_path):
+                    data['docs'] = read_project_docs(project_path)
+            docs = data['docs']
+        project['docs'] = docs
+
+    if 'security_scan' in fields:
+        # run_security_scans で埋める
+        project['security_scan'] = None
+
+    return project
+
+
+def select_fields(project, fields):
+    """
+    出力するフィールドだけを残す（name と path は常に残す）
+
+    Args:
+        project: プロジェクト情報の辞書
+        fields: 出力するフィールドの集合（None なら全て）
+    """
+    if fields is None:
+        return project
+    return {key: value for key, value in project.items()
+            if key in fields or key in IDENTITY_FIELDS}
+
+
+def scan_projects(project_paths, active_days, inactive_days, jobs=1,
+                  use_git_reader=True, cache=None, fields=None, categories=None,
+                  changed_since=None):
+    """
+    複数プロジェクトのメタデータを収集
+
+    処理のほとんどはサブプロセス待ちなので、スレッドプールで並列化する。
+    結果は project_paths と同じ順序で返す（出力を決定的に保つため）。
+
+    Args:
+        project_paths: プロジェクトパスのリスト
+        active_days: アクティブ基準日数
+        inactive_days: 休止中基準日数
+        jobs: 並列ワーカー数（1以下なら逐次実行）
+        use_git_reader: .git を直接読む高速パスを使うか
+        cache: ScanCache（None ならキャッシュを使わない）
+        fields, categories, changed_since: scan_project() の引数
+
+    Returns:
+        プロジェクト情報の辞書のリスト（絞り込みで除外されたものは含まない）
+    """
+    def scan(path):
+        with measure('metadata', path):
+            return scan_project(path, active_days, inactive_days, use_git_reader, cache,
+                                fields, categories, changed_since)
+
+    if jobs <= 1 or len(project_paths) <= 1:
+        results = [scan(path) for path in project_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # map() は入力順に結果を返す
+            results = list(executor.map(scan, project_paths))
+
+    return [project for project in results if project is not None]
+
+
+def iter_scan_projects(project_paths, active_days, inactive_days, jobs=1,
+                       use_git_reader=True, cache=None, fields=None, categories=None,
+                       changed_since=None):
+    """
+    複数プロジェクトのメタデータを収集し、完了したものから順に返す
+
+    引数は scan_projects() と同じ。順序は決定的ではない。
+
+    Yields:
+        プロジェクト情報の辞書（完了順、絞り込みで除外されたものは含まない）
+    """
+    def scan(path):
+        with measure('metadata', path):
+            return scan_project(path, active_days, inactive_days, use_git_reader, cache,
+                                fields, categories, changed_since)
+
+    if jobs <= 1:
+        for path in project_paths:
+            project = scan(path)
+            if project is not None:
+                yield project
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(scan, path) for path in project_paths]
+        try:
+            for future in as_completed(futures):
+                project = future.result()
+                if project is not None:
+                    yield project
+        finally:
+            # 途中で止めた場合、未開始のスキャンは実行しない（実行中のものだけを待つ）
+            for future in futures:
+                future.cancel()
+
+
+def skipped_security_scan(project_path, state=None):
+    """
+    時間予算切れでスキャンしなかったプロジェクトの結果
+
+    前回完了したスキャンの検出数があれば、それを報告する。
+    """
+    result = {
+        "scanned": False,
+        "issues_found": 0,
+        "has_secrets": False,
+        "skipped": True
+    }
+    previous = state.get(project_path) if state is not None else None
+    if previous:
+        result["issues_found"] = previous['issues_found']
+        result["has_secrets"] = previous['issues_found'] > 0
+    return result
+
+
+def run_security_scans(projects, jobs=DEFAULT_SECRET_SCAN_JOBS, budget=None,
+                       secret_state=None, full_scan=False, announce=False):
+    """
+    TruffleHog スキャンをメタデータ収集とは別のステージとして実行
+
+    アクティブなプロジェクトから順にスキャンし、休止中（dormant）は最後に回す。
+    budget（秒）を指定すると、予算を超えた時点で未開始のプロジェクトはスキャンせず、
+    実行中のスキャンも残り時間でタイムアウトさせる。
+
+    projects はジェネレータでもよい（iter_scan_projects と組み合わせると、
+    メタデータ収集と並行してスキャンが始まる）。その場合の優先順位は、
+    その時点で待機中のプロジェクトの中での順位になる。
+
+    Args:
+        projects: scan_project() の結果のイテラブル
+        jobs: TruffleHog の同時実行数
+        budget: ステージ全体の時間予算（秒、None なら無制限）
+        secret_state: SecretScanState（None なら毎回全履歴をスキャン）
+        full_scan: 全履歴を再スキャンするか
+        announce: True なら、プロジェクトを受け取った時点で (project, None) も返す
+            （スキャン待ちの間にメタデータを先に出力するため）
+
+    Yields:
+        (project, security_scan) のタプル（完了順）。途中で止めた場合、
+        未開始のスキャンは実行せず、projects の消費も打ち切る
+    """
+    deadline = time.monotonic() + budget if budget is not None else None
+    workers = max(1, jobs)
+    stopped = threading.Event()
+
+    # (優先順位, 投入順, project)。投入順で同じ分類内の順序を保つ
+    pending = queue.PriorityQueue()
+    results = queue.Queue()
+    sequence = itertools.count()
+    stop_priority = max(SECRET_SCAN_PRIORITY.values()) + 1
+
+    def scan(project):
+        timeout = TRUFFLEHOG_TIMEOUT
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return skipped_security_scan(project['path'], secret_state)
+            timeout = min(timeout, remaining)
+        with measure('secret_scan', project['path']):
+            return run_trufflehog_scan(project['path'], secret_state, full_scan, timeout)
+
+    def feed():
+        try:
+            for project in projects:
+                if stopped.is_set():
+                    break
+                if announce:
+                    results.put(('result', (project, None)))
+                priority = SECRET_SCAN_PRIORITY.get(project['category'], 2)
+                pending.put((priority, next(sequence), project))
+        except Exception as e:
+            results.put(('error', e))
+        finally:
+            if stopped.is_set() and hasattr(projects, 'close'):
+                # ジェネレータはこのスレッドで消費しているので、ここで閉じる
+                projects.close()
+            # 停止マーカーは最低優先度なので、全プロジェクトの後に取り出される
+            for _ in range(workers):
+                pending.put((stop_priority, next(sequence), None))
+
+    def work():
+        while True:
+            _, _, project = pending.get()
+            if project is None or stopped.is_set():
+                results.put(('done', None))
+                return
+            results.put(('result', (project, scan(project))))
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    threads += [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    finished = 0
+    try:
+        while finished < workers:
+            kind, value = results.get()
+            if kind == 'done':
+                finished += 1
+            elif kind == 'error':
+                raise value
+            else:
+                yield value
+    finally:
+        stopped.set()
+
+
+def positive_float(value):
+    """argparse用: 0より大きい数値"""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be > 0: {value}")
+    return number
+
+
+def positive_int(value):
+    """argparse用: 1以上の整数"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1: {value}")
+    return number
+
+
+def comma_list(choices):
+    """argparse用: カンマ区切りのリスト（各要素は choices のいずれか）"""
+    def parse(value):
+        items = [item.strip() for item in value.split(',') if item.strip()]
+        invalid = [item for item in items if item not in choices]
+        if invalid or not items:
+            raise argparse.ArgumentTypeError(
+                f"invalid value: {value!r} (choose from {', '.join(choices)})"
+            )
+        return set(items)
+    return parse
+
+
+def since_timestamp(value):
+    """argparse用: ISO 8601 の日付・日時（ローカル時刻）を Unix timestamp に変換"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid date: {value!r} (expected YYYY-MM-DD or YYYY-MM-DDTHH:MM)"
+        )
+
+
 def parse_args():
     """コマンドライン引数をパース"""
     parser = argparse.ArgumentParser(description='YPM Project Scanner')
@@ -328,84 +1057,655 @@ def parse_args():
         default=None,
         help='Path to config.yml (default: ~/.ypm/config.yml)'
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '--jobs', '-j',
+        type=positive_int,
+        default=os.cpu_count() or 1,
+        help='Number of projects to scan in parallel (default: CPU count)'
+    )
+    parser.add_argument(
+        '--no-git-reader',
+        dest='git_reader',
+        action='store_false',
+        help='Always spawn git instead of reading HEAD and commits from .git directly'
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='use_cache',
+        action='store_false',
+        help='Do not read or write the scan cache (~/.ypm/scan_cache.json)'
+    )
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help='Discard the scan cache before scanning'
+    )
+    parser.add_argument(
+        '--full-secret-scan',
+        action='store_true',
+        help='Rescan the full git history with TruffleHog instead of only new commits'
+    )
+    parser.add_argument(
+        '--scan-jobs',
+        type=positive_int,
+        default=DEFAULT_SECRET_SCAN_JOBS,
+        help=f'Number of TruffleHog scans run in parallel (default: {DEFAULT_SECRET_SCAN_JOBS})'
+    )
+    parser.add_argument(
+        '--scan-budget',
+        type=positive_float,
+        default=None,
+        metavar='SECONDS',
+        help='Total time budget for TruffleHog scans; projects not scanned in time '
+             'are reported with "skipped": true (default: no limit)'
+    )
+    parser.add_argument(
+        '--discovery-stats',
+        action='store_true',
+        help='Print project discovery statistics (directories walked, time) to stderr'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and rewrite the snapshot file whenever a project changes '
+             '(inotify on Linux, polling elsewhere)'
+    )
+    parser.add_argument(
+        '--snapshot',
+        type=str,
+        default=None,
+        help='Snapshot file written by --watch (default: ~/.ypm/scan_snapshot.json)'
+    )
+    parser.add_argument(
+        '--refresh-interval',
+        type=positive_float,
+        default=DEFAULT_WATCH_REFRESH_INTERVAL,
+        metavar='SECONDS',
+        help='--watch: re-evaluate all projects this often to refresh relative times '
+             f'and categories (default: {DEFAULT_WATCH_REFRESH_INTERVAL})'
+    )
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='--watch: poll for changes instead of using inotify'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['json', 'ndjson'],
+        default='json',
+        help='json: one document after all projects are scanned (default). '
+             'ndjson: one line per project as soon as it is ready, then a summary line'
+    )
+    parser.add_argument(
+        '--render',
+        choices=['markdown'],
+        default=None,
+        help='Also write PROJECT_STATUS.md from the scan results, rewriting only the '
+             'project sections whose data changed (JSON is still printed to stdout)'
+    )
+    parser.add_argument(
+        '--status-file',
+        type=str,
+        default=None,
+        help='Status file written by --render markdown (default: ~/.ypm/PROJECT_STATUS.md)'
+    )
+    parser.add_argument(
+        '--category',
+        type=comma_list(CATEGORIES),
+        default=None,
+        metavar='LIST',
+        help='Only output projects in these categories, e.g. active,developing. '
+             'Other projects are classified from their last commit and skipped '
+             'before git status, doc reads and TruffleHog'
+    )
+    parser.add_argument(
+        '--changed-since',
+        type=since_timestamp,
+        default=None,
+        metavar='DATE',
+        help='Only output projects with a commit on or after DATE (YYYY-MM-DD[THH:MM])'
+    )
+    parser.add_argument(
+        '--fields',
+        type=comma_list(PROJECT_FIELDS),
+        default=None,
+        metavar='LIST',
+        help='Only output these project fields (name and path are always included); '
+             f'{", ".join(COSTLY_FIELDS)} are only computed when listed. '
+             'last_commit_timestamp is only output when listed or with --render'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Add a "timings" block to the output: wall time per phase, per-project '
+             'time for metadata, docs and TruffleHog, per git subcommand totals and '
+             'percentiles, and the slowest projects'
+    )
+    parser.add_argument(
+        '--profile-top',
+        type=positive_int,
+        default=DEFAULT_TOP,
+        metavar='N',
+        help=f'Number of slowest projects listed in "timings" (default: {DEFAULT_TOP})'
+    )
+    parser.add_argument(
+        '--profile-dump',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='Also run cProfile (main thread and scan workers) and write the merged '
+             'stats to FILE in pstats format; implies --profile'
+    )
+    args = parser.parse_args()
+    if args.profile_dump:
+        args.profile = True
+    if args.profile and args.watch:
+        parser.error('--profile cannot be used with --watch')
+    # ステータスファイルは全プロジェクトを載せるため、絞り込むと他のセクションが消える
+    if args.render and (args.category is not None or args.changed_since is not None):
+        parser.error('--render cannot be used with --category or --changed-since')
+    return args
 
 
 def main():
-    """メイン処理"""
+    """メイン処理（iter_projects() の CLI）"""
     args = parse_args()
 
+    profiler = None
+    if args.profile:
+        profiler = ScanProfiler(args.profile_top, cprofile=bool(args.profile_dump))
+        enable_profiling(profiler)
+
     # config.yml読み込み
     config = load_config(args.config)
+    settings = scan_settings(config)
 
-    monitor_config = config.get('monitor', {})
-    base_dirs = monitor_config.get('directories', [])
-    patterns = monitor_config.get('patterns', ['*'])
-    excludes = monitor_config.get('exclude', [])
+    # プロジェクト検出
+    discovery_stats = {}
+    with phase('discovery'):
+        project_paths = find_projects(
+            settings['base_dirs'], settings['patterns'], settings['excludes'],
+            discovery_stats
+        )
+    if args.discovery_stats:
+        print(json.dumps({"discovery": discovery_stats}), file=sys.stderr)
+
+    # スキャンキャッシュ
+    if args.clear_cache:
+        ScanCache().clear()
+
+    # 取得するフィールド（サマリーの分類と --render が使うフィールドは出力しなくても取得する）
+    fields = args.fields
+    needed = set(fields) if fields is not None else set(PROJECT_FIELDS)
+    needed.add('category')
+    render_options = None
+    if args.render == 'markdown':
+        render_options = {
+            'status_path': args.status_file,
+            'language': (config.get('settings') or {}).get('language', 'en')
+        }
+        needed |= set(RENDER_FIELDS)
+    elif fields is None:
+        fields = set(DEFAULT_FIELDS)
+
+    if args.watch:
+        watch_main(args, settings, needed, fields, render_options)
+        return
+
+    records = iter_projects(
+        config,
+        paths=project_paths,
+        prune=True,
+        fields=needed,
+        categories=args.category,
+        changed_since=args.changed_since,
+        ordered=args.format == 'json',
+        jobs=args.jobs,
+        use_git_reader=args.git_reader,
+        use_cache=args.use_cache,
+        scan_jobs=args.scan_jobs,
+        scan_budget=args.scan_budget,
+        full_secret_scan=args.full_secret_scan,
+        metadata_first=args.format == 'ndjson'
+    )
+    projects = (record.to_dict() for record in records)
+    if profiler is not None:
+        projects = profiler.iterate('scan', projects)
 
-    classification_config = config.get('classification', {})
-    active_days = classification_config.get('active_days', 7)
-    inactive_days = classification_config.get('inactive_days', 30)
+    if args.format == 'ndjson':
+        projects = write_ndjson(projects, fields, profiler)
+    else:
+        projects = write_json(list(projects), fields, profiler)
 
-    # プロジェクト検出
-    project_paths = find_projects(base_dirs, patterns, excludes)
+    if render_options is not None:
+        write_status(projects, render_options)
+
+    if args.profile_dump:
+        profiler.dump(args.profile_dump)
+
+
+def watch_main(args, settings, fields, output_fields, render_options):
+    """--watch: キャッシュ・スキャン状態を開いて watch_projects() を実行"""
+    cache = None
+    if args.use_cache:
+        cache = ScanCache().load()
+
+    scan_options = {
+        'jobs': args.jobs,
+        'use_git_reader': args.git_reader,
+        'cache': cache,
+        'fields': fields,
+        'categories': args.category,
+        'changed_since': args.changed_since
+    }
+    security_options = None
+    if 'security_scan' in fields:
+        security_options = {
+            'jobs': args.scan_jobs,
+            'budget': args.scan_budget,
+            'secret_state': SecretScanState().load(),
+            'full_scan': args.full_secret_scan
+        }
+
+    snapshot_path = Path(args.snapshot) if args.snapshot else get_default_snapshot_path()
+    watch_projects(
+        settings['base_dirs'], settings['patterns'], settings['excludes'],
+        settings['active_days'], settings['inactive_days'],
+        scan_options, security_options, snapshot_path,
+        refresh_interval=args.refresh_interval,
+        use_inotify=not args.poll,
+        render_options=render_options,
+        fields=output_fields
+    )
+
+
+def scan_settings(config):
+    """config から検出・分類の設定を取り出す"""
+    monitor_config = config.get('monitor') or {}
+    classification_config = config.get('classification') or {}
+    return {
+        'base_dirs': monitor_config.get('directories', []),
+        'patterns': monitor_config.get('patterns', ['*']),
+        'excludes': monitor_config.get('exclude', []),
+        'active_days': classification_config.get('active_days', 7),
+        'inactive_days': classification_config.get('inactive_days', 30)
+    }
+
+
+def iter_projects(config=None, paths=None, prune=None, fields=None, categories=None,
+                  changed_since=None, ordered=False, jobs=None, use_git_reader=True,
+                  use_cache=True, scan_jobs=DEFAULT_SECRET_SCAN_JOBS, scan_budget=None,
+                  full_secret_scan=False, metadata_first=False):
+    """
+    プロジェクトをスキャンし、完了したものから ProjectRecord を返す
+
+    他のツール（MCP サーバー、onboarding.py 等）から import して使うための API。
+    Python の起動や JSON の往復なしにスキャン結果を受け取れる:
+
+        from scan_projects import iter_projects
+
+        for record in iter_projects(categories={'active'}, fields={'branch'}):
+            print(record.name, record.branch)
+
+    キャッシュと TruffleHog のスキャン状態は、イテレーションの終了時
+    （途中で止めた場合も）に保存する。
+
+    Args:
+        config: 設定の辞書、config.yml のパス、または None（~/.ypm/config.yml）
+        paths: スキャンするプロジェクトパスのリスト（None なら config の監視対象から検出）
+        prune: paths に無いプロジェクトをキャッシュから削除するか
+            （None なら paths を検出した場合のみ。paths が監視対象の一部なら False にすること）
+        fields: 取得するフィールドのイテラブル（None なら全て。name と path は常に含む）。
+            COSTLY_FIELDS は含まれる場合のみ取得する
+        categories: 出力する分類のイテラブル（None なら全て）
+        changed_since: この日時以降にコミットがあるプロジェクトのみ出力
+            （datetime または Unix timestamp）
+        ordered: True なら全プロジェクトの完了後に paths の順序で返す
+        jobs: メタデータ収集の並列数（None なら CPU 数）
+        use_git_reader: .git を直接読む高速パスを使うか
+        use_cache: スキャンキャッシュを使うか
+        scan_jobs, scan_budget, full_secret_scan: TruffleHog ステージの設定
+            （run_security_scans() の jobs / budget / full_scan）
+        metadata_first: True なら（ordered でない場合）、メタデータ収集が終わった時点で
+            security_scan が None のレコードを先に返し、TruffleHog の完了後に
+            同じプロジェクトのレコードをもう一度返す
+
+    Yields:
+        ProjectRecord（選択されたフィールドのみ値を持つ）
+
+    Raises:
+        ConfigError: config.yml が無い・読み込めない場合
+    """
+    if not isinstance(config, dict):
+        config = read_config(config)
+    settings = scan_settings(config)
+
+    if paths is None:
+        paths = find_projects(settings['base_dirs'], settings['patterns'], settings['excludes'])
+        if prune is None:
+            prune = True
+
+    fields = set(PROJECT_FIELDS) if fields is None else set(fields) | set(IDENTITY_FIELDS)
+    if categories is not None:
+        categories = set(categories)
+    if changed_since is not None and not isinstance(changed_since, (int, float)):
+        changed_since = changed_since.timestamp()
+
+    cache = ScanCache().load() if use_cache else None
+    secret_state = SecretScanState().load()
+
+    scan_options = {
+        'jobs': jobs if jobs is not None else os.cpu_count() or 1,
+        'use_git_reader': use_git_reader,
+        'cache': cache,
+        'fields': fields,
+        'categories': categories,
+        'changed_since': changed_since
+    }
+    security_options = None
+    if 'security_scan' in fields:
+        security_options = {
+            'jobs': scan_jobs,
+            'budget': scan_budget,
+            'secret_state': secret_state,
+            'full_scan': full_secret_scan
+        }
+
+    projects = ()
+    try:
+        if ordered:
+            projects = scan_projects(
+                paths, settings['active_days'], settings['inactive_days'], **scan_options
+            )
+            # TruffleHogセキュリティスキャン（完了順に結果を埋める）
+            for _ in with_security_scans(projects, security_options):
+                pass
+        else:
+            projects = with_security_scans(
+                iter_scan_projects(
+                    paths, settings['active_days'], settings['inactive_days'], **scan_options
+                ),
+                security_options,
+                metadata_first
+            )
+        for project in projects:
+            yield ProjectRecord.from_dict(select_fields(project, fields))
+    finally:
+        # 途中で止めた場合、保存の前に未開始のスキャンを取り消す
+        if hasattr(projects, 'close'):
+            projects.close()
+        save_stores((cache, secret_state), paths if prune else None)
+
+
+def save_stores(stores, project_paths=None):
+    """
+    キャッシュ・スキャン状態を保存
+
+    project_paths を指定すると、含まれないリポジトリ（消えたもの）のエントリは削除する。
+    失敗しても警告のみ（スキャン結果は出力済み）。
+    """
+    for store in stores:
+        if store is None:
+            continue
+        if project_paths is not None:
+            store.prune(project_paths)
+        try:
+            store.save()
+        except OSError as e:
+            print(json.dumps({"warning": f"Failed to save {store.path}: {e}"}), file=sys.stderr)
+
+
+def write_status(projects, render_options):
+    """
+    PROJECT_STATUS.md を更新し、統計を標準エラー出力に出力
+
+    失敗しても警告のみ（スキャン結果は出力済み）。
+
+    Args:
+        projects: security_scan 済みのプロジェクト情報のリスト
+        render_options: render_status() のキーワード引数
+    """
+    try:
+        stats = render_status(projects, **render_options)
+    except OSError as e:
+        print(json.dumps({"warning": f"Failed to write PROJECT_STATUS.md: {e}"}), file=sys.stderr)
+        return
+    print(json.dumps({"render": stats}, ensure_ascii=False), file=sys.stderr, flush=True)
+
+
+def build_summary(categories, total):
+    """サマリーを生成"""
+    return {
+        "total": total,
+        "active": categories["active"],
+        "developing": categories["developing"],
+        "dormant": categories["dormant"],
+        "unknown": categories["unknown"]
+    }
+
+
+def with_security_scans(projects, security_options, metadata_first=False):
+    """
+    TruffleHog スキャンの結果を security_scan に埋めて、完了順に返す
 
-    # 各プロジェクトの情報を収集
-    projects = []
+    Args:
+        projects: scan_project() の結果のイテラブル
+        security_options: run_security_scans() のキーワード引数
+            （None なら security_scan を取得しないのでスキャンせずにそのまま返す）
+        metadata_first: True なら、メタデータ収集が終わった時点で security_scan が
+            None のまま一度返し、スキャン完了後に同じ辞書をもう一度返す
+
+    Yields:
+        プロジェクト情報の辞書
+    """
+    if security_options is None:
+        yield from projects
+        return
+    for project, security_scan in run_security_scans(
+        projects, announce=metadata_first, **security_options
+    ):
+        if security_scan is not None:
+            project['security_scan'] = security_scan
+        yield project
+
+
+def write_json(projects, fields=None, profiler=None):
+    """
+    全プロジェクトのスキャン完了後に、1つのJSONドキュメントとして出力
+
+    Args:
+        projects: プロジェクト情報のリスト（この順序で出力する）
+        fields: 出力するフィールドの集合（None なら全て）
+        profiler: ScanProfiler（指定すると "timings" を含める）
+
+    Returns:
+        projects
+    """
+    result = build_result(projects, fields)
+    if profiler is not None:
+        result["timings"] = profiler.summary()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return projects
+
+
+def build_result(projects, fields=None):
+    """JSON出力（projects・summary・scan_time）を生成"""
     categories = {"active": 0, "developing": 0, "dormant": 0, "unknown": 0}
+    for project in projects:
+        categories[project['category']] += 1
 
-    for project_path in project_paths:
-        project_name = Path(project_path).name
+    return {
+        "projects": [select_fields(project, fields) for project in projects],
+        "summary": build_summary(categories, len(projects)),
+        "scan_time": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
 
-        # Git情報取得
-        git_info = get_git_info(project_path)
 
-        # 分類
-        category = classify_project(
-            git_info['last_commit_timestamp'],
-            active_days,
-            inactive_days
-        )
-        categories[category] += 1
+def write_ndjson(projects, fields=None, profiler=None):
+    """
+    プロジェクトごとに、メタデータの収集が完了した時点で1行ずつ出力
 
-        # ドキュメント情報取得（アクティブなプロジェクトのみ）
-        docs = {}
-        if category in ["active", "developing"]:
-            docs = read_project_docs(project_path)
-
-        # worktree判定
-        is_wt = is_worktree(project_path)
-
-        # TruffleHogセキュリティスキャン
-        security_scan = run_trufflehog_scan(project_path)
-
-        # プロジェクト情報を追加
-        projects.append({
-            "name": project_name,
-            "path": project_path,
-            "branch": git_info['branch'],
-            "last_commit": git_info['last_commit'],
-            "changed_files": git_info['changed_files'],
-            "category": category,
-            "is_worktree": is_wt,
-            "docs": docs,
-            "security_scan": security_scan
-        })
+    各行は write_json() の projects 要素と同じ形式（security_scan はまだ null）。
+    TruffleHog の完了後に {"update": "security_scan", "path": ..., "security_scan": ...}
+    の1行を出力する。最後に {"summary": ..., "scan_time": ...} の1行を出力する
+    （profiler を指定した場合は "timings" も含める）。
 
-    # 結果をJSON形式で出力
-    result = {
-        "projects": projects,
-        "summary": {
-            "total": len(projects),
-            "active": categories["active"],
-            "developing": categories["developing"],
-            "dormant": categories["dormant"],
-            "unknown": categories["unknown"]
-        },
+    Args:
+        projects: プロジェクト情報のイテラブル（iter_projects(metadata_first=True) の
+            完了順。同じ path の2回目はスキャン結果の更新として扱う）
+        fields: 出力するフィールドの集合（None なら全て）
+        profiler: ScanProfiler
+
+    Returns:
+        プロジェクト情報のリスト（出力順、security_scan を埋めたもの）
+    """
+    categories = {"active": 0, "developing": 0, "dormant": 0, "unknown": 0}
+    written = {}
+
+    for project in projects:
+        previous = written.get(project['path'])
+        if previous is None:
+            categories[project['category']] += 1
+            written[project['path']] = project
+            line = select_fields(project, fields)
+        else:
+            previous['security_scan'] = project.get('security_scan')
+            if fields is not None and 'security_scan' not in fields:
+                continue
+            line = {
+                "update": "security_scan",
+                "path": project['path'],
+                "security_scan": previous['security_scan'],
+            }
+        print(json.dumps(line, ensure_ascii=False), flush=True)
+
+    summary = {
+        "summary": build_summary(categories, len(written)),
         "scan_time": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
+    if profiler is not None:
+        summary["timings"] = profiler.summary()
+    print(json.dumps(summary, ensure_ascii=False), flush=True)
+    return list(written.values())
 
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+def write_snapshot(snapshot_path, result):
+    """スナップショットをアトミックに書き込み（読み手が書きかけを見ないように）"""
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, snapshot_path)
+
+
+def watch_projects(base_dirs, patterns, excludes, active_days, inactive_days,
+                   scan_options, security_options, snapshot_path,
+                   refresh_interval=DEFAULT_WATCH_REFRESH_INTERVAL, use_inotify=True,
+                   render_options=None, fields=None):
+    """
+    常駐してプロジェクトの変更を監視し、スナップショットを更新し続ける
+
+    .git/HEAD・.git/index・refs が変わったプロジェクトだけを再スキャンする。
+    refresh_interval ごとに全プロジェクトを再評価し（キャッシュにより変更の無い
+    プロジェクトはサブプロセス不要）、WATCH_DISCOVERY_INTERVAL ごとに
+    新しいリポジトリを検出する。Ctrl+C / SIGTERM で終了し、スナップショットを削除する。
+
+    スナップショットは通常の JSON 出力と同じ形式に "watch" ブロックを加えたもの。
+
+    Args:
+        base_dirs, patterns, excludes: find_projects() の引数
+        active_days, inactive_days: 分類の基準日数
+        scan_options: scan_projects() のキーワード引数
+        security_options: run_security_scans() のキーワード引数（None ならスキャンしない）
+        snapshot_path: スナップショットの出力先
+        refresh_interval: 全プロジェクトを再評価する間隔（秒）
+        use_inotify: False ならポーリングで監視
+        render_options: 指定時はスナップショットと同時に PROJECT_STATUS.md も更新
+            （render_status() のキーワード引数）
+        fields: 出力するフィールドの集合（None なら全て）
+    """
+    stores = (scan_options.get('cache'), (security_options or {}).get('secret_state'))
+    records = {}
+    watcher = create_watcher(use_inotify=use_inotify)
+    mode = type(watcher).__name__.replace('Watcher', '').lower()
+    started = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def rescan(paths):
+        projects = scan_projects(sorted(paths), active_days, inactive_days, **scan_options)
+        # 絞り込み（--category 等）から外れたプロジェクトは除く
+        for path in paths:
+            records.pop(path, None)
+        for project in with_security_scans(projects, security_options):
+            records[project['path']] = project
+
+    def publish(project_paths):
+        projects = [records[path] for path in project_paths if path in records]
+        result = build_result(projects, fields)
+        result["watch"] = {
+            "pid": os.getpid(),
+            "mode": mode,
+            "started": started,
+            "updated": result["scan_time"]
+        }
+        write_snapshot(snapshot_path, result)
+        if render_options is not None:
+            write_status(projects, render_options)
+        save_stores(stores, project_paths)
+
+    def handle_sigterm(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    project_paths = find_projects(base_dirs, patterns, excludes)
+    for path in project_paths:
+        watcher.add(path)
+    rescan(project_paths)
+    publish(project_paths)
+    print(json.dumps({
+        "watch": {"snapshot": str(snapshot_path), "mode": mode, "projects": len(project_paths)}
+    }), file=sys.stderr, flush=True)
+
+    last_refresh = last_discovery = time.monotonic()
+    try:
+        while True:
+            next_event = min(last_refresh + refresh_interval,
+                             last_discovery + WATCH_DISCOVERY_INTERVAL)
+            changed = watcher.wait(max(0, next_event - time.monotonic()))
+            dirty = bool(changed)
+            now = time.monotonic()
+
+            if now - last_discovery >= WATCH_DISCOVERY_INTERVAL:
+                last_discovery = now
+                discovered = find_projects(base_dirs, patterns, excludes)
+                for path in set(project_paths) - set(discovered):
+                    watcher.remove(path)
+                    records.pop(path, None)
+                for path in set(discovered) - set(project_paths):
+                    watcher.add(path)
+                    changed.add(path)
+                if discovered != project_paths:
+                    project_paths = discovered
+                    dirty = True
+
+            if now - last_refresh >= refresh_interval:
+                last_refresh = now
+                changed |= set(project_paths)
+                dirty = True
+
+            if dirty:
+                changed &= set(project_paths)
+                if changed:
+                    rescan(changed)
+                publish(project_paths)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        try:
+            snapshot_path.unlink()
+        except FileNotFoundError:
+            pass
 
 
 if __name__ == "__main__":
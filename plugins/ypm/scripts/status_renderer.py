@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+PROJECT_STATUS.md レンダラー（scan_projects.py --render markdown 用）
+
+スキャン結果から ~/.ypm/PROJECT_STATUS.md を直接生成する。
+各プロジェクトは次のマーカーで囲んだセクションとして出力し、パスで参照できる:
+
+    <!-- ypm:project path="/path/to/project" digest="0123abcd" -->
+    ### project-name
+    ...
+    <!-- /ypm:project -->
+
+digest はセクションの元になったスキャン結果のハッシュ。再レンダリング時に
+digest が変わっていないセクションは既存の本文をそのまま残す。変化のあった
+セクションだけを作り直し、どのセクションも変わらなければファイルを書き換えない。
+
+作り直す場合も、マーカー内に追記された行（Next Task 等、レンダラーが出力する
+項目以外の行）は新しい項目の後ろに引き継ぐ。
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+
+# セクションの生成に使うプロジェクト情報のフィールド
+RENDER_FIELDS = (
+    'name', 'path', 'branch', 'last_commit', 'last_commit_timestamp',
+    'changed_files', 'category', 'is_worktree', 'docs', 'security_scan'
+)
+
+# セクションの形式（変えると既存のセクションを一度作り直す）
+SECTION_FORMAT = 2
+
+# 出力するカテゴリの順序
+CATEGORY_ORDER = ['active', 'developing', 'dormant', 'unknown']
+
+LABELS = {
+    'en': {
+        'title': "Project Status",
+        'updated': "Last updated",
+        'summary': "{total} projects: {active} active, {developing} in development, "
+                   "{dormant} inactive, {unknown} unknown",
+        'active': "Active Projects",
+        'developing': "In Development",
+        'dormant': "Inactive Projects",
+        'unknown': "Unknown",
+        'none': "_None_",
+        'worktree': "(Git worktree)",
+        'branch': "Branch",
+        'last_commit': "Last Updated",
+        'overview': "Overview",
+        'phase': "Phase",
+        'changes': "Uncommitted changes",
+        'file': "{count} file",
+        'files': "{count} files",
+        'secrets': "Secrets",
+        'secrets_found': "⚠️ {count} potential secrets found by TruffleHog",
+        'unknown_value': "unknown",
+    },
+    'ja': {
+        'title': "プロジェクトステータス",
+        'updated': "最終更新",
+        'summary': "全 {total} 件: アクティブ {active} / 開発中 {developing} / "
+                   "休止中 {dormant} / 不明 {unknown}",
+        'active': "アクティブなプロジェクト",
+        'developing': "開発中",
+        'dormant': "休止中のプロジェクト",
+        'unknown': "不明",
+        'none': "_なし_",
+        'worktree': "(Git worktree)",
+        'branch': "ブランチ",
+        'last_commit': "最終コミット",
+        'overview': "概要",
+        'phase': "フェーズ",
+        'changes': "未コミットの変更",
+        'file': "{count} ファイル",
+        'files': "{count} ファイル",
+        'secrets': "シークレット",
+        'secrets_found': "⚠️ TruffleHog が {count} 件の秘密情報候補を検出",
+        'unknown_value': "不明",
+    },
+}
+
+SECTION_PATTERN = re.compile(
+    r'<!-- ypm:project path=(?P<path>"(?:[^"\\]|\\.)*") digest="(?P<digest>[0-9a-f]+)" -->\n'
+    r'.*?<!-- /ypm:project -->\n',
+    re.DOTALL
+)
+UPDATED_PATTERN = re.compile(r'^(?:Last updated|最終更新): (?P<value>.+)$', re.MULTILINE)
+
+# レンダラーが出力する項目の行（これ以外のセクション内の行は追記として引き継ぐ）
+RENDERED_LINE_PATTERN = re.compile(
+    r'^- \*\*(?:%s)\*\*: ' % '|'.join(sorted({
+        re.escape(labels[key])
+        for labels in LABELS.values()
+        for key in ('branch', 'last_commit', 'overview', 'phase', 'changes', 'secrets')
+    }))
+)
+
+
+def get_default_status_path():
+    """デフォルトの PROJECT_STATUS.md のパスを取得"""
+    return Path.home() / ".ypm" / "PROJECT_STATUS.md"
+
+
+def section_digest(project, language):
+    """
+    セクションの元になるデータのハッシュ
+
+    相対時刻（"3 days ago"）のように時間経過だけで変わる値は含めない。
+    """
+    security_scan = project.get('security_scan') or {}
+    key = {
+        'format': SECTION_FORMAT,
+        'language': language,
+        'name': project['name'],
+        'is_worktree': project['is_worktree'],
+        'category': project['category'],
+        'branch': project['branch'],
+        'last_commit_timestamp': project.get('last_commit_timestamp', 0),
+        'subject': project['last_commit'].partition('|')[2],
+        'changed_files': project['changed_files'],
+        'docs': project['docs'],
+        'issues_found': security_scan.get('issues_found', 0),
+    }
+    encoded = json.dumps(key, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def section_marker(path, digest):
+    """セクションの開始マーカー（パスは JSON 文字列として埋め込む）"""
+    # `>` をエスケープして、パスが HTML コメントを閉じないようにする
+    quoted = json.dumps(path, ensure_ascii=False).replace('>', '\\u003e')
+    return f'<!-- ypm:project path={quoted} digest="{digest}" -->'
+
+
+def render_section(project, digest, labels, extra_lines=()):
+    """
+    1プロジェクト分のセクションを生成
+
+    Args:
+        extra_lines: 項目の後ろに加える行（以前のセクションへの追記）
+    """
+    title = project['name']
+    if project['is_worktree']:
+        title = f"{title} {labels['worktree']}"
+
+    timestamp = project.get('last_commit_timestamp', 0)
+    subject = project['last_commit'].partition('|')[2]
+    if timestamp:
+        last_commit = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+        if subject:
+            last_commit = f"{last_commit} — {subject}"
+    else:
+        last_commit = labels['unknown_value']
+
+    lines = [section_marker(project['path'], digest), f"### {title}", ""]
+    if project['category'] != 'dormant':
+        lines.append(f"- **{labels['branch']}**: {project['branch']}")
+    lines.append(f"- **{labels['last_commit']}**: {last_commit}")
+
+    docs = project['docs'] or {}
+    if docs.get('overview'):
+        lines.append(f"- **{labels['overview']}**: {docs['overview']}")
+    if docs.get('phase_hint'):
+        lines.append(f"- **{labels['phase']}**: {docs['phase_hint']}")
+    if project['changed_files']:
+        count = project['changed_files']
+        files = labels['file' if count == 1 else 'files'].format(count=count)
+        lines.append(f"- **{labels['changes']}**: {files}")
+
+    security_scan = project.get('security_scan') or {}
+    if security_scan.get('has_secrets'):
+        found = labels['secrets_found'].format(count=security_scan['issues_found'])
+        lines.append(f"- **{labels['secrets']}**: {found}")
+
+    lines.extend(extra_lines)
+    lines.append("<!-- /ypm:project -->")
+    return '\n'.join(lines) + '\n'
+
+
+def parse_sections(text):
+    """
+    既存の PROJECT_STATUS.md からセクションを取り出す
+
+    Returns:
+        {プロジェクトパス: (digest, セクション本文)}
+    """
+    sections = {}
+    for match in SECTION_PATTERN.finditer(text):
+        try:
+            path = json.loads(match.group('path'))
+        except ValueError:
+            continue
+        sections[path] = (match.group('digest'), match.group(0))
+    return sections
+
+
+def extra_lines(section):
+    """
+    既存のセクションからレンダラーが出力していない行（追記）を取り出す
+
+    マーカー・見出し・項目の行以外を元の順序で返す（前後の空行は除く）。
+    """
+    lines = section.rstrip('\n').split('\n')[1:-1]
+    if lines and lines[0].startswith('### '):
+        lines = lines[1:]
+    extra = [line for line in lines if not RENDERED_LINE_PATTERN.match(line)]
+    while extra and not extra[0].strip():
+        extra.pop(0)
+    while extra and not extra[-1].strip():
+        extra.pop()
+    return extra
+
+
+def sort_key(project):
+    """カテゴリ内の並び順: 最終コミットが新しい順、同じなら名前順"""
+    return (-project.get('last_commit_timestamp', 0), project['name'], project['path'])
+
+
+def render_status(projects, status_path=None, language='en'):
+    """
+    PROJECT_STATUS.md を生成・更新
+
+    Args:
+        projects: スキャン結果（security_scan 済み）のリスト
+        status_path: 出力先（None ならデフォルト）
+        language: 'en' または 'ja'（それ以外は en）
+
+    Returns:
+        統計の辞書（sections / rewritten / unchanged / removed / written）
+    """
+    status_path = Path(status_path) if status_path else get_default_status_path()
+    labels = LABELS.get(language, LABELS['en'])
+
+    try:
+        previous_text = status_path.read_text(encoding='utf-8')
+    except OSError:
+        previous_text = ''
+    previous = parse_sections(previous_text)
+
+    by_category = {category: [] for category in CATEGORY_ORDER}
+    for project in projects:
+        by_category.setdefault(project['category'], []).append(project)
+
+    rewritten = 0
+    body = []
+    for category in CATEGORY_ORDER:
+        members = sorted(by_category[category], key=sort_key)
+        if category == 'unknown' and not members:
+            continue
+        body.append(f"## {labels[category]}\n")
+        if not members:
+            body.append(f"{labels['none']}\n")
+        for project in members:
+            digest = section_digest(project, language)
+            existing = previous.get(project['path'])
+            if existing and existing[0] == digest:
+                body.append(existing[1])
+            else:
+                extra = extra_lines(existing[1]) if existing else ()
+                body.append(render_section(project, digest, labels, extra))
+                rewritten += 1
+    body = '\n'.join(body)
+
+    counts = {category: len(members) for category, members in by_category.items()}
+    summary = labels['summary'].format(total=len(projects), **counts)
+    removed = len(set(previous) - {project['path'] for project in projects})
+
+    # 最終更新時刻は内容が変わったときだけ進める（変化が無ければ書き込まない）
+    match = UPDATED_PATTERN.search(previous_text)
+    if match:
+        candidate = header(labels, match.group('value'), summary) + body
+        if candidate == previous_text:
+            return stats(status_path, len(projects), rewritten, removed, written=False)
+
+    updated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    text = header(labels, updated, summary) + body
+
+    status_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = status_path.with_name(f"{status_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, status_path)
+    return stats(status_path, len(projects), rewritten, removed, written=True)
+
+
+def header(labels, updated, summary):
+    """ファイル先頭（タイトル・最終更新・サマリー）"""
+    return f"# {labels['title']}\n\n{labels['updated']}: {updated}\n\n{summary}\n\n"
+
+
+def stats(status_path, sections, rewritten, removed, written):
+    return {
+        "path": str(status_path),
+        "sections": sections,
+        "rewritten": rewritten,
+        "unchanged": sections - rewritten,
+        "removed": removed,
+        "written": written,
+    }
@@ -0,0 +1,153 @@
+#!/usr/bin/env bats
+# Tests that git_reader.read_head_info (reads .git directly) agrees with git itself
+
+PLUGIN_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/.." && pwd)"
+SCRIPTS_DIR="${PLUGIN_ROOT}/scripts"
+
+# ---------------------------------------------------------------------------
+# Isolation helpers
+# ---------------------------------------------------------------------------
+
+setup() {
+    local _tmp
+    _tmp=$(mktemp -d 2>/dev/null) || { skip "mktemp -d failed (sandbox or quota?)"; }
+    export TEST_DIR
+    TEST_DIR=$(cd "$_tmp" && pwd -P)
+    # No user git config; English relative dates (read_head_info defers to git otherwise)
+    export HOME="$TEST_DIR"
+    export LC_ALL=C
+    export GIT_AUTHOR_NAME=test GIT_AUTHOR_EMAIL=test@example.com
+    export GIT_COMMITTER_NAME=test GIT_COMMITTER_EMAIL=test@example.com
+}
+
+teardown() {
+    if [ -n "$TEST_DIR" ] && [ -d "$TEST_DIR" ]; then
+        rm -rf "$TEST_DIR"
+    fi
+}
+
+# Helper: commit a change to file.txt, authored $3 days and committed $4 days ago
+_commit() {
+    local repo="$1" message="$2" author_days="${3:-3}" committer_days="${4:-2}"
+    local now
+    now=$(date +%s)
+    printf '%s\n' "$message" >> "${repo}/file.txt"
+    git -C "$repo" add file.txt
+    GIT_AUTHOR_DATE="@$((now - author_days * 86400)) +0000" \
+        GIT_COMMITTER_DATE="@$((now - committer_days * 86400)) +0000" \
+        git -C "$repo" commit -q -m "$message"
+}
+
+# Helper: read_head_info() formatted like _git_head_info
+_reader_head_info() {
+    run python3 -c '
+import sys
+sys.path.insert(0, sys.argv[1])
+from git_reader import read_head_info
+info = read_head_info(sys.argv[2])
+if info is None:
+    print("None")
+else:
+    print(info["branch"], info["last_commit_timestamp"], info["author_timestamp"], info["last_commit"])
+' "$SCRIPTS_DIR" "$1"
+}
+
+# Helper: the same fields from git (what scan_projects.py falls back to)
+_git_head_info() {
+    printf '%s %s\n' \
+        "$(git -C "$1" rev-parse --abbrev-ref HEAD)" \
+        "$(git -C "$1" log -1 --format='%ct %at %ar|%s')"
+}
+
+# Helper: whether git stores HEAD's commit as a delta in a pack
+_head_is_delta() {
+    local sha
+    sha=$(git -C "$1" rev-parse HEAD)
+    git -C "$1" verify-pack -v "$1"/.git/objects/pack/*.idx \
+        | awk -v sha="$sha" '$1 == sha && NF == 7 { found = 1 } END { exit !found }'
+}
+
+# ---------------------------------------------------------------------------
+# Object storage
+# ---------------------------------------------------------------------------
+
+@test "loose commit matches git log -1" {
+    local repo="${TEST_DIR}/repo"
+    git init -q -b main "$repo"
+    _commit "$repo" "first" 40 30
+    # A multi-line first paragraph is one subject for %s
+    _commit "$repo" "$(printf 'add parser\nfor headers\n\nBody text.')" 5 1
+    [ -z "$(find "${repo}/.git/objects/pack" -name '*.pack')" ]
+
+    _reader_head_info "$repo"
+    [ "$status" -eq 0 ]
+    [ "$output" = "$(_git_head_info "$repo")" ]
+    [[ "$output" == "main "*" 5 days ago|add parser for headers" ]]
+}
+
+@test "packed commit and packed refs match git log -1" {
+    local repo="${TEST_DIR}/repo"
+    git init -q -b main "$repo"
+    _commit "$repo" "first" 400 400
+    _commit "$repo" "second" 20 20
+    git -C "$repo" gc -q
+    [ ! -f "${repo}/.git/refs/heads/main" ]
+    [ -n "$(find "${repo}/.git/objects/pack" -name '*.pack')" ]
+
+    _reader_head_info "$repo"
+    [ "$status" -eq 0 ]
+    [ "$output" = "$(_git_head_info "$repo")" ]
+    [[ "$output" == *"|second" ]]
+}
+
+@test "delta-compressed commit matches git log -1" {
+    local repo="${TEST_DIR}/repo"
+    git init -q -b main "$repo"
+    _commit "$repo" "first" 10 10
+    # Empty commits share their tree, so they differ only in parent and message
+    local i
+    for i in $(seq 1 30); do
+        git -C "$repo" commit -q --allow-empty \
+            -m "a long and similar commit message number ${i}, shared text shared text shared text"
+    done
+    git -C "$repo" repack -q -a -d -f --window=50 --depth=50
+    # git keeps the newest object whole and stores older ones as deltas
+    git -C "$repo" reset -q --hard HEAD~5
+    _head_is_delta "$repo"
+
+    _reader_head_info "$repo"
+    [ "$status" -eq 0 ]
+    [ "$output" = "$(_git_head_info "$repo")" ]
+    [[ "$output" == *"number 25, shared text shared text shared text" ]]
+}
+
+@test "detached HEAD reports branch HEAD like git rev-parse --abbrev-ref" {
+    local repo="${TEST_DIR}/repo"
+    git init -q -b main "$repo"
+    _commit "$repo" "first" 9 8
+    _commit "$repo" "second" 2 1
+    git -C "$repo" checkout -q --detach HEAD~1
+
+    _reader_head_info "$repo"
+    [ "$status" -eq 0 ]
+    [ "$output" = "$(_git_head_info "$repo")" ]
+    [[ "$output" == "HEAD "*"|first" ]]
+}
+
+@test "non-English locale defers to git" {
+    local repo="${TEST_DIR}/repo"
+    git init -q -b main "$repo"
+    _commit "$repo" "first"
+
+    # Set inside Python: only the environment is consulted, so the locale need
+    # not be installed (and no shell complains about it)
+    run python3 -c '
+import os, sys
+sys.path.insert(0, sys.argv[1])
+from git_reader import read_head_info
+os.environ["LC_ALL"] = "ja_JP.UTF-8"
+print(read_head_info(sys.argv[2]))
+' "$SCRIPTS_DIR" "$repo"
+    [ "$status" -eq 0 ]
+    [ "$output" = "None" ]
+}
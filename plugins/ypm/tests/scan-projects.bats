@@ -0,0 +1,358 @@
+#!/usr/bin/env bats
+# Tests for scan_projects.py against temporary git repositories (stub TruffleHog)
+
+PLUGIN_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/.." && pwd)"
+SCRIPT="${PLUGIN_ROOT}/scripts/scan_projects.py"
+
+# ---------------------------------------------------------------------------
+# Isolation helpers
+# ---------------------------------------------------------------------------
+
+setup() {
+    python3 -c 'import yaml' 2>/dev/null || skip "python3 with PyYAML is required"
+    local _tmp
+    _tmp=$(mktemp -d 2>/dev/null) || { skip "mktemp -d failed (sandbox or quota?)"; }
+    export TEST_DIR
+    TEST_DIR=$(cd "$_tmp" && pwd -P)
+    # ~/.ypm (config, scan cache, TruffleHog state) and git config stay in TEST_DIR
+    export HOME="${TEST_DIR}/home"
+    mkdir -p "${HOME}/.ypm"
+    export LC_ALL=C
+    export GIT_AUTHOR_NAME=test GIT_AUTHOR_EMAIL=test@example.com
+    export GIT_COMMITTER_NAME=test GIT_COMMITTER_EMAIL=test@example.com
+    WS="${TEST_DIR}/ws"
+    mkdir -p "$WS"
+
+    # Stub TruffleHog: logs its arguments, prints trufflehog.out if present and
+    # exits with the status in trufflehog.exit (default 0)
+    mkdir -p "${TEST_DIR}/bin"
+    cat > "${TEST_DIR}/bin/trufflehog" <<'EOF'
+#!/bin/sh
+echo "$*" >> "${TEST_DIR}/trufflehog.log"
+[ -f "${TEST_DIR}/trufflehog.out" ] && cat "${TEST_DIR}/trufflehog.out"
+exit "$(cat "${TEST_DIR}/trufflehog.exit" 2>/dev/null || echo 0)"
+EOF
+    chmod +x "${TEST_DIR}/bin/trufflehog"
+    export PATH="${TEST_DIR}/bin:${PATH}"
+}
+
+teardown() {
+    if [ -n "$TEST_DIR" ] && [ -d "$TEST_DIR" ]; then
+        rm -rf "$TEST_DIR"
+    fi
+}
+
+# Helper: commit a change to file.txt dated $3 days ago
+_commit() {
+    local repo="$1" message="$2" days="${3:-0}"
+    local date
+    date="@$(( $(date +%s) - days * 86400 )) +0000"
+    printf '%s\n' "$message" >> "${repo}/file.txt"
+    git -C "$repo" add file.txt
+    GIT_AUTHOR_DATE="$date" GIT_COMMITTER_DATE="$date" git -C "$repo" commit -q -m "$message"
+}
+
+# Helper: create a repo with one commit dated $2 days ago
+_make_repo() {
+    local repo="$1" days="$2"
+    git init -q -b main "$repo"
+    _commit "$repo" "$(basename "$repo")" "$days"
+}
+
+# Helper: write ~/.ypm/config.yml monitoring the given directories
+_write_config() {
+    {
+        printf 'monitor:\n  directories:\n'
+        local dir
+        for dir in "$@"; do
+            printf '    - %s\n' "$dir"
+        done
+        printf '  patterns:\n    - "*"\n    - "group-*/*"\n'
+        printf '  exclude:\n    - node_modules\n'
+        printf 'classification:\n  active_days: 7\n  inactive_days: 30\n'
+    } > "${HOME}/.ypm/config.yml"
+}
+
+# Helper: one active, one developing (in a group) and one dormant project.
+# Commits are days old so relative times do not tick between runs.
+_make_workspace() {
+    _make_repo "${WS}/alpha" 2
+    mkdir -p "${WS}/group-a"
+    _make_repo "${WS}/group-a/beta" 10
+    _make_repo "${WS}/gamma" 60
+    _write_config "$WS"
+}
+
+# Helper: run the scanner; stderr goes to $TEST_DIR/stderr
+_scan() {
+    run bash -c 'python3 "$0" "$@" 2> "${TEST_DIR}/stderr"' "$SCRIPT" "$@"
+}
+
+# Helper: evaluate a Python expression over the JSON in $output (as `d`)
+_json() {
+    printf '%s' "$output" | python3 -c "import json, sys; d = json.load(sys.stdin); print($1)"
+}
+
+# Helper: the JSON in $output without the scan_time that differs per run
+_without_scan_time() {
+    printf '%s' "$output" | python3 -c '
+import json, sys
+d = json.load(sys.stdin)
+d.pop("scan_time")
+print(json.dumps(d, indent=2, ensure_ascii=False))'
+}
+
+# Helper: the recorded TruffleHog commit for a project
+_secret_state_commit() {
+    python3 -c '
+import json, os, sys
+state = json.load(open(os.path.expanduser("~/.ypm/trufflehog_state.json")))
+print(state["projects"][sys.argv[1]]["commit"])' "$1"
+}
+
+# ---------------------------------------------------------------------------
+# Parallel scan
+# ---------------------------------------------------------------------------
+
+@test "--jobs 4 prints the same output as --jobs 1" {
+    _make_workspace
+
+    _scan --jobs 1 --no-cache
+    [ "$status" -eq 0 ]
+    local serial
+    serial=$(_without_scan_time)
+    [ "$(_json 'len(d["projects"])')" = "3" ]
+
+    _scan --jobs 4 --no-cache
+    [ "$status" -eq 0 ]
+    [ "$(_without_scan_time)" = "$serial" ]
+
+    # A cached parallel run as well
+    _scan --jobs 4
+    [ "$status" -eq 0 ]
+    _scan --jobs 4
+    [ "$status" -eq 0 ]
+    [ "$(_without_scan_time)" = "$serial" ]
+}
+
+# ---------------------------------------------------------------------------
+# Scan cache
+# ---------------------------------------------------------------------------
+
+@test "a new commit invalidates the cached entry" {
+    _make_workspace
+
+    _scan --fields branch,last_commit
+    [ "$status" -eq 0 ]
+    [ "$(_json '[p["last_commit"] for p in d["projects"] if p["name"] == "alpha"]')" = "['2 days ago|alpha']" ]
+    grep -q "${WS}/alpha" "${HOME}/.ypm/scan_cache.json"
+
+    _commit "${WS}/alpha" "second commit" 0
+    git -C "${WS}/alpha" checkout -q -b feature
+
+    _scan --fields branch,last_commit
+    [ "$status" -eq 0 ]
+    [ "$(_json '[(p["branch"], p["last_commit"].split("|")[1]) for p in d["projects"] if p["name"] == "alpha"]')" \
+        = "[('feature', 'second commit')]" ]
+}
+
+@test "edits to tracked files show up in changed_files on a cache hit" {
+    _make_workspace
+
+    _scan --fields changed_files
+    [ "$status" -eq 0 ]
+    [ "$(_json '[p["changed_files"] for p in d["projects"] if p["name"] == "alpha"]')" = "[0]" ]
+
+    # Does not touch .git/index, so the cache fingerprint is unchanged
+    printf 'edit\n' >> "${WS}/alpha/file.txt"
+    _scan --fields changed_files
+    [ "$status" -eq 0 ]
+    [ "$(_json '[p["changed_files"] for p in d["projects"] if p["name"] == "alpha"]')" = "[1]" ]
+
+    git -C "${WS}/alpha" checkout -q file.txt
+    _scan --fields changed_files
+    [ "$status" -eq 0 ]
+    [ "$(_json '[p["changed_files"] for p in d["projects"] if p["name"] == "alpha"]')" = "[0]" ]
+}
+
+# ---------------------------------------------------------------------------
+# TruffleHog state
+# ---------------------------------------------------------------------------
+
+@test "--since-commit state advances only when TruffleHog succeeds" {
+    _make_repo "${WS}/alpha" 1
+    _write_config "$WS"
+    local first second
+    first=$(git -C "${WS}/alpha" rev-parse HEAD)
+
+    # First scan covers the full history
+    _scan --fields security_scan
+    [ "$status" -eq 0 ]
+    [ "$(_secret_state_commit "${WS}/alpha")" = "$first" ]
+    [ "$(grep -c -- '--since-commit' "${TEST_DIR}/trufflehog.log")" -eq 0 ]
+
+    _commit "${WS}/alpha" "second commit" 0
+    second=$(git -C "${WS}/alpha" rev-parse HEAD)
+
+    # A failed scan leaves the state where it was
+    echo 1 > "${TEST_DIR}/trufflehog.exit"
+    _scan --fields security_scan
+    [ "$status" -eq 0 ]
+    [ "$(tail -n 1 "${TEST_DIR}/trufflehog.log")" = "git file://${WS}/alpha --json --no-update --since-commit=${first}" ]
+    [ "$(_secret_state_commit "${WS}/alpha")" = "$first" ]
+
+    # So the next scan retries the same range, and then advances
+    rm "${TEST_DIR}/trufflehog.exit"
+    printf '{"SourceMetadata": {}}\n' > "${TEST_DIR}/trufflehog.out"
+    _scan --fields security_scan
+    [ "$status" -eq 0 ]
+    [ "$(tail -n 1 "${TEST_DIR}/trufflehog.log")" = "git file://${WS}/alpha --json --no-update --since-commit=${first}" ]
+    [ "$(_secret_state_commit "${WS}/alpha")" = "$second" ]
+    [ "$(_json 'd["projects"][0]["security_scan"]')" \
+        = "{'scanned': True, 'issues_found': 1, 'has_secrets': True, 'incremental': True}" ]
+
+    # HEAD has not moved: TruffleHog is not started, the count is kept
+    local calls
+    calls=$(wc -l < "${TEST_DIR}/trufflehog.log")
+    _scan --fields security_scan
+    [ "$status" -eq 0 ]
+    [ "$(wc -l < "${TEST_DIR}/trufflehog.log")" -eq "$calls" ]
+    [ "$(_json 'd["projects"][0]["security_scan"]["issues_found"]')" = "1" ]
+}
+
+# ---------------------------------------------------------------------------
+# NDJSON output
+# ---------------------------------------------------------------------------
+
+@test "NDJSON lines are valid JSON: projects, then scan updates, then the summary" {
+    _make_workspace
+
+    _scan --format ndjson --jobs 4
+    [ "$status" -eq 0 ]
+    printf '%s\n' "$output" | python3 -c '
+import json, sys
+frames = [json.loads(line) for line in sys.stdin]
+kinds = ["summary" if "summary" in f else "update" if "update" in f else "project" for f in frames]
+# All metadata first, TruffleHog results after, the summary last
+assert kinds == ["project"] * 3 + ["update"] * 3 + ["summary"], kinds
+projects = [f for f in frames if "name" in f]
+assert all(p["security_scan"] is None for p in projects)
+assert sorted(f["path"] for f in frames if "update" in f) == sorted(p["path"] for p in projects)
+assert all(f["update"] == "security_scan" and f["security_scan"]["scanned"] for f in frames if "update" in f)
+assert frames[-1]["summary"] == {"total": 3, "active": 1, "developing": 1, "dormant": 1, "unknown": 0}
+'
+}
+
+@test "NDJSON without security_scan has no update lines" {
+    _make_workspace
+
+    _scan --format ndjson --fields branch
+    [ "$status" -eq 0 ]
+    [ "${#lines[@]}" -eq 4 ]
+    [[ "${lines[3]}" == '{"summary": '* ]]
+    [ ! -f "${TEST_DIR}/trufflehog.log" ]
+}
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+
+@test "discovery skips excluded and non-repo directories and dedups by inode" {
+    _make_workspace
+    mkdir -p "${WS}/node_modules" "${WS}/notes"
+    _make_repo "${WS}/node_modules/pkg" 1
+    _make_repo "${WS}/.hidden" 1
+    # Symlinks sort before the real paths but must not replace them
+    ln -s "${WS}/alpha" "${WS}/aaa-link"
+    ln -s "${WS}/group-a" "${WS}/group-0"
+    ln -s "$WS" "${TEST_DIR}/ws-alias"
+    # The same workspace again under another name; the first listed base wins
+    _write_config "$WS" "${TEST_DIR}/ws-alias"
+
+    _scan --fields branch
+    [ "$status" -eq 0 ]
+    [ "$(_json 'sorted(p["path"] for p in d["projects"])')" \
+        = "['${WS}/alpha', '${WS}/gamma', '${WS}/group-a/beta']" ]
+}
+
+@test "a repo reached only through a symlink is still found" {
+    _make_repo "${TEST_DIR}/elsewhere" 1
+    ln -s "${TEST_DIR}/elsewhere" "${WS}/linked"
+    _write_config "$WS"
+
+    _scan --fields branch
+    [ "$status" -eq 0 ]
+    [ "$(_json '[p["path"] for p in d["projects"]]')" = "['${WS}/linked']" ]
+}
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+@test "--category keeps only the listed categories" {
+    _make_workspace
+
+    _scan --category active,dormant
+    [ "$status" -eq 0 ]
+    [ "$(_json 'sorted(p["name"] for p in d["projects"])')" = "['alpha', 'gamma']" ]
+    [ "$(_json 'd["summary"]["total"]')" = "2" ]
+    # Filtered out before TruffleHog
+    [ "$(grep -c "" "${TEST_DIR}/trufflehog.log")" -eq 2 ]
+    ! grep -q "group-a/beta" "${TEST_DIR}/trufflehog.log"
+}
+
+@test "--changed-since keeps projects with a commit on or after the date" {
+    _make_workspace
+    local since
+    since=$(python3 -c 'import datetime; print(datetime.date.today() - datetime.timedelta(days=20))')
+
+    _scan --changed-since "$since"
+    [ "$status" -eq 0 ]
+    [ "$(_json 'sorted(p["name"] for p in d["projects"])')" = "['alpha', 'beta']" ]
+}
+
+@test "--fields selects the output keys; last_commit_timestamp only on request" {
+    _make_workspace
+
+    _scan --fields branch,category
+    [ "$status" -eq 0 ]
+    [ "$(_json 'sorted({tuple(p) for p in d["projects"]})')" = "[('name', 'path', 'branch', 'category')]" ]
+    [ ! -f "${TEST_DIR}/trufflehog.log" ]
+
+    _scan
+    [ "$status" -eq 0 ]
+    [ "$(_json 'sorted({tuple(p) for p in d["projects"]})')" \
+        = "[('name', 'path', 'branch', 'last_commit', 'changed_files', 'category', 'is_worktree', 'docs', 'security_scan')]" ]
+
+    _scan --fields last_commit_timestamp
+    [ "$status" -eq 0 ]
+    [ "$(_json 'd["projects"][0]["last_commit_timestamp"] > 0')" = "True" ]
+}
+
+# ---------------------------------------------------------------------------
+# Markdown rendering
+# ---------------------------------------------------------------------------
+
+@test "--render markdown leaves an unchanged status file alone on the second run" {
+    _make_workspace
+    local status_file="${TEST_DIR}/PROJECT_STATUS.md"
+
+    _scan --render markdown --status-file "$status_file"
+    [ "$status" -eq 0 ]
+    grep -q '"written": true' "${TEST_DIR}/stderr"
+    grep -q '<!-- ypm:project path="'"${WS}/alpha"'"' "$status_file"
+    cp "$status_file" "${TEST_DIR}/first.md"
+
+    _scan --render markdown --status-file "$status_file"
+    [ "$status" -eq 0 ]
+    grep -q '"rewritten": 0, "unchanged": 3, "removed": 0, "written": false' "${TEST_DIR}/stderr"
+    cmp "$status_file" "${TEST_DIR}/first.md"
+}
+
+@test "--render markdown rejects --category and --changed-since" {
+    _make_workspace
+
+    _scan --render markdown --category active
+    [ "$status" -eq 2 ]
+    grep -q -- "--render cannot be used with --category or --changed-since" "${TEST_DIR}/stderr"
+}